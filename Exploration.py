@@ -1,9 +1,62 @@
 import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
-import seaborn as sns
 import streamlit as st
 from styles import overall_css
+from data_access import load_country_codes, load_zomato
+from pipeline import run_pipeline, stage_fingerprints
+from categories import TOP_N_COLUMNS, TopNCollapser
+from correlation import cached_correlation_matrices
+from figures import get_renderer
+from incremental_stats import cached_stats
+from cuisine_index import get_cuisine_index
+from session_data import FrameOverlay
+
+NUMERICAL_COLUMNS = ['Longitude', 'Latitude', 'Average Cost for two', 'Aggregate rating', 'Votes']
+SCATTER_PAIRS = [('Average Cost for two', 'Aggregate rating'), ('Average Cost for two', 'Votes'),
+                 ('Aggregate rating', 'Votes')]
+
+# Gallery section -> figures as (kind, pipeline stage, parameters, caption)
+FIGURE_GALLERY = {
+    'Count Plots': [('count', 'cleaned', {'column': column}, None)
+                    for column in ['Restaurant Name', 'City', 'Cuisines', 'Currency',
+                                   'Has Table booking', 'Has Online delivery']],
+    'Pi Charts': [('pie', 'cleaned', {'column': column}, None)
+                  for column in ['Has Table booking', 'Has Online delivery', 'Price range', 'Rating text']],
+    'MultiVariate Analysis': (
+        [('scatter', 'cleaned', {'x_column': x, 'y_column': y, 'hue_column': 'Price range'}, None)
+         for x, y in SCATTER_PAIRS]
+        + [('scatter', 'cleaned', {'x_column': x, 'y_column': y, 'hue_column': 'Price range',
+                                   'size_column': 'Has Table booking',
+                                   'style_column': 'Has Online delivery'}, None)
+           for x, y in SCATTER_PAIRS]
+    ),
+}
+
+def display_figures(figures):
+    # Submit every figure first so they render in parallel, then show each as it is ready
+    renderer = get_renderer()
+    placeholders = [st.empty() for _ in figures]
+    futures = [renderer.submit(kind, stage, **params) for kind, stage, params, _ in figures]
+    for placeholder, future, (_, _, _, caption) in zip(placeholders, futures, figures):
+        placeholder.image(future.result(), caption=caption)
+
+@st.cache_resource(max_entries=4, show_spinner=False)
+def shared_derived_columns(name, fingerprint, columns, _derive):
+    # Derived columns depend only on the data version: computed once and shared by every session
+    derived = _derive()
+    return {column: derived[column] for column in columns}
+
+def session_overlay(data, name, derive, columns):
+    # The session only keeps its view (an overlay referencing the shared columns) for the
+    # current data version; views of older versions are evicted when the data changes
+    fingerprint = stage_fingerprints()['cleaned']
+    key = f"overlay-{name}-{fingerprint}"
+    for stale in [k for k in st.session_state if str(k).startswith(f"overlay-{name}-") and k != key]:
+        del st.session_state[stale]
+    if key not in st.session_state:
+        shared = shared_derived_columns(name, fingerprint, tuple(columns), derive)
+        st.session_state[key] = FrameOverlay(data).assign(**shared)
+    return st.session_state[key]
 
 def data_reading_and_exploration():
     # Apply CSS styles
@@ -14,7 +67,7 @@ def data_reading_and_exploration():
     
     # Reading the data
     st.markdown("<h2>Reading the Zomato Dataset</h2>", unsafe_allow_html=True)
-    data = pd.read_csv('zomato.csv', encoding='latin-1')
+    data = load_zomato()
     
     st.markdown(
         """
@@ -59,40 +112,34 @@ def data_reading_and_exploration():
     
     return data
 
-def feature_transformation(data):
+def feature_transformation(stages):
     # Heading for the section
     st.markdown("<h1>Feature Engineering</h1>", unsafe_allow_html=True)
     st.markdown("<h2>1. Feature Transformation</h2>", unsafe_allow_html=True)
     
-    # Load country code data
-    df_country = pd.read_excel('Country-Code.xlsx')
+    # Country code data
+    df_country = load_country_codes()
     st.markdown("<h3>Country Code Data</h3>", unsafe_allow_html=True)
     st.write(df_country.head())
     
-    # Merge data with country code
-    data = pd.merge(data, df_country, on='Country Code', how='left')
+    # Data merged with country code
     st.markdown("<h3>Data After Merging with Country Code</h3>", unsafe_allow_html=True)
-    st.write(data.head(2))
+    st.write(stages['merged'].head(2))
     
-    # Extract information from Locality
-    data[['Mall', 'Area', 'City from Locality']] = data['Locality'].str.split(', ', expand=True, n=2)
+    # Information extracted from Locality
     st.markdown("<h3>Data After Extracting Locality Information</h3>", unsafe_allow_html=True)
-    st.write(data.head(2))
+    st.write(stages['locality_split'].head(2))
     
-    # Drop unnecessary columns
-    data.drop(columns=['Restaurant ID', 'Address', 'Locality Verbose','Switch to order menu', 'Locality', 'City from Locality', 'Country Code', 'Rating color'], inplace=True)
+    # Unnecessary columns dropped
     st.markdown("<h3>Data After Dropping Unnecessary Columns</h3>", unsafe_allow_html=True)
-    st.write(data.head(2))
+    st.write(stages['trimmed'].head(2))
 
     # Display data types before conversion
     st.markdown("<h2>Data Types Before Conversion</h2>", unsafe_allow_html=True)
-    st.write(data.dtypes)
+    st.write(stages['trimmed'].dtypes)
     
-    # Convert object columns to categorical if they represent categorical data
-    categorical_columns = ['Restaurant Name', 'City', 'Cuisines', 'Currency', 
-                           'Has Table booking', 'Has Online delivery', 'Is delivering now', 
-                           'Rating text', 'Area', 'Country', 'Price range']
-    data[categorical_columns] = data[categorical_columns].astype('category')
+    # Object columns converted to categorical if they represent categorical data
+    data = stages['typed']
     
     # Display the data types of the columns after conversion
     st.markdown("<h2>Data Types After Conversion</h2>", unsafe_allow_html=True)
@@ -109,7 +156,9 @@ def feature_transformation(data):
     
     return data
 
-def data_cleaning(data):
+def data_cleaning(stages):
+    data = stages['typed']
+
     # Heading for the section
     st.markdown("<h1>Data Cleaning</h1>", unsafe_allow_html=True)
     st.markdown("<h2>Handling Null Values</h2>", unsafe_allow_html=True)
@@ -122,18 +171,17 @@ def data_cleaning(data):
     st.markdown("<h3>Count of Null Values in Each Column</h3>", unsafe_allow_html=True)
     st.write(data.isnull().sum())
     
-    # Drop the 'Area' column
-    data.drop(columns=['Area'], inplace=True)
+    # 'Area' column dropped
     st.markdown("<h3>Data After Dropping 'Area' Column</h3>", unsafe_allow_html=True)
-    st.write(data.head(2))
+    st.write(stages['area_dropped'].head(2))
     
-    # Drop rows with any null values
-    data.dropna(inplace=True)
+    # Rows with any null values dropped
+    data = stages['cleaned']
     
     # Display count of null values in each column after dropping
     st.markdown("<h3>Count of Null Values After Dropping Rows with Null Values</h3>", unsafe_allow_html=True)
     st.write(data.isnull().sum())
-    st.image("null.png", caption="Null Values Heatmap")
+    display_figures([('missing', 'typed', {}, "Null Values Heatmap")])
     
     # Display final shape of the data
     st.markdown("<h3>Final Shape of the Data</h3>", unsafe_allow_html=True)
@@ -145,6 +193,8 @@ def data_cleaning(data):
 # Primary data analysis function
 def primary_data_analysis(data):
     st.markdown("<h1>Exploratory Data Analysis (EDA)</h1>", unsafe_allow_html=True)
+    # Null, duplicate and distinct counts are read from the running summary of this data version
+    stats = cached_stats(data, stage_fingerprints()['cleaned'])
     st.markdown("<h2>Primary Analysis of Data</h2>", unsafe_allow_html=True)
     
     # Display the first few rows of the dataset
@@ -164,11 +214,11 @@ def primary_data_analysis(data):
     
     # Check for missing values
     st.markdown("<h3>Missing Values</h3>", unsafe_allow_html=True)
-    missing_values = data.isnull().sum()
+    missing_values = stats.null_counts()
     st.write(missing_values[missing_values > 0])
     
     # Check for duplicate rows
-    duplicate_rows = data.duplicated().sum()
+    duplicate_rows = stats.duplicate_count()
     st.markdown(f"<h3>There are {duplicate_rows} duplicate rows in the dataset.</h3>", unsafe_allow_html=True)
     
     # Check the data types of each column
@@ -199,18 +249,12 @@ def primary_data_analysis(data):
     # Print the count of unique categories for each categorical column
     st.markdown("<h3>Count of Unique Categories for Each Categorical Column</h3>", unsafe_allow_html=True)
     for column in categorical_columns:
-        st.write(f"{column}: {data[column].nunique()} unique categories")
-    
-    # Define the function to apply top N categories and replace others with 'Other'
-    def replace_with_other(data, column_name, top_n=10):
-        top_categories = data[column_name].value_counts().nlargest(top_n).index
-        data[column_name] = data[column_name].apply(lambda x: x if x in top_categories else 'Other')
+        st.write(f"{column}: about {stats.nunique(column)} unique categories")
     
-    # Apply the function to each column and save the result in a new DataFrame
-    data_clean = data.copy()  # Create a copy of the original DataFrame
-    columns = ['Restaurant Name', 'City', 'Cuisines', 'Mall']
-    for col in columns:
-        replace_with_other(data_clean, col)
+    # Keep the top 10 categories of each column and replace the others with 'Other'; the
+    # collapsed columns are shared across sessions, over the shared cleaned frame
+    data_clean = session_overlay(data, 'top_n', lambda: TopNCollapser(TOP_N_COLUMNS, top_n=10).fit_transform(data),
+                                 TOP_N_COLUMNS)
     
     # Print the count of unique categories for each categorical column
     st.markdown("<h3>Count of Unique Categories for Each Categorical Column After Transformation</h3>", unsafe_allow_html=True)
@@ -240,43 +284,46 @@ def mathematical_data_analysis(data):
 
     # Select only numeric columns
     numeric_data = data.select_dtypes(include=[np.number])
+    stats = cached_stats(data, stage_fingerprints()['cleaned'])
 
-    # Compute the variance of the numeric columns
-    variance = numeric_data.var()
+    # Variance of the numeric columns from the running summary
+    variance = stats.var()
     st.markdown("<h2>Variance of Numeric Columns</h2>", unsafe_allow_html=True)
     st.write(variance)
 
-    # Compute the covariance matrix of the numeric columns
-    covariance_matrix = numeric_data.cov()
+    # Covariance matrix of the numeric columns from the running summary
+    covariance_matrix = stats.cov()
     st.markdown("<h2>Covariance Matrix of Numeric Columns</h2>", unsafe_allow_html=True)
     st.write(covariance_matrix)
-    st.image("cov.png", caption="Covariance of Data")
+    display_figures([('heatmap', 'cleaned', {'method': 'covariance'}, "Covariance of Data")])
+
+    # Pearson, Spearman and Kendall matrices are computed together once per dataset version
+    correlations = cached_correlation_matrices(numeric_data, stage_fingerprints()['cleaned'])
 
     # Pearson Correlation Coefficient
-    pearson_corr = numeric_data.corr(method='pearson')
+    pearson_corr = correlations['pearson']
     st.markdown("<h2>Pearson Correlation Coefficient</h2>", unsafe_allow_html=True)
     st.write(pearson_corr)
-    st.image("heatmap0.png", caption="Pearson Correlation Coefficient")
+    display_figures([('heatmap', 'cleaned', {'method': 'pearson'}, "Pearson Correlation Coefficient")])
 
     # Spearman Rank Correlation Coefficient
-    spearman_corr = numeric_data.corr(method='spearman')
+    spearman_corr = correlations['spearman']
     st.markdown("<h2>Spearman Rank Correlation Coefficient</h2>", unsafe_allow_html=True)
     st.write(spearman_corr)
-    st.image("heatmap1.png", caption="Spearman Rank Correlation Coefficient")
+    display_figures([('heatmap', 'cleaned', {'method': 'spearman'}, "Spearman Rank Correlation Coefficient")])
 
     # Kendall Rank Correlation Coefficient
-    kendall_corr = numeric_data.corr(method='kendall')
+    kendall_corr = correlations['kendall']
     st.markdown("<h2>Kendall Rank Correlation Coefficient</h2>", unsafe_allow_html=True)
     st.write(kendall_corr)
-    st.image("heatmap2.png", caption="Kendall Rank Correlation Coefficient")
+    display_figures([('heatmap', 'cleaned', {'method': 'kendall'}, "Kendall Rank Correlation Coefficient")])
 
     st.markdown("<h2>Mathematical Observations</h2>", unsafe_allow_html=True)
-    st.image("dist1.png")
-    st.image("dist2.png")
-    st.image("dist3.png")
-    st.image("dist4.png")
-    st.image("dist5.png")
-    st.image("bar.png")
+    display_figures(
+        [('distribution', 'cleaned', {'column': column, 'color_index': i}, None)
+         for i, column in enumerate(NUMERICAL_COLUMNS)]
+        + [('boxplots', 'cleaned', {'columns': NUMERICAL_COLUMNS}, None)]
+    )
     st.markdown("""
     **Distribution Characteristics:** The numerical columns exhibit a wide range of values with high variance, indicating substantial variability in Average Cost for two, Votes, and Restaurant ID.
 
@@ -290,13 +337,31 @@ def mathematical_data_analysis(data):
     """, unsafe_allow_html=True)
 
 
+# Cuisine analysis function
+def cuisine_analysis():
+    st.markdown("<h1>Cuisine Analysis</h1>", unsafe_allow_html=True)
+    # Each restaurant counts once for every cuisine it lists, not once per cuisine combination
+    index = get_cuisine_index()
+    st.markdown(f"<h3>The restaurants serve {len(index.names)} distinct cuisines.</h3>", unsafe_allow_html=True)
+
+    st.markdown("<h2>Top 10 Cuisines</h2>", unsafe_allow_html=True)
+    st.write(index.cuisine_stats().head(10))
+
+    st.markdown("<h2>Cuisines Most Often Served Together</h2>", unsafe_allow_html=True)
+    top_cuisines = index.cuisine_stats().index[:10]
+    st.write(index.cooccurrence().loc[top_cuisines, top_cuisines])
+
+
 def Exploration():
     st.title('Zomato Data Cleaning and Feature Transformation')
+    # Every transformation stage is computed once per dataset version and cached
+    stages = run_pipeline()
+
     # Call the functions to execute
-    data = data_reading_and_exploration()
-    data = feature_transformation(data)
+    data_reading_and_exploration()
+    feature_transformation(stages)
     # Data cleaning
-    data = data_cleaning(data)
+    data = data_cleaning(stages)
     
     # Display the final cleaned data
     st.markdown("<h1>Cleaned Data</h1>", unsafe_allow_html=True)
@@ -308,25 +373,11 @@ def Exploration():
     # Mathematical data analysis
     mathematical_data_analysis(data)
 
-    st.header('Categorical Columns')
-    st.header('Count Plots')
-    st.image("count1.png")
-    st.image("count2.png")
-    st.image("count3.png")
-    st.image("count4.png")
-    st.image("count5.png")
-    st.image("count6.png")
-
-    st.header('Pi Charts')
-    st.image("pi1.png")
-    st.image("pi2.png")
-    st.image("pi3.png")
-    st.image("pi4.png")
-
-    st.header('MultiVariate Analysis')
-    st.image("multi1.png")
-    st.image("multi2.png")
-    st.image("multi3.png")
-    st.image("best1.png")
-    st.image("best2.png")
-    st.image("best3.png")
\ No newline at end of file
+    # Cuisine analysis
+    cuisine_analysis()
+
+    # Only the gallery section picked here is rendered
+    st.header('Figures')
+    section = st.radio("Show figures:", tuple(FIGURE_GALLERY), horizontal=True)
+    st.header(section)
+    display_figures(FIGURE_GALLERY[section])
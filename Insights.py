@@ -0,0 +1,80 @@
+import streamlit as st
+from styles import overall_css
+
+# Rows shown in the ranking charts
+TOP = 10
+
+
+def ranking_chart(table, dimension, measure, title):
+    st.markdown(f"<h3>{title}</h3>", unsafe_allow_html=True)
+    st.bar_chart(table.set_index(dimension)[measure], horizontal=True)
+
+
+def Insights():
+    # Every figure on this page is a slice of the precomputed aggregate cube
+    from aggregate_cube import get_cube
+
+    st.markdown(overall_css, unsafe_allow_html=True)
+    st.markdown("<h1>Insights</h1>", unsafe_allow_html=True)
+    cube = get_cube()
+
+    st.sidebar.header("Filters")
+    countries = cube.slice(['Country'])['Country'].tolist()
+    country = st.sidebar.selectbox("Country", countries,
+                                   index=countries.index('India') if 'India' in countries else 0)
+    cities = cube.slice(['City'], {'Country': country})
+    city = st.sidebar.selectbox("City", cities['City'].tolist())
+
+    # City Analysis: where the restaurants are and how they are rated
+    st.markdown("<h2>City Analysis</h2>", unsafe_allow_html=True)
+    top_cities = cities.head(TOP)
+    col1, col2 = st.columns(2)
+    with col1:
+        ranking_chart(top_cities, 'City', 'restaurants', f"Restaurants per city in {country}")
+    with col2:
+        rated_cities = cube.slice(['City'], {'Country': country}, sort_by='mean_rating')
+        ranking_chart(rated_cities[rated_cities['rated'] >= 20].head(TOP), 'City', 'mean_rating',
+                      "Best rated cities (at least 20 rated restaurants)")
+
+    # Cuisine Analysis: the most common and the most voted cuisines of the city
+    st.markdown(f"<h2>Cuisine Analysis: {city}</h2>", unsafe_allow_html=True)
+    col1, col2 = st.columns(2)
+    with col1:
+        ranking_chart(cube.slice(['Cuisines'], {'City': city}, top=TOP), 'Cuisines', 'restaurants',
+                      "Most common cuisines")
+    with col2:
+        ranking_chart(cube.slice(['Cuisines'], {'City': city}, sort_by='votes', top=TOP), 'Cuisines', 'votes',
+                      "Most voted cuisines")
+
+    # Price Range Analysis: costs are in the local currency, so they are compared within a country
+    st.markdown(f"<h2>Price Range Analysis: {country}</h2>", unsafe_allow_html=True)
+    prices = cube.slice(['Price range'], {'Country': country}).sort_values('Price range', ignore_index=True)
+    st.dataframe(prices.style.format({'mean_rating': '{:.2f}', 'mean_cost': '{:.0f}'}), hide_index=True)
+    delivery = cube.slice(['Price range', 'Has Online delivery'], {'Country': country})
+    st.markdown("<h3>Restaurants with online delivery per price range</h3>", unsafe_allow_html=True)
+    st.bar_chart(delivery.pivot(index='Price range', columns='Has Online delivery', values='restaurants'))
+
+    # Competitor Analysis: the landscape for one cuisine in the chosen city
+    st.markdown(f"<h2>Competitor Analysis: {city}</h2>", unsafe_allow_html=True)
+    cuisine = st.selectbox("Cuisine", cube.slice(['Cuisines'], {'City': city})['Cuisines'].tolist())
+    summary = cube.cell({'City': city, 'Cuisines': cuisine}) if cuisine is not None else None
+    if summary is None:
+        # An empty cell: the city has no restaurant with this cuisine (or no cuisines at all)
+        st.info(f"No restaurant in {city} serves {cuisine}." if cuisine is not None
+                else f"No cuisines are listed for {city}.")
+        return
+    col1, col2, col3 = st.columns(3)
+    col1.metric("Competitors", summary['restaurants'])
+    col2.metric("Mean rating", f"{summary['mean_rating']:.2f}" if summary['rated'] else "n/a")
+    col3.metric("Mean cost for two", f"{summary['mean_cost']:.0f}")
+    col1, col2 = st.columns(2)
+    with col1:
+        by_price = cube.slice(['Price range'], {'City': city, 'Cuisines': cuisine}).sort_values('Price range')
+        ranking_chart(by_price, 'Price range', 'restaurants', "Competitors per price range")
+    with col2:
+        ranking_chart(cube.slice(['Rating text'], {'City': city, 'Cuisines': cuisine}), 'Rating text',
+                      'restaurants', "Competitors per rating")
+
+
+if __name__ == "__main__":
+    Insights()
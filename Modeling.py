@@ -1,5 +1,14 @@
 import streamlit as st
 
+# Radio option -> model family key in training.MODEL_FAMILIES
+MODEL_OPTIONS = {
+    "Logistic Regression": "logistic_regression",
+    "K-Nearest Neighbors": "knn",
+    "K-Nearest Neighbors (ANN)": "knn_ann",
+    "Decision Tree": "decision_tree",
+    "Gradient Boosting (Histogram)": "hist_gradient_boosting",
+}
+
 def display_metrics(accuracy, precision, recall, f1_score, kappa):
     st.write(f"**Accuracy:** {accuracy:.4f}")
     st.write(f"**Precision:** {precision:.4f}")
@@ -7,50 +16,102 @@ def display_metrics(accuracy, precision, recall, f1_score, kappa):
     st.write(f"**F1 Score:** {f1_score:.4f}")
     st.write(f"**Cohen's Kappa:** {kappa:.4f}")
 
+def artifact_version(path):
+    # Retraining on the same data overwrites the same path, so the caches are keyed on the content too
+    from cache_utils import file_fingerprint
+    return file_fingerprint(path)
+
+@st.cache_resource(show_spinner="Loading model...")
+def load_model(path, version):
+    # One loaded artifact per file version, shared across reruns and sessions
+    from training import load_artifact
+    return load_artifact(path)
+
+@st.cache_resource(show_spinner="Evaluating model...")
+def model_results(path, version):
+    from training import evaluate_model
+    return evaluate_model(load_model(path, version))
+
+@st.cache_resource(show_spinner="Comparing models...")
+def model_comparison(paths):
+    # Keyed by the artifact paths and versions, so retraining any model refreshes the comparison
+    from training import compare_models
+    return compare_models([model_name for model_name, _, _ in paths])
+
+def display_metrics_bar(metrics, title):
+    import matplotlib.pyplot as plt
+
+    # Bar graph visualization for metrics
+    labels = ['Accuracy', 'Precision', 'Recall', 'F1 Score', "Cohen's Kappa"]
+    values = list(metrics.values())
+
+    fig, ax = plt.subplots(figsize=(10, 6))
+    ax.bar(labels, values, color='skyblue')
+    ax.set_xlabel('Metrics', fontsize=16, fontweight='bold')
+    ax.set_ylabel('Values', fontsize=16, fontweight='bold')
+    ax.set_title(title, fontsize=16, fontweight='bold')
+    for i, value in enumerate(values):
+        ax.text(i, value + 0.01, f"{value:.2f}", ha='center', fontsize=14)
+    st.pyplot(fig)
+    plt.close(fig)
+
+def display_roc_curves(roc_curves, title):
+    import matplotlib.pyplot as plt
+
+    # ROC curve and AUC for multiclass classification
+    fig, ax = plt.subplots(figsize=(12, 8))
+    for label, fpr, tpr, roc_auc in roc_curves:
+        ax.plot(fpr, tpr, label=f'Price range {label} (AUC = {roc_auc:.2f})')
+    ax.set_title(title, fontsize=16, fontweight='bold')
+    ax.set_xlabel('False Positive Rate', fontsize=16, fontweight='bold')
+    ax.set_ylabel('True Positive Rate', fontsize=16, fontweight='bold')
+    ax.legend(loc='lower right')
+    st.pyplot(fig)
+    plt.close(fig)
+
 def Modeling():
+    from training import find_artifact, is_stale, train_model
+
     st.sidebar.header("Select Model")
     model = st.sidebar.radio(
         "Choose a model:",
-        ("Logistic Regression", "K-Nearest Neighbors", "Decision Tree")
+        tuple(MODEL_OPTIONS)
     )
 
     st.header("Zomato Modeling")
+    st.subheader(f"{model} Results")
+
+    path = find_artifact(MODEL_OPTIONS[model])
+    if path is None:
+        st.info(f"No trained {model} model was found. Run `python training.py` or train it here.")
+        if not st.button(f"Train {model}"):
+            return
+        with st.spinner(f"Training {model}..."):
+            path = train_model(MODEL_OPTIONS[model])
+
+    artifact = load_model(path, artifact_version(path))
+    if is_stale(artifact):
+        # Its held-out rows are not rows of the current data, so it is not re-scored
+        st.warning(f"The saved {model} model was trained on an earlier version of the data "
+                   f"(on {artifact['trained_at']}); retrain it to evaluate it on the current data.")
+        st.caption(f"Best hyperparameters: {artifact['best_params']}")
+        if st.button(f"Retrain {model}"):
+            with st.spinner(f"Training {model}..."):
+                train_model(MODEL_OPTIONS[model])
+            st.rerun()
+    else:
+        metrics, roc_curves = model_results(path, artifact_version(path))
+        display_metrics(**metrics)
+        st.caption(f"Best hyperparameters: {artifact['best_params']} (trained {artifact['trained_at']})")
+        display_metrics_bar(metrics, f"{model} - Bar Graphs of Evaluation Metrics")
+        display_roc_curves(roc_curves, f"{model} - ROC AUC Curve")
 
-    if model == "Logistic Regression":
-        st.subheader("Logistic Regression Results")
-        display_metrics(
-            accuracy=0.7789,
-            precision=0.7702,
-            recall=0.7789,
-            f1_score=0.7714,
-            kappa=0.6583
-        )
-        st.image("logistic_bar.png", caption="Logistic Regression - Bar Graphs of Evaluation Metrics")
-        st.image("logistic_line.png", caption="Logistic Regression - ROC AUC Curve")
-    
-    elif model == "K-Nearest Neighbors":
-        st.subheader("K-Nearest Neighbors Results")
-        display_metrics(
-            accuracy=0.7119,
-            precision=0.7105,
-            recall=0.7119,
-            f1_score=0.7103,
-            kappa=0.5590
-        )
-        st.image("knn_bar.png", caption="K-Nearest Neighbors - Bar Graphs of Evaluation Metrics")
-        st.image("knn_line.png", caption="K-Nearest Neighbors - ROC AUC Curve")
-    
-    elif model == "Decision Tree":
-        st.subheader("Decision Tree Results")
-        display_metrics(
-            accuracy=0.9811,
-            precision=0.9813,
-            recall=0.9811,
-            f1_score=0.9812,
-            kappa=0.9712
-        )
-        st.image("tree_bar.png", caption="Decision Tree - Bar Graphs of Evaluation Metrics")
-        # st.image("tree_line.png", caption="Decision Tree - ROC AUC Curve")
+    st.subheader("Model Comparison")
+    if st.checkbox("Compare fit time, prediction latency and accuracy of the trained models"):
+        paths = tuple((model_name, find_artifact(model_name)) for model_name in MODEL_OPTIONS.values())
+        comparison = model_comparison(tuple((name, path, artifact_version(path)) for name, path in paths if path))
+        st.dataframe(comparison.style.format({'fit_seconds': '{:.3f}', 'predict_ms_per_1000': '{:.2f}',
+                                              'accuracy': '{:.4f}', 'artifact_mb': '{:.2f}'}))
 
 if __name__ == "__main__":
     Modeling()
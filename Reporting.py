@@ -1,21 +1,198 @@
 # Import necessary libraries
-import pandas as pd
-import seaborn as sns
-from ydata_profiling import ProfileReport
+import glob
+import os
+import threading
 import streamlit as st
+from cache_utils import atomic_write, cache_path, file_fingerprint
 
-# Load the dataset
-df = pd.read_csv('zomato.csv', encoding='latin-1')
+DATA_FILE = os.environ.get('ZOMATO_DATA_FILE', 'zomato.csv')
+REPORT_TITLE = 'Zomato Dataset Profiling Report'
 
-# Generate the profiling report
-profile = ProfileReport(df, title='Zomato Dataset Profiling Report', explorative=True)
+# Reports currently being rebuilt in a background thread, keyed by data hash
+_builds_in_progress = set()
+_builds_lock = threading.Lock()
+
+
+def report_path(data_hash):
+    return cache_path('reports', f'Zomato-{data_hash}.html')
+
+
+def latest_report():
+    # Most recently written report for any version of the data, if one exists
+    reports = glob.glob(cache_path('reports', 'Zomato-*.html'))
+    return max(reports, key=os.path.getmtime) if reports else None
+
+
+def build_report(data_hash):
+    # Heavy imports are deferred so importing this page stays cheap
+    from ydata_profiling import ProfileReport
+    from data_access import load_zomato
+
+    # Load the dataset and generate the profiling report
+    df = load_zomato(DATA_FILE)
+    profile = ProfileReport(df, title=REPORT_TITLE, explorative=True)
+
+    # Save the report keyed by the hash of the data it was built from
+    html = profile.to_html()
+    atomic_write(report_path(data_hash), html.encode('utf-8'))
+    return html
+
+
+def _build_in_background(data_hash):
+    try:
+        build_report(data_hash)
+    finally:
+        with _builds_lock:
+            _builds_in_progress.discard(data_hash)
+
+
+def rebuild_in_background(data_hash):
+    with _builds_lock:
+        if data_hash in _builds_in_progress:
+            return
+        _builds_in_progress.add(data_hash)
+    threading.Thread(target=_build_in_background, args=(data_hash,), daemon=True).start()
+
+
+@st.cache_resource(show_spinner=False)
+def load_report(path):
+    # One copy of each report per process, shared across reruns and sessions
+    with open(path, encoding='utf-8') as f:
+        return f.read()
+
+
+def get_report_html():
+    """
+    Returns the profiling report for the current zomato.csv, building it only when needed.
+
+    A report already on disk for the current data hash is reused as-is. When the data has
+    changed, the previous report is served while the new one is rebuilt in the background.
+    """
+    data_hash = file_fingerprint(DATA_FILE)
+    path = report_path(data_hash)
+    if os.path.exists(path):
+        return load_report(path), False
+
+    stale_path = latest_report()
+    if stale_path is not None:
+        rebuild_in_background(data_hash)
+        return load_report(stale_path), True
+
+    # No report at all yet: build the first one in the foreground
+    with st.spinner('Generating the profiling report for the first time...'):
+        build_report(data_hash)
+    return load_report(path), False
+
+
+# Report option -> profiling mode, or 'ydata' for the ydata-profiling HTML report
+REPORT_OPTIONS = {
+    'Quick profile (sampled rows)': 'quick',
+    'Full profile': 'full',
+    'ydata-profiling report': 'ydata',
+}
+
+
+@st.cache_resource(show_spinner=False)
+def load_profile(path):
+    from profiling import load_profile
+    return load_profile(path)
+
+
+def render_overview(overview):
+    col1, col2, col3, col4 = st.columns(4)
+    col1.metric('Rows', f"{overview['rows']:,}")
+    col2.metric('Columns', overview['columns'])
+    col3.metric('Missing cells', f"{overview['missing_cells']:,} ({overview['missing_cells_pct']:.2f}%)")
+    col4.metric('Duplicate rows', f"{overview['duplicate_rows']:,}")
+    if overview['profiled_rows'] < overview['rows']:
+        st.caption(f"Column statistics are estimated on a random sample of {overview['profiled_rows']:,} rows.")
+
+
+def render_column(name, profile):
+    import pandas as pd
+
+    with st.expander(f"{name} ({profile['dtype']})"):
+        col1, col2, col3 = st.columns(3)
+        col1.metric('Missing', f"{profile['missing']:,} ({profile['missing_pct']:.1f}%)")
+        col2.metric('Distinct', f"{profile['distinct']:,}")
+        col3.metric('Memory', f"{profile['memory_bytes'] / 1024:.0f} KB")
+        if 'stats' in profile:
+            st.dataframe(pd.DataFrame([profile['stats']]), hide_index=True)
+        if 'histogram' in profile:
+            edges = profile['histogram']['edges']
+            st.bar_chart(pd.Series(profile['histogram']['counts'],
+                                   index=[f"{low:.4g} - {high:.4g}" for low, high in zip(edges, edges[1:])]))
+        elif profile['top_values']:
+            top = pd.Series(dict((str(value), count) for value, count in profile['top_values']))
+            st.bar_chart(top, horizontal=True)
+
+
+def render_correlations(correlations):
+    import pandas as pd
+
+    if not correlations:
+        return
+    st.header('Correlations')
+    for tab, (method, matrix) in zip(st.tabs([method.title() for method in correlations]), correlations.items()):
+        with tab:
+            st.dataframe(pd.DataFrame(matrix['values'], index=matrix['columns'], columns=matrix['columns'])
+                         .style.format('{:.2f}'))
+
+
+def render_profile(mode):
+    """
+    Shows the native profile of the current zomato.csv.
+
+    A saved profile is rendered from its JSON file. Otherwise the columns are profiled in
+    parallel and every section is drawn, in place, as soon as it is computed.
+    """
+    from profiling import build_profile, profile_path, save_profile
+    path = profile_path(file_fingerprint(DATA_FILE), mode)
+    if os.path.exists(path):
+        profile = load_profile(path)
+        render_overview(profile['overview'])
+        st.header('Columns')
+        for name, column_profile in profile['columns'].items():
+            render_column(name, column_profile)
+        render_correlations(profile['correlations'])
+        st.caption(f"Profiled in {profile['seconds']:.2f}s on {profile['generated_at']}")
+        return
+
+    from data_access import load_zomato
+    data = load_zomato(DATA_FILE)
+    # One slot per section in report order; columns arrive in completion order
+    overview_slot = st.container()
+    st.header('Columns')
+    column_slots = {column: st.empty() for column in data.columns}
+    correlations_slot = st.container()
+
+    def render_section(section, name, value):
+        if section == 'overview':
+            with overview_slot:
+                render_overview(value)
+        elif section == 'column':
+            with column_slots[name].container():
+                render_column(name, value)
+        else:
+            with correlations_slot:
+                render_correlations(value)
+
+    with st.spinner('Profiling the dataset...'):
+        profile = build_profile(data, mode, title=REPORT_TITLE, on_section=render_section)
+    save_profile(profile, path)
 
-# Save the report as an HTML file
-profile.to_file("Zomato.html")
 
 # Streamlit application function
 def Reporting():
     st.title('Zomato Report')
-    # Display the report within the Streamlit app
-    st.components.v1.html(profile.to_html(), height=800)
+    report = st.radio('Report', tuple(REPORT_OPTIONS), horizontal=True)
+    if REPORT_OPTIONS[report] != 'ydata':
+        render_profile(REPORT_OPTIONS[report])
+        return
 
+    html, is_stale = get_report_html()
+    if is_stale:
+        st.info('The dataset has changed; the report is being regenerated in the background. '
+                'Showing the previous report until it is ready.')
+    # Display the report within the Streamlit app
+    st.components.v1.html(html, height=800)
@@ -0,0 +1,269 @@
+# aggregate_cube.py
+import argparse
+import functools
+import itertools
+import os
+import time
+import numpy as np
+import pandas as pd
+import pyarrow.feather as feather
+from cache_utils import atomic_open, cache_path
+from pipeline import load_clean_data, rated_mask, stage_fingerprints
+
+# Bump when the dimensions, measures or file layout change
+CUBE_VERSION = 1
+
+DIMENSIONS = ['Country', 'City', 'Cuisines', 'Price range', 'Has Online delivery', 'Rating text']
+
+# Cuboids group by every combination of up to MAX_DIMENSIONS dimensions
+MAX_DIMENSIONS = 3
+
+MEASURES = ['restaurants', 'rated', 'rating_sum', 'votes', 'cost_sum']
+
+
+def _label(value):
+    # Dimension values are stored as text; whole numbers such as a Price range of 2.0 as '2'
+    if isinstance(value, (float, np.floating)) and float(value).is_integer():
+        return str(int(value))
+    return str(value)
+
+
+def cuboids(dimensions=DIMENSIONS, max_dimensions=MAX_DIMENSIONS):
+    """
+    Returns the dimension combinations the cube precomputes, the empty one (grand total) first.
+    """
+    return [combination for size in range(max_dimensions + 1)
+            for combination in itertools.combinations(dimensions, size)]
+
+
+def build_cube(data):
+    """
+    Aggregates the restaurants over every cuboid.
+
+    Cuisines is multi-label: in cuboids that include it, a restaurant counts once for each of
+    its cuisines. Measures are additive (counts and sums), so any cell can be rolled up.
+
+    Parameters:
+    data (pd.DataFrame): The cleaned restaurant data.
+
+    Returns:
+    pd.DataFrame: One row per non-empty cell: a 'cuboid' bit mask of the grouped dimensions
+    (bit i for DIMENSIONS[i]), the dimension values (missing where not grouped) and the
+    measures restaurants, rated, rating_sum, votes and cost_sum.
+    """
+    from cuisine_index import split_cuisines
+
+    rated = rated_mask(data)
+    base = pd.DataFrame({dimension: data[dimension].astype('category').cat.rename_categories(_label)
+                         for dimension in DIMENSIONS if dimension != 'Cuisines'})
+    base['restaurants'] = 1
+    base['rated'] = rated.astype(np.int64)
+    base['rating_sum'] = np.where(rated, data['Aggregate rating'].to_numpy(dtype=np.float64), 0.0)
+    base['votes'] = data['Votes'].to_numpy(dtype=np.int64)
+    base['cost_sum'] = data['Average Cost for two'].to_numpy(dtype=np.float64)
+
+    # One row per (restaurant, cuisine) for the cuboids grouped by cuisine
+    incidence, names = split_cuisines(data['Cuisines'])
+    rows, columns = incidence.nonzero()
+    exploded = base.iloc[rows].reset_index(drop=True)
+    exploded['Cuisines'] = pd.Categorical.from_codes(columns, categories=names)
+
+    cells = []
+    for combination in cuboids():
+        source = exploded if 'Cuisines' in combination else base
+        if combination:
+            cell = source.groupby(list(combination), observed=True, sort=True)[MEASURES].sum().reset_index()
+        else:
+            cell = source[MEASURES].sum().to_frame().T
+        cell.insert(0, 'cuboid', sum(1 << DIMENSIONS.index(dimension) for dimension in combination))
+        cells.append(cell)
+    cube = pd.concat(cells, ignore_index=True)
+
+    # Dictionary-encoded dimensions and narrow measures keep the file compact
+    for dimension in DIMENSIONS:
+        cube[dimension] = cube[dimension].astype(str).where(cube[dimension].notna()).astype('category')
+    cube = cube[['cuboid'] + DIMENSIONS + MEASURES]
+    return cube.astype({'cuboid': np.int16, 'restaurants': np.int32, 'rated': np.int32, 'votes': np.int64})
+
+
+class AggregateCube:
+    """
+    Slice and dice queries on a precomputed aggregate cube.
+
+    Every cuboid is held as integer dimension codes and measure arrays, so a query filters
+    one small cuboid with NumPy instead of grouping the restaurants. Single cells are also
+    reachable through a dictionary lookup.
+
+    Parameters:
+    cube (pd.DataFrame): Output of build_cube().
+    """
+
+    def __init__(self, cube):
+        self.values = {dimension: list(cube[dimension].cat.categories) for dimension in DIMENSIONS}
+        self._codes = {dimension: {value: code for code, value in enumerate(values)}
+                       for dimension, values in self.values.items()}
+        self._cuboids = {}
+        self._cells = {}
+        for mask, cells in cube.groupby('cuboid', sort=False):
+            dimensions = tuple(dimension for i, dimension in enumerate(DIMENSIONS) if mask & (1 << i))
+            codes = {dimension: cells[dimension].cat.codes.to_numpy() for dimension in dimensions}
+            measures = {measure: cells[measure].to_numpy() for measure in MEASURES}
+            self._cuboids[frozenset(dimensions)] = (dimensions, codes, measures)
+            keys = zip(*(cells[dimension].astype(str).tolist() for dimension in dimensions))
+            for position, key in enumerate(keys):
+                self._cells[(frozenset(dimensions), key)] = (measures, position)
+
+    def _cuboid(self, dimensions):
+        dimensions = frozenset(dimensions)
+        if dimensions not in self._cuboids:
+            raise ValueError(f"The cube has no cuboid for {sorted(dimensions)}; "
+                             f"at most {MAX_DIMENSIONS} dimensions can be combined")
+        return self._cuboids[dimensions]
+
+    def cell(self, coordinates):
+        """
+        Returns the measures of one cell, e.g. {'City': 'New Delhi', 'Cuisines': 'Chinese'}.
+
+        Returns:
+        dict: The measures plus mean_rating and mean_cost; None for an empty cell.
+        """
+        self._cuboid(coordinates)
+        dimensions = tuple(dimension for dimension in DIMENSIONS if dimension in coordinates)
+        found = self._cells.get((frozenset(dimensions), tuple(_label(coordinates[dimension]) for dimension in dimensions)))
+        if found is None:
+            return None
+        measures, position = found
+        result = {measure: measures[measure][position].item() for measure in MEASURES}
+        result['mean_rating'] = result['rating_sum'] / result['rated'] if result['rated'] else float('nan')
+        result['mean_cost'] = result['cost_sum'] / result['restaurants']
+        return result
+
+    def slice(self, by, where=None, sort_by='restaurants', top=None):
+        """
+        Aggregates the measures by some dimensions over the cells matching a filter.
+
+        Parameters:
+        by (list of str): Dimensions of the result rows.
+        where (dict): Dimension -> value, or list of values, the cells must match. Several
+            values are rolled up together; for Cuisines a restaurant then counts once per
+            matching cuisine.
+        sort_by (str): Result column sorted in decreasing order.
+        top (int): Keep only the first rows.
+
+        Returns:
+        pd.DataFrame: One row per combination of the `by` values with restaurants, rated,
+        votes, mean_rating and mean_cost.
+        """
+        where = where or {}
+        _, codes, measures = self._cuboid(set(by) | set(where))
+        keep = np.ones(len(measures['restaurants']), dtype=bool)
+        for dimension, values in where.items():
+            values = values if isinstance(values, (list, tuple, set)) else [values]
+            lookup = self._codes[dimension]
+            keep &= np.isin(codes[dimension], [lookup[_label(value)] for value in values if _label(value) in lookup])
+
+        # Roll the matching cells up to the `by` dimensions with integer keys and bincount
+        if by:
+            keys = np.ravel_multi_index([codes[dimension][keep] for dimension in by], [len(self.values[dimension]) for dimension in by])
+            keys, group = np.unique(keys, return_inverse=True)
+        else:
+            keys, group = np.zeros(1, dtype=np.int64), np.zeros(int(keep.sum()), dtype=np.int64)
+        totals = {measure: np.bincount(group, weights=measures[measure][keep], minlength=len(keys))
+                  for measure in MEASURES}
+        columns = {}
+        if by:
+            by_codes = np.unravel_index(keys, [len(self.values[dimension]) for dimension in by])
+            for dimension, code in zip(by, by_codes):
+                columns[dimension] = np.asarray(self.values[dimension], dtype=object)[code]
+        columns['restaurants'] = totals['restaurants'].astype(np.int64)
+        columns['rated'] = totals['rated'].astype(np.int64)
+        columns['votes'] = totals['votes'].astype(np.int64)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            columns['mean_rating'] = np.where(totals['rated'] > 0, totals['rating_sum'] / totals['rated'], np.nan)
+            columns['mean_cost'] = totals['cost_sum'] / totals['restaurants']
+        order = np.argsort(-columns[sort_by], kind='stable')[:top]
+        return pd.DataFrame({column: values[order] for column, values in columns.items()})
+
+
+def cube_path(data_fingerprint):
+    return cache_path('cube', f'cube-v{CUBE_VERSION}-{data_fingerprint}.feather')
+
+
+def save_cube(cube, path):
+    with atomic_open(path) as f:
+        feather.write_feather(cube, f, compression='zstd')
+
+
+@functools.lru_cache(maxsize=2)
+def get_cube(data_fingerprint=None):
+    """
+    Returns the AggregateCube of a dataset version, building and saving it on first use.
+
+    Parameters:
+    data_fingerprint (str): Fingerprint of the cleaned data; the current one by default.
+    """
+    if data_fingerprint is None:
+        return get_cube(stage_fingerprints()['cleaned'])
+    path = cube_path(data_fingerprint)
+    if not os.path.exists(path):
+        save_cube(build_cube(load_clean_data()), path)
+    return AggregateCube(feather.read_feather(path))
+
+
+def benchmark(repeat=1000):
+    """
+    Times building the cube and typical queries against the equivalent pandas group-bys.
+
+    Returns:
+    dict: Build seconds, file size and cell count, and microseconds per query for the cube
+    and for the group-by on the cleaned data.
+    """
+    data = load_clean_data()
+    start = time.perf_counter()
+    table = build_cube(data)
+    result = {'build_seconds': time.perf_counter() - start, 'cells': len(table)}
+    path = cube_path(stage_fingerprints()['cleaned'])
+    save_cube(table, path)
+    result['file_kb'] = os.path.getsize(path) / 1024
+    cube = AggregateCube(table)
+
+    def timed(query, runs):
+        query()
+        start = time.perf_counter()
+        for _ in range(runs):
+            query()
+        return (time.perf_counter() - start) * 1e6 / runs
+
+    # The same measures computed with pandas on the cleaned rows
+    frame = data.assign(rated=rated_mask(data))
+    frame['rating'] = frame['Aggregate rating'].where(frame['rated'])
+
+    def pandas_slice(by, where):
+        rows = frame
+        for dimension, value in where.items():
+            rows = rows[rows[dimension] == value]
+        return rows.groupby(by, observed=True).agg(
+            restaurants=('Votes', 'size'), rated=('rated', 'sum'), votes=('Votes', 'sum'),
+            mean_rating=('rating', 'mean'), mean_cost=('Average Cost for two', 'mean'),
+        ).sort_values('restaurants', ascending=False).reset_index()
+
+    queries = {
+        'cell': (lambda: cube.cell({'City': 'New Delhi', 'Price range': 2}),
+                 lambda: pandas_slice(['City', 'Price range'], {'City': 'New Delhi', 'Price range': 2})),
+        'cities_in_country': (lambda: cube.slice(['City'], {'Country': 'India'}),
+                              lambda: pandas_slice(['City'], {'Country': 'India'})),
+        'price_by_delivery': (lambda: cube.slice(['Price range', 'Has Online delivery']),
+                              lambda: pandas_slice(['Price range', 'Has Online delivery'], {})),
+    }
+    for name, (cube_query, pandas_query) in queries.items():
+        result[f'{name}_cube_us'] = timed(cube_query, repeat)
+        result[f'{name}_pandas_us'] = timed(pandas_query, max(repeat // 10, 1))
+    return result
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build the aggregate cube and time queries against it")
+    parser.add_argument('--repeat', type=int, default=1000)
+    args = parser.parse_args()
+    for key, value in benchmark(args.repeat).items():
+        print(f'{key}: {value:.1f}' if isinstance(value, float) else f'{key}: {value}')
@@ -0,0 +1,254 @@
+# ann_index.py
+import argparse
+import math
+import time
+import numpy as np
+import scipy.sparse as sp
+from sklearn.base import BaseEstimator, ClassifierMixin
+from sklearn.neighbors import NearestNeighbors
+
+# Queries searched at a time; bounds the candidate arrays to QUERY_CHUNK x (n_trees * leaf size)
+QUERY_CHUNK = 1024
+
+
+def _row_dots(X, rows, Q, query_rows):
+    # Dot products X[rows[i]] . Q[query_rows[i]] for every pair i, sparse or dense
+    if sp.issparse(X):
+        return np.asarray(X[rows].multiply(Q[query_rows]).sum(axis=1)).ravel()
+    return np.einsum('ij,ij->i', X[rows], Q[query_rows])
+
+
+def _squared_norms(X):
+    if sp.issparse(X):
+        return np.asarray(X.multiply(X).sum(axis=1)).ravel()
+    return np.einsum('ij,ij->i', X, X)
+
+
+class RandomProjectionForest:
+    """
+    Approximate nearest-neighbour index made of random projection trees.
+
+    Each tree projects the points on a few random Gaussian directions and splits every node
+    at the median of one of them, level by level, until leaves hold about leaf_size points.
+    A query descends every tree to one leaf; the union of those leaves is re-ranked with
+    exact Euclidean distances. Trees are built and queried for all points at once with
+    NumPy, and sparse matrices are never densified.
+
+    Parameters:
+    n_trees (int): Number of trees; more trees raise recall and query cost.
+    leaf_size (int): Target number of points per leaf.
+    n_directions (int): Random directions per tree that the nodes choose from.
+    random_state (int): Seed of the directions and of the per-node choices.
+    """
+
+    def __init__(self, n_trees=10, leaf_size=32, n_directions=16, random_state=0):
+        self.n_trees = n_trees
+        self.leaf_size = leaf_size
+        self.n_directions = n_directions
+        self.random_state = random_state
+
+    def fit(self, X):
+        self.X_ = X.tocsr() if sp.issparse(X) else np.asarray(X)
+        self.norms_ = _squared_norms(self.X_)
+        rng = np.random.default_rng(self.random_state)
+        n = self.X_.shape[0]
+        depth = max(0, math.ceil(math.log2(max(n / self.leaf_size, 1))))
+        self.trees_ = [self._build_tree(rng, depth) for _ in range(self.n_trees)]
+        return self
+
+    def _build_tree(self, rng, depth):
+        n = self.X_.shape[0]
+        directions = rng.standard_normal((self.X_.shape[1], self.n_directions)).astype(np.float32)
+        projections = np.asarray(self.X_ @ directions)
+        node = np.zeros(n, dtype=np.int64)
+        choices, thresholds = [], []
+        for level in range(depth):
+            n_nodes = 1 << level
+            choice = rng.integers(self.n_directions, size=n_nodes)
+            values = projections[np.arange(n), choice[node]]
+            # Median split of every node: the upper half of each node's sorted values goes right
+            order = np.lexsort((values, node))
+            counts = np.bincount(node, minlength=n_nodes)
+            starts = np.cumsum(counts) - counts
+            rank = np.empty(n, dtype=np.int64)
+            rank[order] = np.arange(n) - starts[node[order]]
+            split_position = starts + counts // 2
+            threshold = np.full(n_nodes, np.inf)
+            has_points = counts > 0
+            threshold[has_points] = values[order[split_position[has_points]]]
+            choices.append(choice)
+            thresholds.append(threshold)
+            node = node * 2 + (rank >= counts[node] // 2)
+
+        # Leaf table: the member rows of every leaf, padded with -1
+        n_leaves = 1 << depth
+        order = np.argsort(node, kind='stable')
+        counts = np.bincount(node, minlength=n_leaves)
+        starts = np.cumsum(counts) - counts
+        table = np.full((n_leaves, max(int(counts.max()), 1)), -1, dtype=np.int64)
+        table[node[order], np.arange(n) - starts[node[order]]] = order
+        return {'directions': directions, 'choices': choices, 'thresholds': thresholds, 'leaves': table}
+
+    def _candidates(self, Q):
+        candidates = []
+        for tree in self.trees_:
+            projections = np.asarray(Q @ tree['directions'])
+            node = np.zeros(Q.shape[0], dtype=np.int64)
+            for choice, threshold in zip(tree['choices'], tree['thresholds']):
+                values = projections[np.arange(len(node)), choice[node]]
+                node = node * 2 + (values >= threshold[node])
+            candidates.append(tree['leaves'][node])
+        return np.hstack(candidates)
+
+    def kneighbors(self, Q, n_neighbors=5):
+        """
+        Returns the approximate nearest training rows of a batch of queries, searched
+        QUERY_CHUNK queries at a time.
+
+        Returns:
+        tuple: (distances, indices), both (n_queries, n_neighbors), closest first; missing
+        neighbours (fewer candidates than n_neighbors) have index -1 and distance inf.
+        """
+        Q = Q.tocsr() if sp.issparse(Q) else np.asarray(Q)
+        if Q.shape[0] <= QUERY_CHUNK:
+            return self._kneighbors_chunk(Q, n_neighbors)
+        chunks = [self._kneighbors_chunk(Q[start:start + QUERY_CHUNK], n_neighbors)
+                  for start in range(0, Q.shape[0], QUERY_CHUNK)]
+        return np.vstack([distances for distances, _ in chunks]), np.vstack([indices for _, indices in chunks])
+
+    def _kneighbors_chunk(self, Q, n_neighbors):
+        candidates = np.sort(self._candidates(Q), axis=1)
+        # The same row reached through several trees is only counted once
+        duplicate = np.zeros(candidates.shape, dtype=bool)
+        duplicate[:, 1:] = candidates[:, 1:] == candidates[:, :-1]
+        valid = (candidates >= 0) & ~duplicate
+
+        query_rows, slots = np.nonzero(valid)
+        rows = candidates[query_rows, slots]
+        distances = np.full(candidates.shape, np.inf)
+        distances[query_rows, slots] = (self.norms_[rows] + _squared_norms(Q)[query_rows]
+                                        - 2 * _row_dots(self.X_, rows, Q, query_rows))
+
+        k = min(n_neighbors, candidates.shape[1])
+        nearest = np.argpartition(distances, k - 1, axis=1)[:, :k]
+        nearest_distances = np.take_along_axis(distances, nearest, axis=1)
+        by_distance = np.argsort(nearest_distances, axis=1, kind='stable')
+        nearest = np.take_along_axis(nearest, by_distance, axis=1)
+        nearest_distances = np.take_along_axis(nearest_distances, by_distance, axis=1)
+        indices = np.where(np.isfinite(nearest_distances), np.take_along_axis(candidates, nearest, axis=1), -1)
+        return np.sqrt(np.maximum(nearest_distances, 0)), indices
+
+
+class ExactIndex:
+    """
+    Exact brute-force neighbour search with the RandomProjectionForest interface.
+    """
+
+    def fit(self, X):
+        self.index_ = NearestNeighbors(algorithm='brute').fit(X)
+        return self
+
+    def kneighbors(self, Q, n_neighbors=5):
+        return self.index_.kneighbors(Q, n_neighbors=n_neighbors)
+
+
+# Backend name -> index factory taking the classifier's index parameters
+ANN_BACKENDS = {
+    'rp_forest': lambda n_trees, leaf_size, random_state: RandomProjectionForest(
+        n_trees=n_trees, leaf_size=leaf_size, random_state=random_state),
+    'exact': lambda n_trees, leaf_size, random_state: ExactIndex(),
+}
+
+
+class ANNKNeighborsClassifier(BaseEstimator, ClassifierMixin):
+    """
+    K-nearest-neighbours classifier on a pluggable neighbour index.
+
+    The index is built once by fit() and pickled with the classifier, so it is saved in the
+    model artifact. Predictions are the uniform vote of the neighbours, as with
+    KNeighborsClassifier.
+
+    Parameters:
+    n_neighbors (int): Number of neighbours voting.
+    backend (str): Key of ANN_BACKENDS.
+    n_trees (int): Trees of the random projection forest.
+    leaf_size (int): Points per leaf of the random projection forest.
+    random_state (int): Seed of the index.
+    """
+
+    def __init__(self, n_neighbors=5, backend='rp_forest', n_trees=10, leaf_size=32, random_state=0):
+        self.n_neighbors = n_neighbors
+        self.backend = backend
+        self.n_trees = n_trees
+        self.leaf_size = leaf_size
+        self.random_state = random_state
+
+    def fit(self, X, y):
+        self.classes_, self.y_ = np.unique(y, return_inverse=True)
+        self.index_ = ANN_BACKENDS[self.backend](self.n_trees, self.leaf_size, self.random_state).fit(X)
+        return self
+
+    def predict_proba(self, X):
+        _, indices = self.index_.kneighbors(X, n_neighbors=self.n_neighbors)
+        found = indices >= 0
+        votes = np.zeros((indices.shape[0], len(self.classes_)))
+        query_rows = np.repeat(np.arange(indices.shape[0]), found.sum(axis=1))
+        np.add.at(votes, (query_rows, self.y_[indices[found]]), 1)
+        return votes / np.maximum(votes.sum(axis=1, keepdims=True), 1)
+
+    def predict(self, X):
+        return self.classes_[self.predict_proba(X).argmax(axis=1)]
+
+
+def benchmark(n_neighbors=5, tree_counts=(1, 5, 10, 20), leaf_size=32, data=None):
+    """
+    Compares the random projection forest with exact search on the training features.
+
+    Returns:
+    list of dict: Per number of trees, recall@k against exact neighbours, milliseconds per
+    query in a batch of all test rows and the test accuracy; the exact search comes first.
+    """
+    from sklearn.metrics import accuracy_score
+    from pipeline import load_clean_data
+    from training import prepare_data
+    prepared = prepare_data(load_clean_data() if data is None else data)
+    X_train, X_test, y_train, y_test = (prepared['X_train'], prepared['X_test'],
+                                        prepared['y_train'], prepared['y_test'])
+
+    results = []
+    exact = ExactIndex().fit(X_train)
+    start = time.perf_counter()
+    _, exact_indices = exact.kneighbors(X_test, n_neighbors)
+    exact_ms = (time.perf_counter() - start) * 1000 / X_test.shape[0]
+    exact_model = ANNKNeighborsClassifier(n_neighbors, backend='exact').fit(X_train, y_train)
+    results.append({'index': 'exact', 'recall': 1.0, 'ms_per_query': exact_ms,
+                    'accuracy': accuracy_score(y_test, exact_model.predict(X_test))})
+
+    for n_trees in tree_counts:
+        start = time.perf_counter()
+        model = ANNKNeighborsClassifier(n_neighbors, n_trees=n_trees, leaf_size=leaf_size).fit(X_train, y_train)
+        build_seconds = time.perf_counter() - start
+        start = time.perf_counter()
+        _, indices = model.index_.kneighbors(X_test, n_neighbors)
+        ms = (time.perf_counter() - start) * 1000 / X_test.shape[0]
+        hits = sum(len(np.intersect1d(found, truth)) for found, truth in zip(indices, exact_indices))
+        results.append({'index': f'rp_forest({n_trees} trees)', 'recall': hits / exact_indices.size,
+                        'ms_per_query': ms, 'build_seconds': build_seconds,
+                        'accuracy': accuracy_score(y_test, model.predict(X_test))})
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Recall and latency of the ANN index against exact KNN")
+    parser.add_argument('--k', type=int, default=5)
+    parser.add_argument('--trees', type=int, nargs='+', default=[1, 5, 10, 20])
+    parser.add_argument('--leaf-size', type=int, default=32)
+    parser.add_argument('--data', help="a Zomato-schema CSV to benchmark on instead of zomato.csv")
+    args = parser.parse_args()
+    data = None
+    if args.data:
+        from pipeline import load_clean_data
+        data = load_clean_data(args.data)
+    for result in benchmark(args.k, args.trees, args.leaf_size, data):
+        print(', '.join(f'{key}: {value:.4f}' if isinstance(value, float) else f'{key}: {value}'
+                        for key, value in result.items()))
@@ -0,0 +1,243 @@
+# benchmarks.py
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+import numpy as np
+from cache_utils import atomic_write, cache_path
+from synthetic_data import generate
+
+SOURCE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'zomato.csv')
+SIZES = (10_000, 100_000, 1_000_000)
+
+# A result this much slower, or this much larger in peak memory, than the baseline is a regression
+TIME_TOLERANCE = 0.25
+MEMORY_TOLERANCE = 0.25
+
+# Timing differences below this many seconds are noise, whatever the ratio
+MIN_TIME_DELTA = 0.05
+
+
+def baseline_path():
+    return cache_path('benchmarks', 'baseline.json')
+
+
+def synthetic_dataset(n_rows, seed=0):
+    """
+    Writes (once) a synthetic Zomato-schema CSV of n_rows rows with the distributions of
+    zomato.csv. The same (n_rows, seed) always gives the same file.
+
+    Returns:
+    str: Path of the CSV file.
+    """
+    path = cache_path('benchmarks', 'data', f'zomato-{n_rows}-{seed}.csv')
+    if not os.path.exists(path):
+        generate(n_rows, path, seed, source=SOURCE_FILE)
+    return path
+
+
+# Each setup function loads what its step needs (untimed) and returns the step to time
+
+def setup_csv_load(path):
+    from data_access import load_zomato
+    return lambda: load_zomato(path)
+
+
+def setup_merge(path):
+    from data_access import load_country_codes, load_zomato
+    from pipeline import merge_country_codes
+    data, df_country = load_zomato(path), load_country_codes()
+    return lambda: merge_country_codes(data, df_country)
+
+
+def setup_cleaning(path):
+    from data_access import load_country_codes, load_zomato
+    from pipeline import (cast_categories, drop_null_rows, drop_sparse_columns, drop_unused_columns,
+                          merge_country_codes, split_locality)
+    merged = merge_country_codes(load_zomato(path), load_country_codes())
+
+    def clean():
+        return drop_null_rows(drop_sparse_columns(cast_categories(drop_unused_columns(split_locality(merged)))))
+    return clean
+
+
+def _clean_data(path):
+    from pipeline import load_clean_data
+    return load_clean_data(path)
+
+
+def setup_category_collapse(path):
+    from categories import TOP_N_COLUMNS, TopNCollapser
+    data = _clean_data(path)
+    return lambda: TopNCollapser(TOP_N_COLUMNS, top_n=10).fit_transform(data)
+
+
+def setup_correlation(path):
+    from correlation import correlation_matrices
+    numeric_data = _clean_data(path).select_dtypes(include=[np.number])
+    return lambda: correlation_matrices(numeric_data)
+
+
+def setup_model_fit(family):
+    def setup(path):
+        from training import MODEL_FAMILIES, prepare_data
+        prepared = prepare_data(_clean_data(path))
+        return lambda: MODEL_FAMILIES[family][1]().fit(prepared['X_train'], prepared['y_train'])
+    return setup
+
+
+def setup_model_predict(family):
+    def setup(path):
+        from training import MODEL_FAMILIES, prepare_data
+        prepared = prepare_data(_clean_data(path))
+        model = MODEL_FAMILIES[family][1]().fit(prepared['X_train'], prepared['y_train'])
+        return lambda: model.predict(prepared['X_test'])
+    return setup
+
+
+def setup_exploration_render(path):
+    # End-to-end script run of the Exploration page, including its figure workers
+    from streamlit.testing.v1 import AppTest
+
+    def render():
+        app = AppTest.from_string('from Exploration import Exploration\nExploration()', default_timeout=3600)
+        app.run()
+        if app.exception:
+            raise RuntimeError(app.exception[0].message)
+    return render
+
+
+# Benchmark name -> (setup function, largest dataset size it runs on or None)
+BENCHMARKS = {
+    'csv_load': (setup_csv_load, None),
+    'merge': (setup_merge, None),
+    'cleaning': (setup_cleaning, None),
+    'category_collapse': (setup_category_collapse, None),
+    'correlation': (setup_correlation, None),
+    'fit_logistic_regression': (setup_model_fit('logistic_regression'), None),
+    'predict_logistic_regression': (setup_model_predict('logistic_regression'), None),
+    'fit_knn': (setup_model_fit('knn'), None),
+    'predict_knn': (setup_model_predict('knn'), 100_000),
+    'fit_knn_ann': (setup_model_fit('knn_ann'), None),
+    'predict_knn_ann': (setup_model_predict('knn_ann'), None),
+    'fit_decision_tree': (setup_model_fit('decision_tree'), None),
+    'predict_decision_tree': (setup_model_predict('decision_tree'), None),
+    'fit_hist_gradient_boosting': (setup_model_fit('hist_gradient_boosting'), None),
+    'predict_hist_gradient_boosting': (setup_model_predict('hist_gradient_boosting'), None),
+    'exploration_render': (setup_exploration_render, 100_000),
+}
+
+
+def _peak_rss_mb():
+    # ru_maxrss is in kilobytes on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def _run_child(name, path):
+    # Runs in a fresh interpreter with an empty cache directory, so every step is a cold start
+    step = BENCHMARKS[name][0](path)
+    setup_rss = _peak_rss_mb()
+    start = time.perf_counter()
+    step()
+    seconds = time.perf_counter() - start
+    return {'seconds': seconds, 'peak_rss_mb': _peak_rss_mb(), 'setup_rss_mb': setup_rss}
+
+
+def run_one(name, n_rows, seed=0):
+    """
+    Times one benchmark on one synthetic dataset size in a separate process.
+
+    Returns:
+    dict: Wall seconds of the step, peak RSS of the process and its RSS after setup, in MB.
+    """
+    path = synthetic_dataset(n_rows, seed)
+    with tempfile.TemporaryDirectory() as cache_dir:
+        env = dict(os.environ, ZOMATO_DATA_FILE=path, ZOMATO_CACHE_DIR=cache_dir)
+        result = subprocess.run([sys.executable, os.path.abspath(__file__), '--child', name, path],
+                                cwd=os.path.dirname(SOURCE_FILE), env=env, capture_output=True, text=True)
+    if result.returncode != 0:
+        return {'error': result.stderr.strip().splitlines()[-1] if result.stderr.strip() else 'failed'}
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def compare(results, baseline):
+    """
+    Returns regression messages for results slower or larger than the baseline beyond tolerance.
+    """
+    regressions = []
+    for key, result in results.items():
+        previous = baseline.get(key)
+        if not previous or 'error' in previous:
+            continue
+        if 'error' in result:
+            regressions.append(f"{key}: failed ({result['error']})")
+            continue
+        if result['seconds'] > max(previous['seconds'] * (1 + TIME_TOLERANCE), previous['seconds'] + MIN_TIME_DELTA):
+            regressions.append(f"{key}: {result['seconds']:.2f}s vs baseline {previous['seconds']:.2f}s")
+        if result['peak_rss_mb'] > previous['peak_rss_mb'] * (1 + MEMORY_TOLERANCE):
+            regressions.append(f"{key}: peak RSS {result['peak_rss_mb']:.0f} MB "
+                               f"vs baseline {previous['peak_rss_mb']:.0f} MB")
+    return regressions
+
+
+def run_benchmarks(names=None, sizes=SIZES, seed=0, update_baseline=False):
+    """
+    Runs the benchmarks on every dataset size and compares them with the saved baseline.
+
+    Parameters:
+    names (list of str): Keys of BENCHMARKS; all of them by default.
+    sizes (list of int): Synthetic dataset sizes in rows.
+    seed (int): Seed of the synthetic datasets.
+    update_baseline (bool): Save these results as the new baseline. The first run always does.
+
+    Returns:
+    tuple: (results keyed by 'name@rows', list of regression messages)
+    """
+    results = {}
+    for n_rows in sizes:
+        for name in names or BENCHMARKS:
+            max_rows = BENCHMARKS[name][1]
+            if max_rows is not None and n_rows > max_rows:
+                continue
+            results[f'{name}@{n_rows}'] = result = run_one(name, n_rows, seed)
+            print(f"{name}@{n_rows}: " + (result.get('error') or
+                  f"{result['seconds']:.3f}s, peak RSS {result['peak_rss_mb']:.0f} MB"), flush=True)
+
+    path = baseline_path()
+    baseline = {}
+    if os.path.exists(path):
+        with open(path) as f:
+            baseline = json.load(f)
+    regressions = compare(results, baseline)
+    if update_baseline or not baseline:
+        atomic_write(path, json.dumps({**baseline, **results}, indent=2).encode('utf-8'))
+    return results, regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pipeline, model and page benchmarks on synthetic data")
+    parser.add_argument('names', nargs='*', help=f"benchmarks to run: {', '.join(BENCHMARKS)}")
+    parser.add_argument('--sizes', type=int, nargs='+', default=list(SIZES))
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--update-baseline', action='store_true')
+    parser.add_argument('--child', nargs=2, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        print(json.dumps(_run_child(*args.child)))
+        return
+    unknown = set(args.names) - set(BENCHMARKS)
+    if unknown:
+        parser.error(f"unknown benchmarks: {', '.join(sorted(unknown))}")
+
+    _, regressions = run_benchmarks(args.names, args.sizes, args.seed, args.update_baseline)
+    for regression in regressions:
+        print(f"REGRESSION {regression}")
+    sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+# cache_utils.py
+import contextlib
+import hashlib
+import os
+import tempfile
+import threading
+
+# Directory holding every on-disk artifact derived from the source data
+# (ZOMATO_CACHE_DIR points it elsewhere, e.g. to a fresh folder for cold-start benchmarks)
+CACHE_DIR = os.environ.get('ZOMATO_CACHE_DIR',
+                           os.path.join(os.path.dirname(os.path.abspath(__file__)), '.cache'))
+
+# (path) -> (mtime_ns, size, digest) so unchanged files are not re-hashed on every rerun
+_fingerprints = {}
+_fingerprints_lock = threading.Lock()
+
+# Read once at import: mkstemp creates files readable by their owner only, and atomic_open
+# gives them the permissions a plain open() would have
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+
+
+def cache_path(*parts):
+    """
+    Returns a path inside the cache directory, creating the parent folder if needed.
+
+    Parameters:
+    parts (str): Path components relative to the cache directory.
+    """
+    path = os.path.join(CACHE_DIR, *parts)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    return path
+
+
+def file_fingerprint(path):
+    """
+    Returns the SHA-256 content hash of a file.
+
+    The hash is only recomputed when the file's mtime or size changes.
+
+    Parameters:
+    path (str): The file to fingerprint.
+    """
+    stat = os.stat(path)
+    key = os.path.abspath(path)
+    with _fingerprints_lock:
+        cached = _fingerprints.get(key)
+    if cached and cached[0] == stat.st_mtime_ns and cached[1] == stat.st_size:
+        return cached[2]
+
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    digest = digest.hexdigest()
+
+    with _fingerprints_lock:
+        _fingerprints[key] = (stat.st_mtime_ns, stat.st_size, digest)
+    return digest
+
+
+@contextlib.contextmanager
+def atomic_open(path):
+    """
+    Opens a temporary file for binary writing that replaces path when the block succeeds,
+    so readers never see a partial file.
+
+    The temporary file is created next to path with a unique name, so concurrent writers,
+    including threads of one process, never share it; it is removed if the block raises.
+
+    Parameters:
+    path (str): Destination file.
+    """
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(path)),
+                                    prefix=os.path.basename(path) + '.', suffix='.tmp')
+    try:
+        os.chmod(tmp_path, 0o666 & ~_UMASK)
+        with os.fdopen(fd, 'wb') as f:
+            yield f
+        os.replace(tmp_path, path)
+    except BaseException:
+        with contextlib.suppress(FileNotFoundError):
+            os.remove(tmp_path)
+        raise
+
+
+def atomic_write(path, data):
+    """
+    Writes bytes to a file via a temporary file and rename, so readers never see a partial file.
+
+    Parameters:
+    path (str): Destination file.
+    data (bytes): Content to write.
+    """
+    with atomic_open(path) as f:
+        f.write(data)
@@ -0,0 +1,64 @@
+# categories.py
+import numpy as np
+import pandas as pd
+
+# Columns whose rare categories are collapsed before analysis and modeling
+TOP_N_COLUMNS = ['Restaurant Name', 'City', 'Cuisines', 'Mall']
+
+
+class TopNCollapser:
+    """
+    Keeps the top N most frequent categories of each column and replaces the rest with 'Other'.
+
+    The top-N vocabulary is learned by fit() and reused by transform(), so the same mapping
+    can be applied to new records at inference time. The remapping is done on category codes,
+    without a Python-level lookup per row, and the result stays categorical. Missing values
+    stay missing.
+
+    Parameters:
+    columns (list of str): Columns to collapse.
+    top_n (int): Number of most frequent categories to keep per column.
+    other (str): Label that replaces every category outside the top N.
+    """
+
+    def __init__(self, columns=TOP_N_COLUMNS, top_n=10, other='Other'):
+        self.columns = list(columns)
+        self.top_n = top_n
+        self.other = other
+
+    def fit(self, data):
+        self.vocabulary_ = {
+            column: data[column].value_counts().nlargest(self.top_n).index.tolist()
+            for column in self.columns
+        }
+        return self
+
+    def transform(self, data):
+        return data.assign(**{column: self._collapse(data[column], self.vocabulary_[column])
+                              for column in self.columns})
+
+    def fit_transform(self, data):
+        return self.fit(data).transform(data)
+
+    def categories(self, column):
+        # Output categories of a column: its kept vocabulary followed by 'Other'
+        vocabulary = self.vocabulary_[column]
+        return vocabulary if self.other in vocabulary else vocabulary + [self.other]
+
+    def _collapse(self, series, vocabulary):
+        categories = self.categories(series.name)
+        other_code = categories.index(self.other)
+
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            # Map every existing category code to its new code in one lookup table; the
+            # trailing -1 entry keeps missing values (code -1) missing
+            lookup = pd.Index(categories).get_indexer(series.cat.categories)
+            lookup = np.append(np.where(lookup == -1, other_code, lookup), -1)
+            new_codes = lookup[series.cat.codes.to_numpy()]
+        else:
+            # -1 for missing values and for values outside the vocabulary
+            codes = pd.Index(vocabulary).get_indexer(series)
+            new_codes = np.where((codes == -1) & series.notna().to_numpy(), other_code, codes)
+
+        collapsed = pd.Categorical.from_codes(new_codes, categories=categories)
+        return pd.Series(collapsed, index=series.index, name=series.name)
@@ -0,0 +1,239 @@
+# correlation.py
+import hashlib
+import itertools
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from statistics import NormalDist
+import numpy as np
+import pandas as pd
+from cache_utils import atomic_open, cache_path
+
+# Below this many rows, pairs are computed in-process: pool start-up would cost more
+PARALLEL_MIN_ROWS = 200_000
+
+METHODS = ('pearson', 'spearman', 'kendall')
+
+
+def rank_column(values):
+    """
+    Ranks one column with a single sort.
+
+    Parameters:
+    values (np.ndarray): Column values without missing entries.
+
+    Returns:
+    tuple: (dense integer ranks starting at 0, average ranks starting at 1 as used by Spearman)
+    """
+    order = np.argsort(values, kind='stable')
+    sorted_values = values[order]
+    new_group = np.empty(len(values), dtype=bool)
+    new_group[:1] = True
+    new_group[1:] = sorted_values[1:] != sorted_values[:-1]
+
+    group_of_sorted = np.cumsum(new_group) - 1
+    starts = np.flatnonzero(new_group)
+    ends = np.append(starts[1:], len(values))
+    average = (starts + ends + 1) / 2
+
+    dense = np.empty(len(values), dtype=np.int64)
+    dense[order] = group_of_sorted
+    return dense, average[dense]
+
+
+def _tied_pairs(dense):
+    counts = np.bincount(dense)
+    return int((counts * (counts - 1) // 2).sum())
+
+
+def count_inversions(values):
+    """
+    Counts pairs i < j with values[i] > values[j] by a bottom-up merge sort.
+
+    Each level merges neighbouring sorted blocks with one stable sort of (block, value) keys;
+    because the keys are two presorted runs per block, that sort is linear. A right-block
+    element moved forward by k positions during the merge jumped over exactly k larger
+    left-block elements, which gives the inversion count of the level without any search.
+
+    Parameters:
+    values (np.ndarray): Non-negative integer values.
+    """
+    n = len(values)
+    current = np.asarray(values, dtype=np.int64)
+    positions = np.arange(n)
+    span = int(current.max()) + 1 if n else 1
+    inversions = 0
+    width = 1
+    while width < n:
+        block = positions // width
+        keys = (block // 2) * span + current
+        order = np.argsort(keys, kind='stable')
+        merged_position = np.empty(n, dtype=np.int64)
+        merged_position[order] = positions
+        is_right = (block % 2) == 1
+        inversions += int((positions[is_right] - merged_position[is_right]).sum())
+        current = current[order]
+        width *= 2
+    return inversions
+
+
+def kendall_tau_b(x_dense, y_dense):
+    """
+    Computes Kendall's tau-b of two dense-ranked columns in O(n log n) (Knight's algorithm).
+
+    Parameters:
+    x_dense (np.ndarray): Dense integer ranks of the first column.
+    y_dense (np.ndarray): Dense integer ranks of the second column.
+    """
+    n = len(x_dense)
+    total_pairs = n * (n - 1) // 2
+
+    # Sort by x, breaking ties by y, so tied-x pairs are never counted as discordant
+    joint = x_dense * (int(y_dense.max()) + 1) + y_dense
+    order = np.argsort(joint, kind='stable')
+    x_ties = _tied_pairs(x_dense)
+    y_ties = _tied_pairs(y_dense)
+    _, joint_counts = np.unique(joint, return_counts=True)
+    joint_ties = int((joint_counts * (joint_counts - 1) // 2).sum())
+    discordant = count_inversions(y_dense[order])
+
+    denominator = np.sqrt(float(total_pairs - x_ties) * float(total_pairs - y_ties))
+    if denominator == 0:
+        return np.nan
+    return (total_pairs - x_ties - y_ties + joint_ties - 2 * discordant) / denominator
+
+
+def _pearson_matrix(values):
+    centered = values - values.mean(axis=0)
+    norms = np.sqrt((centered ** 2).sum(axis=0))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        matrix = (centered.T @ centered) / np.outer(norms, norms)
+    # A constant column has no correlation, not even with itself, as with DataFrame.corr
+    np.fill_diagonal(matrix, np.where(norms > 0, 1.0, np.nan))
+    return np.clip(matrix, -1.0, 1.0)
+
+
+def _kendall_pair(args):
+    i, j, x_dense, y_dense = args
+    return i, j, kendall_tau_b(x_dense, y_dense)
+
+
+def _complete_matrices(values, n_jobs):
+    # One ranking pass per column feeds both Spearman and Kendall
+    ranks = [rank_column(values[:, k]) for k in range(values.shape[1])]
+    dense = [r[0] for r in ranks]
+    average = np.column_stack([r[1] for r in ranks])
+
+    pearson = _pearson_matrix(values)
+    spearman = _pearson_matrix(average)
+
+    kendall = np.eye(values.shape[1])
+    tasks = [(i, j, dense[i], dense[j]) for i, j in itertools.combinations(range(values.shape[1]), 2)]
+    if n_jobs == 1 or (n_jobs is None and len(values) < PARALLEL_MIN_ROWS):
+        results = map(_kendall_pair, tasks)
+    else:
+        # Spawned rather than forked: the Exploration page calls this inside the Streamlit server
+        with ProcessPoolExecutor(max_workers=n_jobs, mp_context=multiprocessing.get_context('spawn')) as pool:
+            results = list(pool.map(_kendall_pair, tasks))
+    for i, j, tau in results:
+        kendall[i, j] = kendall[j, i] = tau
+    return pearson, spearman, kendall
+
+
+def _pairwise_matrices(values):
+    # Columns with missing values: rank every pair on its complete rows, like pandas does
+    n_columns = values.shape[1]
+    matrices = [np.eye(n_columns) for _ in METHODS]
+    for k in range(n_columns):
+        # Pearson and Spearman are undefined for a column with fewer than two distinct values
+        if len(np.unique(values[~np.isnan(values[:, k]), k])) < 2:
+            matrices[0][k, k] = matrices[1][k, k] = np.nan
+    for i, j in itertools.combinations(range(n_columns), 2):
+        mask = ~np.isnan(values[:, i]) & ~np.isnan(values[:, j])
+        if mask.sum() < 2:
+            for matrix in matrices:
+                matrix[i, j] = matrix[j, i] = np.nan
+            continue
+        pair = values[mask][:, [i, j]]
+        pearson, spearman, kendall = _complete_matrices(pair, n_jobs=1)
+        for matrix, result in zip(matrices, (pearson, spearman, kendall)):
+            matrix[i, j] = matrix[j, i] = result[0, 1]
+    return matrices
+
+
+def confidence_bounds(matrix, n_rows, method, confidence=0.95):
+    """
+    Returns Fisher-z confidence bounds for a correlation matrix estimated from n_rows rows.
+
+    Parameters:
+    matrix (pd.DataFrame): Correlation matrix.
+    n_rows (int): Number of rows the matrix was computed from.
+    method (str): 'pearson', 'spearman' or 'kendall'.
+    confidence (float): Confidence level of the interval.
+    """
+    # Standard errors of the z-transformed coefficient (Fieller, Hartley and Pearson, 1957)
+    variance = {'pearson': 1.0, 'spearman': 1.06, 'kendall': 0.437}[method]
+    offset = 4 if method == 'kendall' else 3
+    standard_error = np.sqrt(variance / max(n_rows - offset, 1))
+    z_critical = NormalDist().inv_cdf(0.5 + confidence / 2)
+
+    z = np.arctanh(np.clip(matrix.to_numpy(), -0.999999, 0.999999))
+    lower = pd.DataFrame(np.tanh(z - z_critical * standard_error), matrix.index, matrix.columns)
+    upper = pd.DataFrame(np.tanh(z + z_critical * standard_error), matrix.index, matrix.columns)
+    return lower, upper
+
+
+def correlation_matrices(numeric_data, sample_size=None, confidence=0.95, n_jobs=None, random_state=0):
+    """
+    Computes the Pearson, Spearman and Kendall matrices of the numeric columns.
+
+    Parameters:
+    numeric_data (pd.DataFrame): Numeric columns only.
+    sample_size (int): Estimate on a random sample of this many rows and report confidence
+        bounds; all rows are used when omitted.
+    confidence (float): Confidence level of the bounds in sampled mode.
+    n_jobs (int): Worker processes for the Kendall pairs; chosen from the data size if omitted.
+    random_state (int): Seed for the sample.
+
+    Returns:
+    dict: 'pearson', 'spearman' and 'kendall' matrices, the number of rows used, and in
+    sampled mode a '<method>_bounds' (lower, upper) pair per method.
+    """
+    if sample_size is not None and sample_size < len(numeric_data):
+        numeric_data = numeric_data.sample(sample_size, random_state=random_state)
+    values = numeric_data.to_numpy(dtype=float)
+
+    if np.isnan(values).any():
+        matrices = _pairwise_matrices(values)
+    else:
+        matrices = _complete_matrices(values, n_jobs)
+
+    columns = numeric_data.columns
+    results = {method: pd.DataFrame(matrix, index=columns, columns=columns)
+               for method, matrix in zip(METHODS, matrices)}
+    results['n_rows'] = len(values)
+    if sample_size is not None:
+        for method in METHODS:
+            results[f'{method}_bounds'] = confidence_bounds(results[method], len(values), method, confidence)
+    return results
+
+
+def cached_correlation_matrices(numeric_data, data_fingerprint, sample_size=None, confidence=0.95):
+    """
+    Returns correlation_matrices() for a dataset version, computing it only once.
+
+    Parameters:
+    numeric_data (pd.DataFrame): Numeric columns only.
+    data_fingerprint (str): Fingerprint of the dataset version, e.g. from pipeline.stage_fingerprints().
+    sample_size (int): See correlation_matrices().
+    confidence (float): See correlation_matrices().
+    """
+    key = f'{data_fingerprint}:{list(numeric_data.columns)}:{sample_size}:{confidence}'
+    path = cache_path('correlations', hashlib.sha256(key.encode('utf-8')).hexdigest() + '.pkl')
+    if os.path.exists(path):
+        return pd.read_pickle(path)
+
+    results = correlation_matrices(numeric_data, sample_size, confidence)
+    with atomic_open(path) as f:
+        pd.to_pickle(results, f)
+    return results
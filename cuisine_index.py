@@ -0,0 +1,163 @@
+# cuisine_index.py
+import functools
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+from sklearn.base import BaseEstimator, TransformerMixin
+from pipeline import load_clean_data, rated_mask, stage_fingerprints
+
+# Columns whose mean only counts the rated restaurants (see pipeline.rated_mask)
+RATING_COLUMNS = ['Aggregate rating']
+
+
+def split_cuisines(cuisines, names=None):
+    """
+    Splits a comma-separated Cuisines column into a sparse restaurant x cuisine 0/1 matrix.
+
+    Every distinct Cuisines string is split once, so the cost grows with the number of
+    distinct combinations rather than the number of restaurants.
+
+    Parameters:
+    cuisines (pd.Series): Comma-joined cuisine lists, e.g. "French, Japanese, Desserts".
+    names (list of str): Fixed cuisine vocabulary; cuisines outside it are ignored. Built
+        from the data when omitted.
+
+    Returns:
+    tuple: (scipy.sparse.csr_matrix, list of cuisine names)
+    """
+    combinations = cuisines.astype('category')
+    # A cuisine listed twice in one value (e.g. "Chinese, Chinese") still counts once
+    tags = [list(dict.fromkeys(tag.strip() for tag in str(combination).split(',')))
+            for combination in combinations.cat.categories]
+    if names is None:
+        names = sorted({tag for combination in tags for tag in combination})
+    position = {name: i for i, name in enumerate(names)}
+    tags = [[tag for tag in combination if tag in position] for combination in tags]
+    rows = np.repeat(np.arange(len(tags)), [len(combination) for combination in tags])
+    columns = [position[tag] for combination in tags for tag in combination]
+    per_combination = sp.csr_matrix((np.ones(len(columns), dtype=np.int8), (rows, columns)),
+                                    shape=(len(tags), len(names)))
+
+    # Restaurants with a missing Cuisines value get an empty row
+    codes = combinations.cat.codes.to_numpy()
+    present = np.flatnonzero(codes >= 0)
+    selector = sp.csr_matrix((np.ones(len(present), dtype=np.int8), (present, codes[present])),
+                             shape=(len(codes), len(tags)))
+    return (selector @ per_combination).tocsr(), list(names)
+
+
+class CuisineIndex:
+    """
+    Multi-label view of the Cuisines column.
+
+    Holds the restaurant x cuisine incidence matrix in CSR form (one row per restaurant) and
+    its CSC transpose as the inverted index (one posting list of row positions per cuisine).
+
+    Parameters:
+    data (pd.DataFrame): Restaurants with 'Cuisines' and 'City' columns, e.g. pipeline.load_clean_data().
+    """
+
+    def __init__(self, data):
+        self.data = data
+        self.incidence, self.names = split_cuisines(data['Cuisines'])
+        self.postings = self.incidence.tocsc()
+        self._position = {name: i for i, name in enumerate(self.names)}
+        cities = data['City'].astype('category')
+        self._city_codes = cities.cat.codes.to_numpy()
+        self._city_position = {city: i for i, city in enumerate(cities.cat.categories)}
+
+    def restaurants(self, cuisine):
+        """
+        Returns the sorted row positions of the restaurants serving a cuisine.
+        """
+        if cuisine not in self._position:
+            return np.empty(0, dtype=np.int64)
+        i = self._position[cuisine]
+        return np.sort(self.postings.indices[self.postings.indptr[i]:self.postings.indptr[i + 1]])
+
+    def query(self, all_of=(), any_of=(), city=None):
+        """
+        Returns the restaurants serving every cuisine of all_of and at least one of any_of.
+
+        Parameters:
+        all_of (list of str): Cuisines that must all be served.
+        any_of (list of str): Cuisines of which at least one must be served.
+        city (str): Only restaurants of this City.
+        """
+        rows = np.arange(len(self.data))
+        for cuisine in all_of:
+            rows = np.intersect1d(rows, self.restaurants(cuisine), assume_unique=True)
+        if any_of:
+            rows = np.intersect1d(rows, np.unique(np.concatenate([self.restaurants(c) for c in any_of])),
+                                  assume_unique=True)
+        if city is not None:
+            rows = rows[self._city_codes[rows] == self._city_position.get(city, -2)]
+        return self.data.iloc[rows]
+
+    def cuisine_stats(self, columns=('Aggregate rating', 'Votes')):
+        """
+        Returns the number of restaurants and the mean of numeric columns per cuisine,
+        computed with sparse products. The means of RATING_COLUMNS leave out the restaurants
+        that are not rated, as the aggregate cube does.
+        """
+        counts = np.asarray(self.incidence.sum(axis=0)).ravel()
+        values = self.data[list(columns)].to_numpy(dtype=float)
+        weights = np.ones_like(values)
+        weights[:, [column in RATING_COLUMNS for column in columns]] = rated_mask(self.data)[:, None]
+        incidence = self.incidence.T.astype(np.float64)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            means = (incidence @ (values * weights)) / (incidence @ weights)
+        stats = pd.DataFrame(means, index=self.names, columns=[f'mean {column}' for column in columns])
+        stats.insert(0, 'restaurants', counts)
+        return stats.sort_values('restaurants', ascending=False)
+
+    def cooccurrence(self):
+        """
+        Returns the cuisine x cuisine matrix of the number of restaurants serving both;
+        the diagonal holds the number of restaurants serving each cuisine.
+        """
+        incidence = self.incidence.astype(np.int32)
+        return pd.DataFrame((incidence.T @ incidence).toarray(), index=self.names, columns=self.names)
+
+
+class CuisineEncoder(BaseEstimator, TransformerMixin):
+    """
+    Scikit-learn transformer turning a Cuisines column into a sparse multi-hot matrix.
+
+    The vocabulary is frozen at fit time; unseen cuisines are ignored. The output stays
+    sparse, so it can be stacked with the one-hot features of a ColumnTransformer.
+
+    Parameters:
+    min_restaurants (int): Only keep cuisines served by at least this many training rows.
+    """
+
+    def __init__(self, min_restaurants=1):
+        self.min_restaurants = min_restaurants
+
+    def _column(self, X):
+        return X.iloc[:, 0] if isinstance(X, pd.DataFrame) else pd.Series(np.ravel(np.asarray(X, dtype=object)))
+
+    def fit(self, X, y=None):
+        incidence, names = split_cuisines(self._column(X))
+        counts = np.asarray(incidence.sum(axis=0)).ravel()
+        self.vocabulary_ = [name for name, count in zip(names, counts) if count >= self.min_restaurants]
+        return self
+
+    def transform(self, X):
+        return split_cuisines(self._column(X), self.vocabulary_)[0].astype(np.float64)
+
+    def get_feature_names_out(self, input_features=None):
+        return np.array([f'Cuisines_{name}' for name in self.vocabulary_], dtype=object)
+
+
+@functools.lru_cache(maxsize=2)
+def get_cuisine_index(data_fingerprint=None):
+    """
+    Returns the CuisineIndex of a dataset version, built once per process.
+
+    Parameters:
+    data_fingerprint (str): Fingerprint of the cleaned data; the current one by default.
+    """
+    if data_fingerprint is None:
+        return get_cuisine_index(stage_fingerprints()['cleaned'])
+    return CuisineIndex(load_clean_data())
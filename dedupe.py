@@ -0,0 +1,278 @@
+# dedupe.py
+# Standalone report: python dedupe.py --report merges.csv lists the spellings it would merge.
+# The pipeline stages do not apply it; the cleaned frame keeps every spelling as it is.
+import argparse
+import difflib
+import time
+import unicodedata
+import numpy as np
+import pandas as pd
+from scipy.sparse import coo_matrix
+from sklearn.feature_extraction.text import CountVectorizer, TfidfVectorizer
+from geo_index import EARTH_RADIUS_KM
+from pipeline import load_clean_data
+
+# Names whose TF-IDF cosine similarity reaches this value are candidates for the same restaurant
+SIMILARITY_THRESHOLD = 0.85
+
+# A candidate pair is only merged if the two names have a restaurant within this distance
+MAX_DISTANCE_KM = 1.0
+
+# Tokens ignored by the token check ('n' as in 'Wrap N Roll'), and the difflib ratio at
+# which two tokens count as spellings of the same word ('Kolkata' and 'Kolkatta')
+STOP_TOKENS = frozenset({'the', 'and', 'n'})
+TOKEN_SIMILARITY = 0.8
+
+# MinHash LSH: BANDS bands of ROWS_PER_BAND hashes. Pairs with a character 3-gram Jaccard
+# similarity of 0.5 become candidates with probability 1 - (1 - 0.5**3)**20, about 93%.
+BANDS = 20
+ROWS_PER_BAND = 3
+
+# Each name is compared with at most this many following names of the same LSH bucket
+BUCKET_WINDOW = 5
+
+_PRIME = (1 << 31) - 1
+
+
+def normalize_names(names):
+    """
+    Returns the matching key of restaurant names: lower case, accents, punctuation and extra
+    spaces removed, '&' spelled 'and'. Each distinct name is normalized once.
+    """
+    names = names.astype('category')
+
+    def normalize(name):
+        name = unicodedata.normalize('NFKD', str(name)).encode('ascii', 'ignore').decode('ascii')
+        return name.lower().replace('&', ' and ')
+
+    keys = pd.Series([normalize(name) for name in names.cat.categories], dtype=object)
+    keys = keys.str.replace(r'[^\w\s]', '', regex=True).str.split().str.join(' ')
+    codes = names.cat.codes.to_numpy()
+    return pd.Series(np.where(codes >= 0, keys.to_numpy()[codes], ''), index=names.index)
+
+
+def minhash_signatures(shingles, n_hashes, random_state=0):
+    """
+    Computes MinHash signatures of the rows of a sparse binary shingle matrix.
+
+    Parameters:
+    shingles (scipy.sparse.csr_matrix): Row i marks the shingles of item i; rows must be non-empty.
+    n_hashes (int): Signature length.
+
+    Returns:
+    np.ndarray: (n_rows, n_hashes) int64 signatures.
+    """
+    rng = np.random.RandomState(random_state)
+    a = rng.randint(1, _PRIME, size=n_hashes).astype(np.int64)
+    b = rng.randint(0, _PRIME, size=n_hashes).astype(np.int64)
+    columns = shingles.indices.astype(np.int64)
+    starts = shingles.indptr[:-1]
+    signatures = np.empty((shingles.shape[0], n_hashes), dtype=np.int64)
+    for k in range(n_hashes):
+        signatures[:, k] = np.minimum.reduceat((a[k] * columns + b[k]) % _PRIME, starts)
+    return signatures
+
+
+def candidate_pairs(signatures, blocks, bands=BANDS, rows_per_band=ROWS_PER_BAND, window=BUCKET_WINDOW):
+    """
+    Returns the pairs of items that share a block and at least one LSH band bucket.
+
+    Items of a bucket are sorted together and each is paired with the next `window` items of
+    the same bucket, so the number of pairs stays linear in the number of items.
+
+    Returns:
+    np.ndarray: (n_pairs, 2) unique item pairs with the smaller index first.
+    """
+    n = len(signatures)
+    pairs = []
+    for band in range(bands):
+        band_values = signatures[:, band * rows_per_band:(band + 1) * rows_per_band].astype(np.uint64)
+        keys = blocks.astype(np.uint64) * np.uint64(0x9E3779B97F4A7C15)
+        for column in band_values.T:
+            keys = (keys ^ column) * np.uint64(0xBF58476D1CE4E5B9)
+        order = np.argsort(keys, kind='stable')
+        sorted_keys = keys[order]
+        for step in range(1, min(window, n - 1) + 1):
+            same = sorted_keys[step:] == sorted_keys[:-step]
+            pairs.append(np.column_stack([order[:-step][same], order[step:][same]]))
+    if not pairs:
+        return np.empty((0, 2), dtype=np.int64)
+    pairs = np.sort(np.concatenate(pairs), axis=1)
+    return np.unique(pairs, axis=0)
+
+
+def pair_similarity(vectors, pairs):
+    # Cosine similarity of L2-normalized sparse rows, one pair per row
+    if len(pairs) == 0:
+        return np.empty(0)
+    return np.asarray(vectors[pairs[:, 0]].multiply(vectors[pairs[:, 1]]).sum(axis=1)).ravel()
+
+
+def tokens_agree(left, right):
+    """
+    Returns True if two normalized names are made of the same words up to spelling: every
+    token of one name, stop tokens aside, has a counterpart in the other. 'Cuisine' and
+    'Ma Cuisine' or '24/7 Bar' and '24/7 Restaurant' disagree; names that only differ in
+    spacing ('HotMess' and 'Hot Mess') agree.
+    """
+    left = [token for token in left.split() if token not in STOP_TOKENS]
+    right = [token for token in right.split() if token not in STOP_TOKENS]
+    if ''.join(left) == ''.join(right):
+        return True
+
+    def covered(tokens, others):
+        return all(any(token == other or difflib.SequenceMatcher(None, token, other).ratio() >= TOKEN_SIMILARITY
+                       for other in others) for token in tokens)
+
+    return bool(left) and bool(right) and covered(left, right) and covered(right, left)
+
+
+def pair_distances(entity_of_row, latitude, longitude, pairs):
+    """
+    Returns, for each pair of names, the great-circle distance in km between their two closest
+    restaurants; inf if either name has no located restaurant (coordinates (0, 0) or missing).
+    """
+    located = ~((latitude == 0) & (longitude == 0)) & ~np.isnan(latitude) & ~np.isnan(longitude)
+    points = pd.DataFrame({'entity': entity_of_row[located], 'lat': np.radians(latitude[located]),
+                           'lon': np.radians(longitude[located])}).drop_duplicates()
+    joined = pd.DataFrame({'pair': np.arange(len(pairs)), 'entity': pairs[:, 0], 'other': pairs[:, 1]})
+    joined = joined.merge(points, on='entity').merge(
+        points.rename(columns={'entity': 'other', 'lat': 'other_lat', 'lon': 'other_lon'}), on='other')
+    haversine = (np.sin((joined['other_lat'] - joined['lat']) / 2) ** 2 + np.cos(joined['lat'])
+                 * np.cos(joined['other_lat']) * np.sin((joined['other_lon'] - joined['lon']) / 2) ** 2)
+    distance = 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(haversine.clip(0, 1)))
+    closest = distance.groupby(joined['pair']).min()
+    return closest.reindex(np.arange(len(pairs)), fill_value=np.inf).to_numpy()
+
+
+def star_clusters(n, pairs, weights):
+    """
+    Groups items linked by pairs into star clusters: the item with the most links (then the
+    largest weight) becomes a center and takes its unassigned neighbours, and so on. Every
+    member is linked to its own center, so one pair between two members cannot chain two
+    clusters together as a transitive closure would.
+
+    Parameters:
+    n (int): Number of items.
+    pairs (np.ndarray): (n_pairs, 2) linked item pairs.
+    weights (np.ndarray): Per-item tie-breaker, e.g. its number of rows.
+
+    Returns:
+    np.ndarray: Cluster number of each item, from 0.
+    """
+    adjacency = coo_matrix((np.ones(2 * len(pairs)), (np.concatenate([pairs[:, 0], pairs[:, 1]]),
+                                                      np.concatenate([pairs[:, 1], pairs[:, 0]]))),
+                           shape=(n, n)).tocsr()
+    degree = np.diff(adjacency.indptr)
+    center = np.arange(n)
+    assigned = degree == 0
+    for item in np.lexsort((-weights, -degree)):
+        if assigned[item]:
+            continue
+        assigned[item] = True
+        neighbours = adjacency.indices[adjacency.indptr[item]:adjacency.indptr[item + 1]]
+        neighbours = neighbours[~assigned[neighbours]]
+        center[neighbours] = item
+        assigned[neighbours] = True
+    return np.unique(center, return_inverse=True)[1]
+
+
+def deduplicate(data, threshold=SIMILARITY_THRESHOLD, name_column='Restaurant Name', block_column='City',
+                max_distance_km=MAX_DISTANCE_KM):
+    """
+    Resolves spelling variants of restaurant names to canonical restaurant IDs.
+
+    Names are only compared within the same block (City). Exact matches of the normalized
+    name are merged directly; the remaining distinct names are paired by MinHash LSH on
+    character 3-grams and the candidate pairs are scored by TF-IDF cosine similarity. A pair
+    at or above the threshold is only accepted if the names agree token by token
+    (tokens_agree) and have restaurants within max_distance_km of each other; the accepted
+    pairs are grouped by star clustering (star_clusters), not transitively.
+
+    Branches of a chain keep their own rows; they share the canonical ID of the name.
+
+    Parameters:
+    data (pd.DataFrame): Restaurants, e.g. pipeline.load_clean_data().
+    threshold (float): Minimum cosine similarity of two names of the same restaurant.
+    max_distance_km (float): Maximum distance between the closest restaurants of two names.
+
+    Returns:
+    tuple: (pd.Series of canonical IDs indexed like data, merge report pd.DataFrame,
+    dict of match counts)
+    """
+    keys = pd.DataFrame({'block': data[block_column].astype(str).to_numpy(),
+                         'key': normalize_names(data[name_column]).to_numpy()})
+    distinct = keys.drop_duplicates(ignore_index=True)
+    entity_of_row = pd.MultiIndex.from_frame(distinct).get_indexer(pd.MultiIndex.from_frame(keys))
+
+    # Only names with at least one 3-gram take part in the fuzzy matching
+    shingles = CountVectorizer(analyzer='char_wb', ngram_range=(3, 3), binary=True,
+                               dtype=np.int8).fit_transform(distinct['key']).tocsr()
+    matchable = np.flatnonzero(np.diff(shingles.indptr) > 0)
+    signatures = minhash_signatures(shingles[matchable], BANDS * ROWS_PER_BAND)
+    blocks = distinct['block'].astype('category').cat.codes.to_numpy()[matchable]
+    pairs = matchable[candidate_pairs(signatures, blocks)]
+
+    vectors = TfidfVectorizer(analyzer='char_wb', ngram_range=(3, 3)).fit_transform(distinct['key'])
+    similarity = pair_similarity(vectors.tocsr(), pairs)
+    similar = pairs[similarity >= threshold]
+
+    names = distinct['key'].to_numpy()
+    agree = np.array([tokens_agree(names[left], names[right]) for left, right in similar], dtype=bool)
+    distances = pair_distances(entity_of_row, data['Latitude'].to_numpy(dtype=float),
+                               data['Longitude'].to_numpy(dtype=float), similar)
+    matched = similar[agree & (distances <= max_distance_km)]
+
+    n = len(distinct)
+    cluster = star_clusters(n, matched, np.bincount(entity_of_row, minlength=n))
+    canonical_ids = pd.Series(cluster[entity_of_row], index=data.index, name='canonical_id')
+    return canonical_ids, merge_report(data, canonical_ids, name_column, block_column), {
+        'rows': len(data), 'distinct_names': n, 'candidate_pairs': len(pairs),
+        'similar_pairs': len(similar), 'matched_pairs': len(matched),
+        'canonical_ids': int(cluster.max()) + 1 if n else 0}
+
+
+def merge_report(data, canonical_ids, name_column='Restaurant Name', block_column='City'):
+    """
+    Lists every canonical ID that groups more than one spelling of a name.
+
+    Returns:
+    pd.DataFrame: canonical_id, block, canonical name (the most frequent spelling), the
+    merged spellings and the number of rows.
+    """
+    rows = pd.DataFrame({'canonical_id': canonical_ids.to_numpy(),
+                         'block': data[block_column].astype(str).to_numpy(),
+                         'name': data[name_column].astype(str).to_numpy()})
+    spellings = rows.groupby(['canonical_id', 'block', 'name']).size().rename('rows').reset_index()
+    spellings = spellings.sort_values(['canonical_id', 'rows'], ascending=[True, False])
+    grouped = spellings.groupby('canonical_id')
+    report = pd.DataFrame({
+        block_column: grouped['block'].first(),
+        'canonical_name': grouped['name'].first(),
+        'spellings': grouped['name'].agg(list),
+        'rows': grouped['rows'].sum(),
+    })
+    return report[report['spellings'].str.len() > 1].reset_index()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fuzzy restaurant-name deduplication of the cleaned data")
+    parser.add_argument('--threshold', type=float, default=SIMILARITY_THRESHOLD)
+    parser.add_argument('--max-distance-km', type=float, default=MAX_DISTANCE_KM)
+    parser.add_argument('--report', help="write the merge report to this CSV file")
+    args = parser.parse_args()
+
+    data = load_clean_data()
+    start = time.perf_counter()
+    _, report, summary = deduplicate(data, args.threshold, max_distance_km=args.max_distance_km)
+    summary['seconds'] = time.perf_counter() - start
+    print(summary)
+    if args.report:
+        report.to_csv(args.report, index=False)
+    else:
+        with pd.option_context('display.width', 200, 'display.max_colwidth', 80):
+            print(report.head(20))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+# features.py
+import hashlib
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+from sklearn.base import BaseEstimator, TransformerMixin
+from categories import TopNCollapser
+
+# Bump when the column layout produced by FeatureBuilder changes
+LAYOUT_VERSION = 1
+
+MISSING = '<missing>'
+
+
+class FeatureBuilder:
+    """
+    Builds the model feature matrix as CSR with a fixed, versioned column layout.
+
+    Each categorical column gets one 0/1 column per category of its frozen top-N vocabulary
+    (sorted, with 'Other' for every category outside it) plus one for missing values; each
+    numerical column gets one standardized column. Every row therefore holds exactly one
+    entry per input column, and the CSR arrays are written directly from category codes,
+    without a dense or object intermediate.
+
+    Parameters:
+    categorical_columns (list of str): Columns one-hot encoded on their top-N vocabulary.
+    numerical_columns (list of str): Columns standardized with the training mean and std.
+    top_n (int): Categories kept per categorical column.
+    dtype (np.dtype): Value type of the matrix.
+    """
+
+    def __init__(self, categorical_columns, numerical_columns, top_n=10, dtype=np.float32):
+        self.categorical_columns = list(categorical_columns)
+        self.numerical_columns = list(numerical_columns)
+        self.top_n = top_n
+        self.dtype = dtype
+
+    @property
+    def input_columns_(self):
+        return self.categorical_columns + self.numerical_columns
+
+    def fit(self, data):
+        collapser = TopNCollapser(self.categorical_columns, self.top_n).fit(data)
+        self.categories_ = {column: sorted(collapser.categories(column), key=str)
+                            for column in self.categorical_columns}
+        self.other_ = collapser.other
+        numeric = data[self.numerical_columns].to_numpy(dtype=np.float64)
+        self.mean_ = numeric.mean(axis=0)
+        scale = numeric.std(axis=0)
+        self.scale_ = np.where(scale > 0, scale, 1.0)
+
+        self.feature_names_ = [f'{column}={category}' for column in self.categorical_columns
+                               for category in self.categories_[column] + [MISSING]]
+        self.feature_names_ += self.numerical_columns
+        self.layout_version_ = LAYOUT_VERSION
+        self.layout_hash_ = hashlib.sha256('\n'.join(self.feature_names_).encode('utf-8')).hexdigest()
+        return self
+
+    def _codes(self, series, categories):
+        # Position of each value in categories; unseen values -> 'Other', missing -> the last slot
+        other = categories.index(self.other_)
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            lookup = pd.Index(categories).get_indexer(series.cat.categories)
+            lookup = np.append(np.where(lookup == -1, other, lookup), len(categories))
+            return lookup[series.cat.codes.to_numpy()]
+        codes = pd.Index(categories).get_indexer(series)
+        missing = series.isna().to_numpy()
+        return np.where(missing, len(categories), np.where(codes == -1, other, codes))
+
+    def transform(self, data):
+        """
+        Returns the CSR feature matrix of a frame, with the layout learned by fit().
+        """
+        n_rows = len(data)
+        indices = []
+        offset = 0
+        for column in self.categorical_columns:
+            categories = self.categories_[column]
+            indices.append(offset + self._codes(data[column], categories))
+            offset += len(categories) + 1
+        for position, column in enumerate(self.numerical_columns):
+            indices.append(np.full(n_rows, offset + position))
+
+        values = (data[self.numerical_columns].to_numpy(dtype=np.float64) - self.mean_) / self.scale_
+        data_array = np.hstack([np.ones((n_rows, len(self.categorical_columns))), values]).astype(self.dtype)
+        width = len(indices)
+        index_dtype = np.int32 if n_rows * width < 2 ** 31 else np.int64
+        return sp.csr_matrix((data_array.ravel(), np.column_stack(indices).astype(index_dtype).ravel(),
+                              np.arange(0, n_rows * width + 1, width, dtype=index_dtype)),
+                             shape=(n_rows, len(self.feature_names_)))
+
+    def fit_transform(self, data):
+        return self.fit(data).transform(data)
+
+
+class CategoryCodes(BaseEstimator, TransformerMixin):
+    """
+    Turns a FeatureBuilder matrix back into one column per input column, for models with
+    native categorical support.
+
+    A FeatureBuilder row holds exactly one entry per input column, in order, so entry j of a
+    row is read straight from the CSR arrays, without expanding the one-hot block. Positions
+    where the training rows use several feature indices are categorical and become pandas
+    categoricals of the index's rank among them (indices unseen in training become missing);
+    positions with a single index are numerical and keep their values.
+    """
+
+    def _entries(self, X):
+        X = sp.csr_matrix(X)
+        width = X.indptr[1] - X.indptr[0] if X.shape[0] else 0
+        if X.nnz != X.shape[0] * width:
+            raise ValueError("CategoryCodes expects a FeatureBuilder matrix with one entry per input column")
+        return X.indices.reshape(-1, width), X.data.reshape(-1, width)
+
+    def fit(self, X, y=None):
+        indices, _ = self._entries(X)
+        self.feature_indices_ = [np.unique(column) for column in indices.T]
+        self.categorical_ = np.array([len(seen) > 1 for seen in self.feature_indices_])
+        return self
+
+    def transform(self, X):
+        indices, values = self._entries(X)
+        if indices.shape[1] != len(self.feature_indices_):
+            raise ValueError(f"CategoryCodes was fitted on {len(self.feature_indices_)} input columns, "
+                             f"got {indices.shape[1]}")
+        columns = {}
+        for position, seen in enumerate(self.feature_indices_):
+            if not self.categorical_[position]:
+                columns[f'x{position}'] = values[:, position]
+                continue
+            codes = np.searchsorted(seen, indices[:, position])
+            found = codes < len(seen)
+            found[found] = seen[codes[found]] == indices[found, position]
+            columns[f'x{position}'] = pd.Categorical.from_codes(np.where(found, codes, -1),
+                                                                categories=np.arange(len(seen)))
+        return pd.DataFrame(columns)
@@ -0,0 +1,300 @@
+# figures.py
+import functools
+import hashlib
+import io
+import json
+import multiprocessing
+import os
+from concurrent.futures import Future, ProcessPoolExecutor
+import numpy as np
+from cache_utils import atomic_write, cache_path
+from pipeline import load_stage, stage_fingerprints
+
+# Bump when the look of any figure changes so cached images are re-rendered
+FIGURES_VERSION = 1
+
+# Alternative bright colors
+bright_colors = ['#FF1493', '#00FFFF', '#FF4500', '#7FFF00', '#9932CC', '#00CED1', '#FFD700']
+count_colors = ['#FF6347', '#4682B4', '#32CD32', '#FFD700', '#FF69B4', '#40E0D0', '#DC143C']
+
+title_font = dict(fontsize=16, fontweight='bold', family=['Times New Roman', 'serif'])
+label_font = dict(fontsize=14, fontweight='bold', family=['Times New Roman', 'serif'])
+
+
+def _pyplot():
+    # Imported lazily so that only the processes that actually render pay for matplotlib
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+    return plt
+
+
+def _colormap():
+    import matplotlib.colors as mcolors
+    return mcolors.LinearSegmentedColormap.from_list('bright_cmap', bright_colors, N=256)
+
+
+def plot_countplot(data, column):
+    """
+    Plots a count plot of the top categories of a categorical column, annotated with counts.
+    """
+    import seaborn as sns
+    plt = _pyplot()
+
+    # Determine the top categories based on the number of unique values
+    if data[column].nunique() <= 2:
+        top_categories = data[column].dropna().unique().tolist()
+    else:
+        top_categories = data[column].value_counts().nlargest(11).index.tolist()
+    filtered_df = data[data[column].isin(top_categories)]
+
+    fig, ax = plt.subplots(figsize=(14, 8))
+    sns.countplot(x=filtered_df[column].astype(str), order=[str(c) for c in top_categories],
+                  hue=filtered_df[column].astype(str), legend=False,
+                  palette=(count_colors * 2)[:len(top_categories)], ax=ax)
+
+    # Annotate the bars with counts
+    for p in ax.patches:
+        height = p.get_height()
+        if height > 0:
+            ax.annotate(f'{int(height)}', (p.get_x() + p.get_width() / 2., height),
+                        ha='center', va='bottom', xytext=(0, 5), textcoords='offset points', **title_font)
+
+    ax.set_title(f'Count Plot of {column} (Top {len(top_categories)} Categories)', **title_font)
+    ax.set_xlabel('Count', **title_font)
+    ax.set_ylabel(column, **title_font)
+    ax.tick_params(axis='x', rotation=90)
+    ax.grid(axis='y', linestyle='--', alpha=0.7)
+    fig.tight_layout()
+    return fig
+
+
+def plot_pie_chart(data, column):
+    """
+    Plots a pie chart of a categorical column, limited to its top 5 categories.
+    """
+    plt = _pyplot()
+
+    counts = data[column].value_counts()
+    if data[column].nunique() > 2:
+        counts = counts.nlargest(5)
+        title = f'Data Distribution of {column} (Top 5 Categories)'
+    else:
+        counts = counts[counts > 0]
+        title = f'Data Distribution of {column}'
+
+    fig, ax = plt.subplots(figsize=(10, 8))
+    ax.pie(counts.values, labels=[str(label) for label in counts.index], autopct='%1.1f%%',
+           colors=bright_colors[:len(counts)], explode=[0.1] * len(counts),
+           wedgeprops=dict(width=0.7), textprops=dict(fontsize=14))
+    ax.set_title(title, **title_font)
+    return fig
+
+
+def plot_distribution(data, column, color_index=0):
+    """
+    Plots the distribution of a numerical column with a KDE curve.
+    """
+    import seaborn as sns
+    plt = _pyplot()
+
+    fig, ax = plt.subplots(figsize=(8, 6))
+    sns.histplot(data[column], kde=True, color=bright_colors[color_index % len(bright_colors)], ax=ax)
+    ax.set_title(f'Distribution of {column}', **title_font)
+    ax.set_xlabel(column, **label_font)
+    ax.set_ylabel('Frequency', **label_font)
+    return fig
+
+
+def plot_boxplots(data, columns):
+    """
+    Plots box plots with outliers for several numerical columns.
+    """
+    import seaborn as sns
+    plt = _pyplot()
+
+    num_cols = 3
+    num_rows = (len(columns) + num_cols - 1) // num_cols
+    fig, axs = plt.subplots(num_rows, num_cols, figsize=(12, 10))
+    axs = np.ravel(axs)
+    for i, column in enumerate(columns):
+        color = bright_colors[i % len(bright_colors)]
+        sns.boxplot(y=data[column], ax=axs[i], color=color, fliersize=8, linewidth=1.5,
+                    flierprops=dict(markerfacecolor=color, markeredgecolor=color))
+        axs[i].set_title(f'Box Plot of {column}', **title_font)
+        axs[i].set_ylabel(column, **label_font)
+
+    # Remove any unused subplot
+    for j in range(len(columns), len(axs)):
+        fig.delaxes(axs[j])
+    fig.tight_layout()
+    return fig
+
+
+def plot_scatter(data, x_column, y_column, hue_column=None, size_column=None, style_column=None):
+    """
+    Plots a scatter plot of two numerical columns, optionally encoding categorical columns
+    as hue, marker size and marker style.
+    """
+    import seaborn as sns
+    plt = _pyplot()
+
+    fig, ax = plt.subplots(figsize=(12, 8))
+    if hue_column is None:
+        ax.scatter(data[x_column], data[y_column], c=bright_colors[0], edgecolor='black', alpha=0.7, s=100)
+    else:
+        hues = data[hue_column].dropna().unique()
+        palette = dict(zip(hues, (bright_colors * 2)[:len(hues)]))
+        extra = dict(size=size_column, style=style_column, sizes=(50, 200)) if size_column else dict(s=100)
+        sns.scatterplot(data=data, x=x_column, y=y_column, hue=hue_column, palette=palette,
+                        edgecolor='black', alpha=0.7, ax=ax, **extra)
+        ax.legend(title_fontsize='13', fontsize='11', loc='best')
+
+    ax.set_title(f'Scatter Plot of {x_column} vs {y_column}', **title_font)
+    ax.set_xlabel(x_column, **label_font)
+    ax.set_ylabel(y_column, **label_font)
+    ax.grid(True, linestyle='--', alpha=0.7)
+    return fig
+
+
+def plot_matrix_heatmap(data, method, matrix=None):
+    """
+    Plots a heatmap of the covariance or a correlation matrix of the numeric columns.
+
+    Parameters:
+    matrix (pd.DataFrame): The correlation matrix, if already computed; computed from the
+        data otherwise.
+    """
+    import seaborn as sns
+    plt = _pyplot()
+
+    numeric_data = data.select_dtypes(include=[np.number])
+    if method == 'covariance':
+        matrix, title, fmt = numeric_data.cov(), 'Covariance Matrix Heatmap', '.2g'
+    else:
+        if matrix is None:
+            from correlation import correlation_matrices
+            matrix = correlation_matrices(numeric_data)[method]
+        title, fmt = f'{method.title()} Correlation Matrix Heatmap', '.2f'
+
+    fig, ax = plt.subplots(figsize=(10, 8))
+    sns.heatmap(matrix, cmap=_colormap(), annot=True, fmt=fmt, linewidths=0.5, ax=ax)
+    ax.set_title(title, **title_font)
+    ax.set_xlabel('Variables', **title_font)
+    ax.set_ylabel('Variables', **title_font)
+    ax.tick_params(axis='x', rotation=90)
+    return fig
+
+
+def plot_missing_values(data):
+    """
+    Plots a heatmap of the missing values of every column.
+    """
+    import seaborn as sns
+    plt = _pyplot()
+
+    fig, ax = plt.subplots(figsize=(12, 8))
+    sns.heatmap(data.isnull(), cbar=False, cmap=_colormap(), ax=ax)
+    ax.set_title('Missing Values Heatmap', **title_font)
+    ax.set_xlabel('Columns', **label_font)
+    ax.set_ylabel('Rows', **label_font)
+    fig.tight_layout()
+    return fig
+
+
+# Figure kind -> plotting function taking the frame and the figure parameters
+FIGURES = {
+    'count': plot_countplot,
+    'pie': plot_pie_chart,
+    'distribution': plot_distribution,
+    'boxplots': plot_boxplots,
+    'scatter': plot_scatter,
+    'heatmap': plot_matrix_heatmap,
+    'missing': plot_missing_values,
+}
+
+
+def _heatmap_inputs(stage, fingerprint, method):
+    # The matrices of the dataset version come from the correlation cache the page also reads
+    if method == 'covariance':
+        return {}
+    from correlation import cached_correlation_matrices
+    numeric_data = load_stage(stage).select_dtypes(include=[np.number])
+    return {'matrix': cached_correlation_matrices(numeric_data, fingerprint)[method]}
+
+
+# Figure kind -> function computing extra plotting arguments in the submitting process, from
+# (stage, fingerprint, **params); they are sent to the worker and are not part of the cache key
+FIGURE_INPUTS = {
+    'heatmap': _heatmap_inputs,
+}
+
+
+def figure_path(kind, stage, fingerprint, params):
+    key = json.dumps([FIGURES_VERSION, kind, stage, fingerprint, params], sort_keys=True, default=str)
+    return cache_path('figures', hashlib.sha256(key.encode('utf-8')).hexdigest() + '.png')
+
+
+def render_figure(kind, stage, fingerprint, params, inputs=None):
+    """
+    Renders one figure from a pipeline stage and caches it as a PNG.
+
+    Parameters:
+    kind (str): Key of FIGURES.
+    stage (str): Pipeline stage whose output is plotted, e.g. 'cleaned'.
+    fingerprint (str): Fingerprint of that stage output.
+    params (dict): Keyword arguments of the plotting function.
+    inputs (dict): Precomputed keyword arguments of the plotting function (see FIGURE_INPUTS).
+
+    Returns:
+    str: Path of the cached PNG.
+    """
+    path = figure_path(kind, stage, fingerprint, params)
+    if os.path.exists(path):
+        return path
+    if stage_fingerprints()[stage] != fingerprint:
+        raise RuntimeError(f"The '{stage}' data changed while its figures were being rendered")
+
+    plt = _pyplot()
+    fig = FIGURES[kind](load_stage(stage), **params, **(inputs or {}))
+    buffer = io.BytesIO()
+    fig.savefig(buffer, format='png', dpi=100, bbox_inches='tight')
+    plt.close(fig)
+    atomic_write(path, buffer.getvalue())
+    return path
+
+
+class FigureRenderer:
+    """
+    Renders figures in a pool of worker processes, off the Streamlit script thread.
+
+    Figures already cached for the current (figure, dataset fingerprint, parameters) are
+    returned without touching the pool. Workers are spawned rather than forked, so they do
+    not inherit the threads and state of the Streamlit server process.
+
+    Parameters:
+    max_workers (int): Number of worker processes; one per CPU by default.
+    """
+
+    def __init__(self, max_workers=None):
+        self.max_workers = max_workers
+        self._pool = None
+
+    def submit(self, kind, stage='cleaned', **params):
+        fingerprint = stage_fingerprints()[stage]
+        path = figure_path(kind, stage, fingerprint, params)
+        if os.path.exists(path):
+            future = Future()
+            future.set_result(path)
+            return future
+        inputs = FIGURE_INPUTS[kind](stage, fingerprint, **params) if kind in FIGURE_INPUTS else None
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=self.max_workers,
+                                             mp_context=multiprocessing.get_context('spawn'))
+        return self._pool.submit(render_figure, kind, stage, fingerprint, params, inputs)
+
+
+@functools.lru_cache(maxsize=1)
+def get_renderer():
+    # One pool per process, shared by every session
+    return FigureRenderer()
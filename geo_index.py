@@ -0,0 +1,162 @@
+# geo_index.py
+import argparse
+import functools
+import time
+import numpy as np
+import pandas as pd
+from sklearn.neighbors import BallTree
+from cuisine_index import split_cuisines
+from pipeline import load_clean_data, rated_mask, stage_fingerprints
+
+EARTH_RADIUS_KM = 6371.0088
+
+# Default neighbourhood radius of the batch features
+DEFAULT_RADIUS_KM = 1.0
+
+
+class GeoIndex:
+    """
+    Ball tree over restaurant coordinates with great-circle (haversine) distances.
+
+    Restaurants placed at (0, 0), the dataset's placeholder for a missing location, are
+    left out of the index.
+
+    Parameters:
+    data (pd.DataFrame): Restaurants with 'Latitude', 'Longitude', 'Cuisines' and
+        'Aggregate rating' columns, e.g. pipeline.load_clean_data().
+    """
+
+    def __init__(self, data):
+        located = ~((data['Latitude'] == 0) & (data['Longitude'] == 0)) & data[['Latitude', 'Longitude']].notna().all(axis=1)
+        self.index = data.index
+        self.data = data[located]
+        self.coordinates = np.radians(self.data[['Latitude', 'Longitude']].to_numpy(dtype=float))
+        self.tree = BallTree(self.coordinates, metric='haversine')
+        self.cuisines, self.cuisine_names = split_cuisines(self.data['Cuisines'])
+        self._cuisine_position = {name: i for i, name in enumerate(self.cuisine_names)}
+
+    def _point(self, latitude, longitude):
+        return np.radians([[latitude, longitude]])
+
+    def knn(self, latitude, longitude, k=5):
+        """
+        Returns the k restaurants nearest to a point, closest first, with a 'distance_km' column.
+        """
+        distances, indices = self.tree.query(self._point(latitude, longitude), k=min(k, len(self.data)))
+        return self.data.iloc[indices[0]].assign(distance_km=distances[0] * EARTH_RADIUS_KM)
+
+    def within(self, latitude, longitude, radius_km):
+        """
+        Returns every restaurant within radius_km of a point, closest first, with a 'distance_km' column.
+        """
+        indices, distances = self.tree.query_radius(self._point(latitude, longitude),
+                                                    r=radius_km / EARTH_RADIUS_KM,
+                                                    return_distance=True, sort_results=True)
+        return self.data.iloc[indices[0]].assign(distance_km=distances[0] * EARTH_RADIUS_KM)
+
+    def competitor_density(self, latitude, longitude, radius_km, cuisine=None):
+        """
+        Counts the restaurants serving each cuisine within radius_km of a point.
+
+        Parameters:
+        cuisine (str): Only return the count of this cuisine.
+
+        Returns:
+        pd.Series or int: Restaurants per cuisine, most common first, or the count of one cuisine.
+        """
+        indices = self.tree.query_radius(self._point(latitude, longitude), r=radius_km / EARTH_RADIUS_KM)[0]
+        if cuisine is not None:
+            if cuisine not in self._cuisine_position:
+                return 0
+            return int(self.cuisines[indices, self._cuisine_position[cuisine]].sum())
+        counts = np.asarray(self.cuisines[indices].sum(axis=0)).ravel()
+        density = pd.Series(counts, index=self.cuisine_names, name='restaurants')
+        return density[density > 0].sort_values(ascending=False)
+
+    def neighborhood_features(self, radius_km=DEFAULT_RADIUS_KM, k=5):
+        """
+        Computes neighbourhood features of every indexed restaurant with one batch tree query.
+
+        Returns:
+        pd.DataFrame: Per restaurant (same index as the data; NaN for unlocated rows):
+            'neighbors' within radius_km, 'same_cuisine_neighbors' sharing at least one
+            cuisine, 'neighbor_mean_rating' of the rated neighbours (see pipeline.rated_mask),
+            'nearest_km' and the 'mean_knn_km' distance to the k nearest restaurants.
+        """
+        n = len(self.data)
+        indices = self.tree.query_radius(self.coordinates, r=radius_km / EARTH_RADIUS_KM)
+        owners = np.repeat(np.arange(n), [len(row) for row in indices])
+        neighbors = np.concatenate(indices) if n else np.empty(0, dtype=np.int64)
+        others = owners != neighbors
+        owners, neighbors = owners[others], neighbors[others]
+
+        # A neighbour is a same-cuisine competitor when their cuisine rows overlap
+        shared = np.asarray(self.cuisines[owners].multiply(self.cuisines[neighbors]).sum(axis=1)).ravel() > 0
+        counts = np.bincount(owners, minlength=n)
+        # Unrated neighbours have a placeholder rating of 0 and are left out of the mean
+        rated = rated_mask(self.data).astype(float)
+        ratings = self.data['Aggregate rating'].to_numpy(dtype=float) * rated
+        with np.errstate(invalid='ignore', divide='ignore'):
+            mean_rating = (np.bincount(owners, weights=ratings[neighbors], minlength=n)
+                           / np.bincount(owners, weights=rated[neighbors], minlength=n))
+
+        distances, _ = self.tree.query(self.coordinates, k=min(k + 1, n))
+        distances = distances[:, 1:] * EARTH_RADIUS_KM
+        features = pd.DataFrame({
+            'neighbors': counts,
+            'same_cuisine_neighbors': np.bincount(owners[shared], minlength=n),
+            'neighbor_mean_rating': mean_rating,
+            'nearest_km': distances[:, 0] if distances.shape[1] else np.nan,
+            'mean_knn_km': distances.mean(axis=1) if distances.shape[1] else np.nan,
+        }, index=self.data.index)
+        return features.reindex(self.index)
+
+
+@functools.lru_cache(maxsize=2)
+def get_geo_index(data_fingerprint=None):
+    """
+    Returns the GeoIndex of a dataset version, built once per process.
+
+    Parameters:
+    data_fingerprint (str): Fingerprint of the cleaned data; the current one by default.
+    """
+    if data_fingerprint is None:
+        return get_geo_index(stage_fingerprints()['cleaned'])
+    return GeoIndex(load_clean_data())
+
+
+def benchmark(queries=1000, radius_km=DEFAULT_RADIUS_KM, k=5, random_state=0):
+    """
+    Times single-point queries at random restaurant locations and one batch feature pass.
+
+    Returns:
+    dict: Mean milliseconds per knn, within and competitor_density query, and batch seconds.
+    """
+    start = time.perf_counter()
+    index = get_geo_index()
+    results = {'build_seconds': time.perf_counter() - start}
+    rng = np.random.RandomState(random_state)
+    points = index.data[['Latitude', 'Longitude']].to_numpy()[rng.randint(len(index.data), size=queries)]
+
+    for name, query in [('knn_ms', lambda lat, lon: index.knn(lat, lon, k)),
+                        ('within_ms', lambda lat, lon: index.within(lat, lon, radius_km)),
+                        ('competitor_density_ms', lambda lat, lon: index.competitor_density(lat, lon, radius_km))]:
+        start = time.perf_counter()
+        for latitude, longitude in points:
+            query(latitude, longitude)
+        results[name] = (time.perf_counter() - start) * 1000 / queries
+
+    start = time.perf_counter()
+    index.neighborhood_features(radius_km, k)
+    results['batch_features_seconds'] = time.perf_counter() - start
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Geospatial index queries over the cleaned data")
+    parser.add_argument('--radius-km', type=float, default=DEFAULT_RADIUS_KM)
+    parser.add_argument('--k', type=int, default=5)
+    parser.add_argument('--queries', type=int, default=1000)
+    args = parser.parse_args()
+    for name, value in benchmark(args.queries, args.radius_km, args.k).items():
+        print(f"{name}: {value:.4f}")
@@ -0,0 +1,274 @@
+# incremental_stats.py
+import hashlib
+import os
+import numpy as np
+import pandas as pd
+from cache_utils import atomic_open, cache_path
+
+# HyperLogLog precision: 2**14 registers, about 0.8% standard error
+HLL_PRECISION = 14
+
+
+def _bit_length(values):
+    # Bit length of uint64 values, exact for the whole range
+    values = np.asarray(values, dtype=np.uint64)
+    high = (values >> np.uint64(32)).astype(np.float64)
+    low = (values & np.uint64(0xFFFFFFFF)).astype(np.float64)
+    with np.errstate(divide='ignore'):
+        high_bits = np.where(high > 0, np.floor(np.log2(high)) + 33, 0)
+        low_bits = np.where(low > 0, np.floor(np.log2(low)) + 1, 0)
+    return np.where(high > 0, high_bits, low_bits).astype(np.int64)
+
+
+def hash_values(series):
+    """
+    Returns 64-bit hashes of the non-null values of a column, stable across batches.
+    """
+    return pd.util.hash_pandas_object(series.dropna(), index=False).to_numpy()
+
+
+class HyperLogLog:
+    """
+    Mergeable distinct-count sketch.
+
+    Parameters:
+    precision (int): log2 of the number of registers.
+    """
+
+    def __init__(self, precision=HLL_PRECISION):
+        self.precision = precision
+        self.registers = np.zeros(1 << precision, dtype=np.uint8)
+
+    def add_hashes(self, hashes):
+        if len(hashes) == 0:
+            return self
+        hashes = np.asarray(hashes, dtype=np.uint64)
+        index = (hashes >> np.uint64(64 - self.precision)).astype(np.int64)
+        # Rank = position of the first set bit in the remaining 64 - precision bits
+        remainder = hashes << np.uint64(self.precision)
+        rank = np.minimum(64 - _bit_length(remainder) + 1, 64 - self.precision + 1).astype(np.uint8)
+        np.maximum.at(self.registers, index, rank)
+        return self
+
+    def merge(self, other):
+        np.maximum(self.registers, other.registers, out=self.registers)
+        return self
+
+    def estimate(self):
+        m = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / m)
+        raw = alpha * m * m / np.sum(np.power(2.0, -self.registers.astype(np.float64)))
+        zeros = int(np.count_nonzero(self.registers == 0))
+        if raw <= 2.5 * m and zeros:
+            # Linear counting is more accurate for small cardinalities
+            return int(round(m * np.log(m / zeros)))
+        return int(round(raw))
+
+
+class RunningStats:
+    """
+    Mergeable summary statistics of a restaurant DataFrame.
+
+    Numeric columns keep Welford/Chan accumulators (count, mean, co-moment matrix, min, max);
+    every column keeps a null counter and a HyperLogLog distinct-count sketch; whole rows are
+    tracked by 64-bit hash for duplicate detection. New batches are folded in with update(),
+    and the dashboard getters read the accumulators without touching the data.
+
+    Covariance is computed over the rows where every numeric column is present.
+
+    Parameters:
+    data (pd.DataFrame): First batch; it fixes the schema.
+    """
+
+    def __init__(self, data):
+        self.schema = [(column, str(dtype)) for column, dtype in data.dtypes.items()]
+        self.numeric_columns = data.select_dtypes(include=[np.number]).columns.tolist()
+        k = len(self.numeric_columns)
+
+        self.rows = 0
+        self.nulls = pd.Series(0, index=data.columns, dtype=np.int64)
+        self.sketches = {column: HyperLogLog() for column in data.columns}
+        self.row_hashes = np.empty(0, dtype=np.uint64)
+        self.duplicates = 0
+
+        self.count = np.zeros(k, dtype=np.int64)
+        self.mean = np.zeros(k)
+        self.m2 = np.zeros(k)
+        self.minimum = np.full(k, np.inf)
+        self.maximum = np.full(k, -np.inf)
+        self.complete_rows = 0
+        self.complete_mean = np.zeros(k)
+        self.comoment = np.zeros((k, k))
+
+        self.update(data)
+
+    @property
+    def schema_hash(self):
+        return hashlib.sha256(repr(self.schema).encode('utf-8')).hexdigest()
+
+    def _check_schema(self, data):
+        schema = [(column, str(dtype)) for column, dtype in data.dtypes.items()]
+        if [column for column, _ in schema] != [column for column, _ in self.schema]:
+            raise ValueError("The batch columns differ from the summary schema; rebuild the summary")
+
+    def update(self, data):
+        """
+        Folds a new batch of rows into the running statistics.
+
+        Parameters:
+        data (pd.DataFrame): New rows with the same columns as the first batch.
+        """
+        self._check_schema(data)
+        self.rows += len(data)
+        self.nulls += data.isnull().sum().astype(np.int64)
+        for column in data.columns:
+            self.sketches[column].add_hashes(hash_values(data[column]))
+
+        # Exact duplicate detection on whole-row hashes
+        hashes = pd.util.hash_pandas_object(data, index=False).to_numpy()
+        unique_hashes = np.unique(hashes)
+        new_hashes = np.setdiff1d(unique_hashes, self.row_hashes, assume_unique=True)
+        self.duplicates += len(hashes) - len(new_hashes)
+        self.row_hashes = np.union1d(self.row_hashes, new_hashes)
+
+        values = data[self.numeric_columns].to_numpy(dtype=float)
+        self._update_moments(values)
+        return self
+
+    def _update_moments(self, values):
+        # Per-column mean and variance (Chan et al. pairwise update), ignoring nulls
+        present = ~np.isnan(values)
+        batch_count = present.sum(axis=0)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            batch_mean = np.where(batch_count > 0, np.nansum(values, axis=0) / np.maximum(batch_count, 1), 0.0)
+            batch_m2 = np.nansum((values - batch_mean) ** 2, axis=0)
+        total = self.count + batch_count
+        delta = batch_mean - self.mean
+        safe_total = np.maximum(total, 1)
+        self.mean = self.mean + delta * batch_count / safe_total
+        self.m2 = self.m2 + batch_m2 + delta ** 2 * self.count * batch_count / safe_total
+        self.count = total
+        if len(values):
+            self.minimum = np.fmin(self.minimum, np.nanmin(np.where(present, values, np.inf), axis=0))
+            self.maximum = np.fmax(self.maximum, np.nanmax(np.where(present, values, -np.inf), axis=0))
+
+        # Co-moments over complete rows
+        complete = values[present.all(axis=1)]
+        n_b = len(complete)
+        if n_b == 0:
+            return
+        mean_b = complete.mean(axis=0)
+        centered = complete - mean_b
+        n_a = self.complete_rows
+        n = n_a + n_b
+        delta = mean_b - self.complete_mean
+        self.comoment += centered.T @ centered + np.outer(delta, delta) * n_a * n_b / n
+        self.complete_mean += delta * n_b / n
+        self.complete_rows = n
+
+    def merge(self, other):
+        """
+        Combines the statistics of a summary built from other rows with the same schema.
+
+        Duplicates between the two summaries are detected through their row hashes.
+        """
+        if other.schema != self.schema:
+            raise ValueError("Summaries with different schemas cannot be merged")
+        overlap = len(np.intersect1d(self.row_hashes, other.row_hashes, assume_unique=True))
+        self.duplicates += other.duplicates + overlap
+        self.row_hashes = np.union1d(self.row_hashes, other.row_hashes)
+        self.rows += other.rows
+        self.nulls += other.nulls
+        for column, sketch in other.sketches.items():
+            self.sketches[column].merge(sketch)
+
+        total = self.count + other.count
+        safe_total = np.maximum(total, 1)
+        delta = other.mean - self.mean
+        self.m2 = self.m2 + other.m2 + delta ** 2 * self.count * other.count / safe_total
+        self.mean = self.mean + delta * other.count / safe_total
+        self.count = total
+        self.minimum = np.fmin(self.minimum, other.minimum)
+        self.maximum = np.fmax(self.maximum, other.maximum)
+
+        n_a, n_b = self.complete_rows, other.complete_rows
+        if n_b:
+            n = n_a + n_b
+            delta = other.complete_mean - self.complete_mean
+            self.comoment += other.comoment + np.outer(delta, delta) * n_a * n_b / n
+            self.complete_mean += delta * n_b / n
+            self.complete_rows = n
+        return self
+
+    def null_counts(self):
+        return self.nulls.copy()
+
+    def duplicate_count(self):
+        return int(self.duplicates)
+
+    def nunique(self, column):
+        return self.sketches[column].estimate()
+
+    def var(self):
+        with np.errstate(invalid='ignore', divide='ignore'):
+            variance = np.where(self.count > 1, self.m2 / (self.count - 1), np.nan)
+        return pd.Series(variance, index=self.numeric_columns)
+
+    def cov(self):
+        denominator = self.complete_rows - 1 if self.complete_rows > 1 else np.nan
+        return pd.DataFrame(self.comoment / denominator, index=self.numeric_columns,
+                            columns=self.numeric_columns)
+
+    def describe(self):
+        # The mergeable subset of DataFrame.describe(); quartiles are not mergeable exactly
+        return pd.DataFrame({
+            'count': self.count.astype(float),
+            'mean': self.mean,
+            'std': np.sqrt(self.var().to_numpy()),
+            'min': self.minimum,
+            'max': self.maximum,
+        }, index=self.numeric_columns).T
+
+    def save(self, path):
+        with atomic_open(path) as f:
+            pd.to_pickle(self, f)
+
+
+def stats_path(data_fingerprint):
+    return cache_path('stats', f'{data_fingerprint}.pkl')
+
+
+def cached_stats(data, data_fingerprint):
+    """
+    Returns the RunningStats of a dataset version, building them only once.
+
+    Parameters:
+    data (pd.DataFrame): The data the summary describes.
+    data_fingerprint (str): Fingerprint of that data, e.g. from pipeline.stage_fingerprints().
+    """
+    path = stats_path(data_fingerprint)
+    if os.path.exists(path):
+        stats = pd.read_pickle(path)
+        if stats.schema == [(column, str(dtype)) for column, dtype in data.dtypes.items()]:
+            return stats
+
+    # Missing or built for another schema: recompute from the full data
+    stats = RunningStats(data)
+    stats.save(path)
+    return stats
+
+
+def append_batch(state_path, batch):
+    """
+    Folds a new batch of records into a saved summary, or starts a new one.
+
+    Parameters:
+    state_path (str): File holding the pickled RunningStats.
+    batch (pd.DataFrame): Newly appended rows.
+    """
+    if os.path.exists(state_path):
+        stats = pd.read_pickle(state_path).update(batch)
+    else:
+        stats = RunningStats(batch)
+    stats.save(state_path)
+    return stats
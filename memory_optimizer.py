@@ -0,0 +1,132 @@
+# memory_optimizer.py
+import argparse
+import numpy as np
+import pandas as pd
+
+# Yes/No service flags of the cleaned data
+FLAG_COLUMNS = ['Has Table booking', 'Has Online delivery', 'Is delivering now']
+FLAG_VALUES = {'Yes': True, 'No': False}
+
+# Float narrowing is lossy and opt-in: float32 keeps about 7 significant digits, so a column
+# is only narrowed when no value moves by more than this (ratings have one decimal)
+FLOAT_TOLERANCE = 1e-5
+
+# Never narrowed: geo_index distances and the models use the coordinates at full precision
+FULL_PRECISION_COLUMNS = ['Latitude', 'Longitude']
+
+
+def infer_schema(data, flag_columns=FLAG_COLUMNS, narrow_floats=False):
+    """
+    Returns the compact storage kind of every column: 'flag', 'integer', 'float' or 'category'.
+
+    Float columns are only included with narrow_floats, and FULL_PRECISION_COLUMNS never are.
+    Columns of any other kind (e.g. datetimes) are left out and kept as they are.
+    """
+    schema = {}
+    for column, dtype in data.dtypes.items():
+        if column in flag_columns:
+            schema[column] = 'flag'
+        elif isinstance(dtype, pd.CategoricalDtype) or pd.api.types.is_string_dtype(dtype) \
+                or pd.api.types.is_object_dtype(dtype):
+            schema[column] = 'category'
+        elif pd.api.types.is_integer_dtype(dtype):
+            schema[column] = 'integer'
+        elif pd.api.types.is_float_dtype(dtype) and narrow_floats and column not in FULL_PRECISION_COLUMNS:
+            schema[column] = 'float'
+    return schema
+
+
+def compact_flag(series):
+    # Yes/No -> bool; a missing flag needs the nullable boolean dtype
+    flags = series.astype(object).map(FLAG_VALUES)
+    unknown = flags.isna() & series.notna()
+    if unknown.any():
+        raise ValueError(f"{series.name} has values other than Yes/No: {sorted(series[unknown].unique())}")
+    return flags.astype('boolean' if flags.isna().any() else bool)
+
+
+def compact_integer(series):
+    # Signed, so that differences of the values cannot wrap around
+    return pd.to_numeric(series, downcast='integer')
+
+
+def compact_float(series, tolerance=FLOAT_TOLERANCE):
+    values = series.to_numpy(dtype=np.float64)
+    narrowed = values.astype(np.float32)
+    with np.errstate(invalid='ignore'):
+        error = np.nanmax(np.abs(narrowed.astype(np.float64) - values)) if len(values) else 0.0
+    return series.astype(np.float32) if not error > tolerance else series
+
+
+def compact_category(series):
+    # Dictionary encoding; pandas picks the narrowest integer type for the codes
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        return series
+    return series.astype('category')
+
+
+COMPACTORS = {
+    'flag': compact_flag,
+    'integer': compact_integer,
+    'float': compact_float,
+    'category': compact_category,
+}
+
+
+def optimize_memory(data, schema=None):
+    """
+    Stores the columns of a frame in a compact representation.
+
+    Yes/No flags become bool, integers are downcast to the narrowest signed type holding
+    their range and text columns become dictionary-encoded categoricals. Floats are kept as
+    they are unless the schema asks for 'float' (infer_schema(narrow_floats=True)); they then
+    become float32 when no value moves by more than FLOAT_TOLERANCE.
+
+    Parameters:
+    data (pd.DataFrame): The frame to compact; it is not modified.
+    schema (dict): Column -> storage kind (see infer_schema); inferred when omitted.
+
+    Returns:
+    tuple: (compact pd.DataFrame, per-column memory report as a pd.DataFrame)
+    """
+    schema = infer_schema(data) if schema is None else schema
+    compact = data.assign(**{column: COMPACTORS[kind](data[column]) for column, kind in schema.items()})
+    return compact, memory_report(data, compact)
+
+
+def memory_report(before, after):
+    """
+    Compares the deep memory usage of two versions of a frame column by column.
+    """
+    before_bytes = before.memory_usage(deep=True, index=False)
+    after_bytes = after.memory_usage(deep=True, index=False)
+    report = pd.DataFrame({
+        'dtype_before': before.dtypes.astype(str),
+        'dtype_after': after.dtypes.astype(str),
+        'bytes_before': before_bytes,
+        'bytes_after': after_bytes,
+    })
+    report.loc['Total'] = ['', '', before_bytes.sum(), after_bytes.sum()]
+    report['reduction'] = 1 - report['bytes_after'] / report['bytes_before']
+    return report
+
+
+def compact_stage(data):
+    """
+    Compacts a pipeline frame without changing its values: integers are downcast and text
+    columns dictionary-encoded; flags keep their Yes/No categories and floats stay float64.
+    """
+    compact, _ = optimize_memory(data, infer_schema(data, flag_columns=()))
+    return compact
+
+
+if __name__ == "__main__":
+    from pipeline import cast_categories, load_stage
+    parser = argparse.ArgumentParser(description="Memory report of the compacted typed stage")
+    parser.add_argument('--narrow-floats', action='store_true', help="also store floats as float32 (lossy)")
+    args = parser.parse_args()
+    # The typed stage as it would be without compact_stage
+    data = cast_categories(load_stage('trimmed'))
+    _, report = optimize_memory(data, infer_schema(data, flag_columns=(), narrow_floats=args.narrow_floats))
+    with pd.option_context('display.width', 200, 'display.max_columns', 10):
+        print(report)
@@ -0,0 +1,243 @@
+# model_selection.py
+import argparse
+import hashlib
+import json
+import math
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import scipy.sparse as sp
+from sklearn.metrics import accuracy_score
+from sklearn.model_selection import ParameterGrid, StratifiedKFold
+from cache_utils import atomic_open, atomic_write, cache_path
+from features import LAYOUT_VERSION
+from pipeline import load_clean_data, stage_fingerprints
+from training import ARTIFACT_VERSION, MODEL_FAMILIES, RANDOM_STATE, prepare_data, train_model
+
+CV_FOLDS = 5
+
+# Training matrix shared by every task of a worker process (set by _init_worker)
+_shared = {}
+
+
+def _cache_version(data_fingerprint):
+    # Cached matrices and fold scores depend on the feature layout and on the estimator
+    # definitions as well as on the data
+    return f'{data_fingerprint}-f{LAYOUT_VERSION}-a{ARTIFACT_VERSION}'
+
+
+def _matrix_dir(data_fingerprint):
+    return os.path.dirname(cache_path('model_selection', _cache_version(data_fingerprint), 'X_train.json'))
+
+
+def save_shared_matrix(X, y, directory):
+    """
+    Writes the encoded training matrix as raw .npy arrays that workers memory-map.
+
+    Every worker maps the same files read-only, so the matrix is held once in the OS page
+    cache instead of being pickled into each process.
+
+    Parameters:
+    X (sparse or dense matrix): The encoded training features.
+    y (np.ndarray): The encoded training labels.
+    directory (str): Destination folder.
+    """
+    if sp.issparse(X):
+        X = X.tocsr()
+        arrays = {'data': X.data, 'indices': X.indices, 'indptr': X.indptr}
+        layout = {'format': 'csr', 'shape': list(X.shape)}
+    else:
+        arrays = {'dense': np.ascontiguousarray(X)}
+        layout = {'format': 'dense', 'shape': list(X.shape)}
+    arrays['y'] = y
+    for name, array in arrays.items():
+        with atomic_open(os.path.join(directory, f'{name}.npy')) as f:
+            np.save(f, array)
+    atomic_write(os.path.join(directory, 'X_train.json'), json.dumps(layout).encode('utf-8'))
+
+
+def load_shared_matrix(directory):
+    with open(os.path.join(directory, 'X_train.json')) as f:
+        layout = json.load(f)
+
+    def load(name):
+        return np.load(os.path.join(directory, f'{name}.npy'), mmap_mode='r')
+
+    if layout['format'] == 'csr':
+        X = sp.csr_matrix((load('data'), load('indices'), load('indptr')), shape=layout['shape'], copy=False)
+    else:
+        X = load('dense')
+    return X, np.asarray(load('y'))
+
+
+def _init_worker(directory):
+    _shared['X'], _shared['y'] = load_shared_matrix(directory)
+
+
+def _task_key(data_fingerprint, family, params, fold, n_samples):
+    # The estimator's repr lists its non-default constructor arguments, e.g. algorithm='brute'
+    estimator = repr(MODEL_FAMILIES[family][1]())
+    key = json.dumps([_cache_version(data_fingerprint), family, estimator, params, fold, n_samples],
+                     sort_keys=True, default=str)
+    return hashlib.sha256(key.encode('utf-8')).hexdigest()
+
+
+def _run_task(task):
+    # Fit one (family, params) candidate on one fold, optionally on a subsample of its train rows
+    family, params, train_rows, valid_rows, result_path = task
+    X, y = _shared['X'], _shared['y']
+    _, make_estimator, _ = MODEL_FAMILIES[family]
+
+    start = time.perf_counter()
+    model = make_estimator().set_params(**params)
+    model.fit(X[train_rows], y[train_rows])
+    score = accuracy_score(y[valid_rows], model.predict(X[valid_rows]))
+    result = {'score': score, 'fit_seconds': time.perf_counter() - start}
+
+    atomic_write(result_path, json.dumps(result).encode('utf-8'))
+    return result
+
+
+def halving_schedule(n_candidates, n_samples, eta, min_resources):
+    """
+    Returns the (candidates kept, training rows per fold) of each successive-halving rung.
+
+    Parameters:
+    n_candidates (int): Number of candidates in the largest family.
+    n_samples (int): Number of training rows per fold on the last rung.
+    eta (int): Fraction of candidates (1/eta) kept after each rung.
+    min_resources (int): Training rows per fold on the first rung.
+    """
+    n_rungs = max(1, min(int(math.log(max(n_candidates, 1), eta)) + 1,
+                         int(math.log(max(n_samples / min_resources, 1), eta)) + 1))
+    schedule = []
+    for rung in range(n_rungs):
+        resources = n_samples if rung == n_rungs - 1 else min(n_samples, min_resources * eta ** rung)
+        schedule.append((math.ceil(n_candidates / eta ** rung), int(resources)))
+    return schedule
+
+
+def search(families=None, halving=False, eta=3, min_resources=500, n_jobs=None, refit=True):
+    """
+    Cross-validates every candidate of every model family in one process pool.
+
+    Each fold x params result is cached on disk, so an interrupted search resumes where it
+    stopped and an extended grid only fits the new candidates. With halving=True, candidates
+    are first scored on small subsamples and only the best 1/eta of each family advance to
+    larger ones.
+
+    Parameters:
+    families (list of str): Keys of MODEL_FAMILIES to search; all of them by default.
+    halving (bool): Use successive halving instead of an exhaustive search.
+    eta (int): Halving rate.
+    min_resources (int): Training rows per fold on the first halving rung.
+    n_jobs (int): Number of worker processes; one per CPU by default.
+    refit (bool): Refit the best candidate of each family and save it as a model artifact.
+
+    Returns:
+    dict: Per family, the best params, their mean CV accuracy and every candidate's score.
+    """
+    families = list(families or MODEL_FAMILIES)
+    data = load_clean_data()
+    prepared = prepare_data(data)
+    X, y = prepared['X_train'], prepared['y_train']
+
+    # Encode once and share the matrix with every worker through memory-mapped files
+    data_fingerprint = stage_fingerprints()['cleaned']
+    directory = _matrix_dir(data_fingerprint)
+    save_shared_matrix(X, y, directory)
+
+    folds = list(StratifiedKFold(n_splits=CV_FOLDS).split(np.zeros(len(y)), y))
+    rng = np.random.RandomState(RANDOM_STATE)
+    subsample_order = [rng.permutation(train_rows) for train_rows, _ in folds]
+
+    candidates = {family: list(ParameterGrid(MODEL_FAMILIES[family][2])) for family in families}
+    n_train = min(len(train_rows) for train_rows, _ in folds)
+    if halving:
+        schedule = halving_schedule(max(map(len, candidates.values())), n_train, eta, min_resources)
+    else:
+        schedule = [(max(map(len, candidates.values())), n_train)]
+
+    scores = {}
+    with ProcessPoolExecutor(max_workers=n_jobs, initializer=_init_worker, initargs=(directory,)) as pool:
+        for n_keep, n_samples in schedule:
+            # Keep the best candidates of each family from the previous rung
+            candidates = {family: _top_candidates(family, params_list, scores, n_keep)
+                          for family, params_list in candidates.items()}
+            scores = _run_rung(pool, candidates, folds, subsample_order, n_samples,
+                               n_train, data_fingerprint)
+
+    results = {}
+    for family, params_list in candidates.items():
+        ranked = sorted(params_list, key=lambda params: -scores[(family, _params_key(params))])
+        best_params = ranked[0]
+        results[family] = {
+            'best_params': best_params,
+            'cv_accuracy': scores[(family, _params_key(best_params))],
+            'candidates': [(params, scores[(family, _params_key(params))]) for params in ranked],
+        }
+        if refit:
+            results[family]['artifact'] = train_model(family, data, prepared, best_params,
+                                                      results[family]['cv_accuracy'])
+    return results
+
+
+def _params_key(params):
+    return json.dumps(params, sort_keys=True, default=str)
+
+
+def _top_candidates(family, params_list, scores, n_keep):
+    if not scores:
+        return params_list
+    ranked = sorted(params_list, key=lambda params: -scores[(family, _params_key(params))])
+    return ranked[:n_keep]
+
+
+def _run_rung(pool, candidates, folds, subsample_order, n_samples, n_train, data_fingerprint):
+    fold_scores = {}
+    pending = []
+    for family, params_list in candidates.items():
+        for params in params_list:
+            for fold, (train_rows, valid_rows) in enumerate(folds):
+                # The last rung trains on the full fold, as GridSearchCV would
+                rows = train_rows if n_samples >= n_train else np.sort(subsample_order[fold][:n_samples])
+                result_path = cache_path('model_selection', _cache_version(data_fingerprint), 'results',
+                                         _task_key(data_fingerprint, family, params, fold, len(rows)) + '.json')
+                key = (family, _params_key(params))
+                if os.path.exists(result_path):
+                    with open(result_path) as f:
+                        fold_scores.setdefault(key, {})[fold] = json.load(f)['score']
+                else:
+                    task = (family, params, rows, valid_rows, result_path)
+                    pending.append((key, fold, pool.submit(_run_task, task)))
+
+    for key, fold, future in pending:
+        fold_scores.setdefault(key, {})[fold] = future.result()['score']
+    # Averaged in fold order, so a resumed search gives the same scores as an uninterrupted one
+    return {key: float(np.mean([values[fold] for fold in sorted(values)])) for key, values in fold_scores.items()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Parallel, cached hyperparameter search")
+    parser.add_argument('families', nargs='*', help=f"model families to search: {', '.join(MODEL_FAMILIES)}")
+    parser.add_argument('--halving', action='store_true', help="use successive halving")
+    parser.add_argument('--eta', type=int, default=3)
+    parser.add_argument('--min-resources', type=int, default=500)
+    parser.add_argument('--n-jobs', type=int, default=None)
+    parser.add_argument('--no-refit', action='store_true')
+    args = parser.parse_args()
+    unknown = set(args.families) - set(MODEL_FAMILIES)
+    if unknown:
+        parser.error(f"unknown model families: {', '.join(sorted(unknown))}")
+
+    start = time.perf_counter()
+    results = search(args.families, args.halving, args.eta, args.min_resources, args.n_jobs,
+                     not args.no_refit)
+    for family, result in results.items():
+        print(f"{family}: {result['best_params']} (CV accuracy {result['cv_accuracy']:.4f})")
+    print(f"Search finished in {time.perf_counter() - start:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,24 @@
+# navigation.py
+import importlib
+
+# Page name -> module defining a function of the same name. A page module is only imported
+# when its page is shown, so the Introduction page never pays for pandas, seaborn or sklearn.
+PAGES = {
+    "Introduction": "Introduction",
+    "Exploration": "Exploration",
+    "Insights": "Insights",
+    "Reporting": "Reporting",
+    "Modeling": "Modeling",
+}
+DEFAULT_PAGE = "Introduction"
+
+
+def load_page(page):
+    """
+    Imports the module of a page on first use and returns its page function.
+
+    Parameters:
+    page (str): Key of PAGES; unknown names fall back to DEFAULT_PAGE.
+    """
+    module = importlib.import_module(PAGES.get(page, PAGES[DEFAULT_PAGE]))
+    return getattr(module, module.__name__)
@@ -0,0 +1,240 @@
+# pipeline.py
+import functools
+import hashlib
+import os
+import pandas as pd
+import pyarrow.feather as feather
+from cache_utils import atomic_open, cache_path
+from data_access import COUNTRY_FILE, DATA_FILE, dataset_fingerprint, load_country_codes, load_zomato
+from memory_optimizer import compact_stage
+from session_data import shared_view
+
+# Columns removed after the Locality split
+UNUSED_COLUMNS = ['Restaurant ID', 'Address', 'Locality Verbose', 'Switch to order menu', 'Locality',
+                  'City from Locality', 'Country Code', 'Rating color']
+
+# Columns that represent categorical data
+CATEGORICAL_COLUMNS = ['Restaurant Name', 'City', 'Cuisines', 'Currency',
+                       'Has Table booking', 'Has Online delivery', 'Is delivering now',
+                       'Rating text', 'Area', 'Country', 'Price range']
+
+# Columns with too many missing values to keep
+SPARSE_COLUMNS = ['Area']
+
+# Restaurants with this Rating text have no rating; their Aggregate rating is stored as 0
+NOT_RATED = 'Not rated'
+
+# Bump when the logic of any stage changes so its cached output is rebuilt
+PIPELINE_VERSION = 2
+
+
+def merge_country_codes(data, df_country):
+    """
+    Adds the Country name to every restaurant by joining on Country Code.
+
+    Parameters:
+    data (pd.DataFrame): Raw restaurant data.
+    df_country (pd.DataFrame): Country Code to Country lookup table.
+    """
+    return data.merge(df_country, on='Country Code', how='left')
+
+
+def split_locality(data):
+    """
+    Extracts Mall, Area and City from Locality into separate columns.
+
+    Parameters:
+    data (pd.DataFrame): Restaurant data with a Locality column.
+    """
+    parts = data['Locality'].str.split(', ', expand=True, n=2)
+    parts = parts.reindex(columns=range(3))
+    parts.columns = ['Mall', 'Area', 'City from Locality']
+    return data.assign(**{column: parts[column] for column in parts.columns})
+
+
+def drop_unused_columns(data, columns=UNUSED_COLUMNS):
+    """
+    Drops identifier, free-text and duplicated location columns.
+
+    Parameters:
+    data (pd.DataFrame): Restaurant data after the Locality split.
+    columns (list of str): Columns to drop.
+    """
+    return data.drop(columns=columns)
+
+
+def cast_categories(data, columns=CATEGORICAL_COLUMNS, vocabulary=None):
+    """
+    Converts the columns that represent categorical data to the category dtype.
+
+    Parameters:
+    data (pd.DataFrame): Restaurant data.
+    columns (list of str): Columns to convert.
+    vocabulary (dict): Optional fixed categories per column, so that separately processed
+        chunks share the same category codes; inferred from the data when omitted.
+    """
+    if vocabulary is None:
+        return data.astype({column: 'category' for column in columns})
+    return data.astype({column: pd.CategoricalDtype(vocabulary[column]) for column in columns})
+
+
+def type_columns(data):
+    """
+    Casts the categorical columns and stores the frame compactly: integers downcast and the
+    remaining text columns dictionary-encoded (memory_optimizer.compact_stage). Every later
+    stage, and so the cleaned data, keeps these dtypes.
+
+    Parameters:
+    data (pd.DataFrame): Restaurant data.
+    """
+    return compact_stage(cast_categories(data))
+
+
+def drop_sparse_columns(data, columns=SPARSE_COLUMNS):
+    """
+    Drops columns that are mostly null.
+
+    Parameters:
+    data (pd.DataFrame): Restaurant data.
+    columns (list of str): Columns to drop.
+    """
+    return data.drop(columns=columns)
+
+
+def drop_null_rows(data):
+    """
+    Drops every row that still has a null value.
+
+    Parameters:
+    data (pd.DataFrame): Restaurant data.
+    """
+    return data.dropna()
+
+
+# Ordered pipeline stages; each one consumes the output of the previous stage
+STAGES = [
+    ('merged', merge_country_codes),
+    ('locality_split', split_locality),
+    ('trimmed', drop_unused_columns),
+    ('typed', type_columns),
+    ('area_dropped', drop_sparse_columns),
+    ('cleaned', drop_null_rows),
+]
+
+
+def stage_fingerprint(upstream_fingerprint, stage_name):
+    key = f'{upstream_fingerprint}:{stage_name}:{PIPELINE_VERSION}'
+    return hashlib.sha256(key.encode('utf-8')).hexdigest()
+
+
+def source_fingerprint(data_file=DATA_FILE, country_file=COUNTRY_FILE):
+    # The first stage depends on both source files
+    key = f'{dataset_fingerprint(data_file)}:{dataset_fingerprint(country_file)}'
+    return hashlib.sha256(key.encode('utf-8')).hexdigest()
+
+
+def rated_mask(data):
+    """
+    Returns a boolean array marking the restaurants that have a rating.
+
+    The Aggregate rating of NOT_RATED restaurants is a placeholder 0, so rating means and
+    sums must leave those restaurants out.
+
+    Parameters:
+    data (pd.DataFrame): Restaurants with a 'Rating text' column.
+    """
+    return (data['Rating text'].astype(str) != NOT_RATED).to_numpy()
+
+
+def _stage_path(stage_name, fingerprint):
+    return cache_path('pipeline', f'{stage_name}-{fingerprint}.feather')
+
+
+def _read_stage(path):
+    return feather.read_table(path, memory_map=True).to_pandas()
+
+
+def _write_stage(data, path):
+    with atomic_open(path) as f:
+        feather.write_feather(data, f, compression='uncompressed')
+
+
+def stage_fingerprints(data_file=DATA_FILE, country_file=COUNTRY_FILE):
+    """
+    Returns the fingerprint of every stage output, keyed by stage name.
+
+    Parameters:
+    data_file (str): Path to the Zomato CSV file.
+    country_file (str): Path to the Country-Code workbook.
+    """
+    fingerprints = {}
+    upstream = source_fingerprint(data_file, country_file)
+    for stage_name, _ in STAGES:
+        upstream = stage_fingerprint(upstream, stage_name)
+        fingerprints[stage_name] = upstream
+    return fingerprints
+
+
+def run_pipeline(data_file=DATA_FILE, country_file=COUNTRY_FILE):
+    """
+    Runs every stage and returns their outputs, keyed by stage name.
+
+    Each stage's output is cached on disk under the fingerprint of its upstream stage, so a
+    stage only runs when its inputs changed. Results are also kept in memory for the process
+    and shared by every session; each call returns copy-on-write views of them, so a caller
+    modifying its frames in place never changes what other sessions see.
+
+    Parameters:
+    data_file (str): Path to the Zomato CSV file.
+    country_file (str): Path to the Country-Code workbook.
+    """
+    outputs = _run_pipeline(data_file, country_file, source_fingerprint(data_file, country_file))
+    return {stage_name: shared_view(data) for stage_name, data in outputs.items()}
+
+
+@functools.lru_cache(maxsize=2)
+def _run_pipeline(data_file, country_file, fingerprint):
+    outputs = {}
+    data = None
+    upstream = fingerprint
+    for stage_name, stage in STAGES:
+        upstream = stage_fingerprint(upstream, stage_name)
+        path = _stage_path(stage_name, upstream)
+        if os.path.exists(path):
+            data = _read_stage(path)
+        else:
+            if data is None:
+                # Only the first stage to miss the cache needs the source data
+                data = load_zomato(data_file)
+            if stage_name == 'merged':
+                data = stage(data, load_country_codes(country_file))
+            else:
+                data = stage(data)
+            _write_stage(data, path)
+        outputs[stage_name] = data
+    return outputs
+
+
+def load_stage(stage_name, data_file=DATA_FILE, country_file=COUNTRY_FILE):
+    """
+    Returns the output of a single pipeline stage.
+
+    Parameters:
+    stage_name (str): Name of the stage, e.g. 'cleaned'.
+    data_file (str): Path to the Zomato CSV file.
+    country_file (str): Path to the Country-Code workbook.
+    """
+    return run_pipeline(data_file, country_file)[stage_name]
+
+
+def load_clean_data(data_file=DATA_FILE, country_file=COUNTRY_FILE):
+    """
+    Returns the cleaned restaurant data, i.e. the output of the last pipeline stage.
+    """
+    return load_stage('cleaned', data_file, country_file)
+
+
+if __name__ == "__main__":
+    # Headless run: materialize every stage and report what was produced
+    for stage_name, data in run_pipeline().items():
+        print(f"{stage_name}: {data.shape[0]} rows x {data.shape[1]} columns")
@@ -0,0 +1,216 @@
+# profiling.py
+import argparse
+import json
+import math
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import numpy as np
+import pandas as pd
+from cache_utils import atomic_write, cache_path
+from correlation import METHODS, correlation_matrices
+
+# Bump when the layout of the JSON profile changes
+PROFILE_VERSION = 2
+
+MODES = ('quick', 'full')
+
+# Rows profiled in quick mode, drawn at random
+QUICK_ROWS = 5_000
+
+# Below this many profiled rows, columns are profiled in-process: sending every column to a
+# worker process costs more than profiling it
+PARALLEL_MIN_ROWS = 200_000
+
+TOP_VALUES = 10
+HISTOGRAM_BINS = 20
+
+
+def _json_value(value):
+    # NumPy scalars become Python numbers and NaN/inf become null, so the profile is valid JSON
+    if isinstance(value, (np.integer, np.bool_)):
+        return value.item()
+    if isinstance(value, (float, np.floating)):
+        return float(value) if math.isfinite(value) else None
+    return value
+
+
+def profile_column(series):
+    """
+    Summarizes one column: type, missing and distinct values, the most frequent values and,
+    for numeric columns, the describe() statistics and a histogram.
+
+    Parameters:
+    series (pd.Series): The column.
+
+    Returns:
+    dict: The JSON-ready column profile.
+    """
+    count = int(series.notna().sum())
+    counts = series.value_counts(dropna=True)
+    # Categoricals also list their unobserved categories, with a count of 0
+    counts = counts[counts > 0]
+    profile = {
+        'dtype': str(series.dtype),
+        'count': count,
+        'missing': len(series) - count,
+        'missing_pct': _json_value(100 * (len(series) - count) / len(series)) if len(series) else 0.0,
+        'distinct': len(counts),
+        'unique': int((counts == 1).sum()),
+        'memory_bytes': int(series.memory_usage(deep=True, index=False)),
+        'top_values': [[_json_value(value) if not isinstance(value, str) else value, int(n)]
+                       for value, n in counts.head(TOP_VALUES).items()],
+    }
+    if pd.api.types.is_numeric_dtype(series) and not pd.api.types.is_bool_dtype(series):
+        values = series.dropna().to_numpy(dtype=np.float64)
+        profile['kind'] = 'numeric'
+        if len(values):
+            # inf - inf is NaN: moments of a column holding both infinities are null in the profile
+            with np.errstate(invalid='ignore'):
+                quantiles = np.quantile(values, [0.05, 0.25, 0.5, 0.75, 0.95])
+                profile['stats'] = {key: _json_value(value) for key, value in zip(
+                    ['mean', 'std', 'min', 'p5', 'q1', 'median', 'q3', 'p95', 'max'],
+                    [values.mean(), values.std(ddof=1) if len(values) > 1 else np.nan, values.min(), *quantiles,
+                     values.max()])}
+                skewness = series.skew()
+            finite = values[np.isfinite(values)]
+            profile['stats'].update({'zeros': int((values == 0).sum()), 'negatives': int((values < 0).sum()),
+                                     'infinite': len(values) - len(finite), 'skewness': _json_value(skewness)})
+            if len(finite):
+                # The histogram covers the finite values; infinities are counted in the stats
+                hist_counts, edges = np.histogram(finite, bins=HISTOGRAM_BINS)
+                profile['histogram'] = {'edges': [_json_value(edge) for edge in edges],
+                                        'counts': hist_counts.tolist()}
+    else:
+        lengths = series.dropna().astype(str).str.len()
+        profile['kind'] = 'categorical'
+        if len(lengths):
+            profile['length'] = {'min': int(lengths.min()), 'mean': _json_value(lengths.mean()),
+                                 'max': int(lengths.max())}
+    return profile
+
+
+def _profile_task(task):
+    name, series = task
+    return name, profile_column(series)
+
+
+def profile_sections(data, mode='quick', n_jobs=None, random_state=0):
+    """
+    Profiles a frame section by section, yielding each one as soon as it is ready.
+
+    Large frames are profiled in parallel worker processes, yielding the columns in
+    completion order, so a page can show them while the others are still running. Quick mode
+    profiles a random sample of QUICK_ROWS rows; full mode profiles every row.
+
+    Parameters:
+    data (pd.DataFrame): The data to profile.
+    mode (str): 'quick' or 'full'.
+    n_jobs (int): Worker processes; 1 to stay in-process. By default in-process below
+        PARALLEL_MIN_ROWS profiled rows and one worker per CPU above.
+    random_state (int): Seed of the quick-mode sample.
+
+    Yields:
+    tuple: ('overview', None, dict), then ('column', name, dict) per column, then
+    ('correlations', None, dict of method -> {'columns', 'values'}).
+    """
+    if mode not in MODES:
+        raise ValueError(f"Unknown profiling mode {mode!r}; expected one of {MODES}")
+    total_rows = len(data)
+    if mode == 'quick' and total_rows > QUICK_ROWS:
+        data = data.sample(QUICK_ROWS, random_state=random_state)
+
+    null_counts = data.isna().sum()
+    yield 'overview', None, {
+        'mode': mode,
+        'rows': total_rows,
+        'profiled_rows': len(data),
+        'columns': data.shape[1],
+        'missing_cells': int(null_counts.sum()),
+        'missing_cells_pct': _json_value(100 * null_counts.sum() / data.size) if data.size else 0.0,
+        'duplicate_rows': int(data.duplicated().sum()),
+        'memory_bytes': int(data.memory_usage(deep=True).sum()),
+        'dtypes': {str(dtype): int(n) for dtype, n in data.dtypes.astype(str).value_counts().items()},
+    }
+
+    tasks = [(column, data[column]) for column in data.columns]
+    if n_jobs is None and len(data) < PARALLEL_MIN_ROWS:
+        n_jobs = 1
+    if n_jobs == 1:
+        for task in tasks:
+            yield ('column',) + _profile_task(task)
+    else:
+        # Spawned rather than forked: the profiler runs inside the multithreaded Streamlit
+        # server, and forking it can deadlock (see figures.FigureRenderer)
+        with ProcessPoolExecutor(max_workers=n_jobs, mp_context=multiprocessing.get_context('spawn')) as pool:
+            for future in as_completed([pool.submit(_profile_task, task) for task in tasks]):
+                yield ('column',) + future.result()
+
+    numeric_data = data.select_dtypes(include=[np.number])
+    correlations = {}
+    if numeric_data.shape[1] > 1:
+        # Pearson is undefined on infinite values; those cells come out as NaN (JSON null)
+        with np.errstate(invalid='ignore'):
+            matrices = correlation_matrices(numeric_data, n_jobs=n_jobs)
+        for method in METHODS:
+            correlations[method] = {'columns': list(numeric_data.columns),
+                                    'values': [[_json_value(round(value, 4)) for value in row]
+                                               for row in matrices[method].to_numpy()]}
+    yield 'correlations', None, correlations
+
+
+def build_profile(data, mode='quick', n_jobs=None, title=None, on_section=None):
+    """
+    Returns the whole profile of a frame as one JSON-ready dict, columns in frame order.
+
+    Parameters:
+    data, mode, n_jobs: See profile_sections().
+    title (str): Title stored with the profile.
+    on_section (callable): Called with (section, name, value) for every section as soon as
+        it is ready, e.g. to render it.
+    """
+    start = time.perf_counter()
+    profile = {'version': PROFILE_VERSION, 'title': title, 'columns': {}}
+    for section, name, value in profile_sections(data, mode, n_jobs):
+        if on_section is not None:
+            on_section(section, name, value)
+        if section == 'column':
+            profile['columns'][name] = value
+        else:
+            profile[section] = value
+    profile['columns'] = {column: profile['columns'][column] for column in data.columns}
+    profile['seconds'] = time.perf_counter() - start
+    profile['generated_at'] = time.strftime('%Y-%m-%dT%H:%M:%S')
+    return profile
+
+
+def profile_path(data_hash, mode):
+    return cache_path('reports', f'profile-v{PROFILE_VERSION}-{mode}-{data_hash}.json')
+
+
+def save_profile(profile, path):
+    # Compact separators: the file is the payload the page reads
+    atomic_write(path, json.dumps(profile, separators=(',', ':')).encode('utf-8'))
+
+
+def load_profile(path):
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+if __name__ == "__main__":
+    from cache_utils import file_fingerprint
+    from data_access import DATA_FILE, load_zomato
+
+    parser = argparse.ArgumentParser(description="Profile zomato.csv column by column")
+    parser.add_argument('--mode', choices=MODES, default='quick')
+    parser.add_argument('--n-jobs', type=int, default=None)
+    parser.add_argument('--data', default=DATA_FILE)
+    args = parser.parse_args()
+    data = load_zomato(args.data)
+    profile = build_profile(data, args.mode, args.n_jobs, title=os.path.basename(args.data))
+    path = profile_path(file_fingerprint(args.data), args.mode)
+    save_profile(profile, path)
+    print(f"{args.mode} profile of {profile['overview']['rows']} rows x {len(profile['columns'])} columns "
+          f"in {profile['seconds']:.2f}s, {os.path.getsize(path) / 1024:.0f} KB: {path}")
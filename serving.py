@@ -0,0 +1,323 @@
+# serving.py
+import argparse
+import collections
+import json
+import math
+import numbers
+import queue
+import sys
+import threading
+import time
+from concurrent.futures import Future
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import numpy as np
+import pandas as pd
+from training import find_artifact, load_artifact, transform_features
+
+
+class PricePredictor:
+    """
+    Scores restaurant records for their Price range with a saved model artifact.
+
+    Parameters:
+    artifact (dict): A loaded model artifact from training.py.
+    """
+
+    def __init__(self, artifact):
+        self.artifact = artifact
+        self.columns = artifact['features'].input_columns_
+        self.labels = [label.item() if hasattr(label, 'item') else label
+                       for label in artifact['label_encoder'].classes_]
+
+    def missing_columns(self, record):
+        return [column for column in self.columns if column not in record]
+
+    def validate(self, record):
+        """
+        Checks one record and coerces its values to the types the model was trained on.
+
+        Categorical values may be text, numbers or null (missing); numerical values must be
+        finite numbers or numeric strings.
+
+        Returns:
+        dict: The coerced record, restricted to the input columns.
+
+        Raises:
+        ValueError: If the record is not an object, lacks columns or holds an invalid value.
+        """
+        if not isinstance(record, dict):
+            raise ValueError("a record must be a JSON object")
+        missing = self.missing_columns(record)
+        if missing:
+            raise ValueError(f"missing columns: {missing}")
+        features = self.artifact['features']
+        clean = {}
+        for column in features.categorical_columns:
+            value = record[column]
+            if value is not None and not isinstance(value, (str, numbers.Number)):
+                raise ValueError(f"{column!r} must be text or null, got {type(value).__name__}")
+            missing_value = value is None or (isinstance(value, float) and math.isnan(value))
+            clean[column] = None if missing_value else str(value)
+        for column in features.numerical_columns:
+            value = record[column]
+            try:
+                if isinstance(value, bool):
+                    raise TypeError
+                number = float(value)
+            except (TypeError, ValueError):
+                raise ValueError(f"{column!r} must be a number, got {value!r}") from None
+            if not math.isfinite(number):
+                raise ValueError(f"{column!r} must be a finite number, got {value!r}")
+            clean[column] = number
+        return clean
+
+    def predict_batch(self, records):
+        # One preprocessing pass and one predict_proba call for the whole batch
+        data = pd.DataFrame.from_records(records, columns=self.columns)
+        probabilities = self.artifact['model'].predict_proba(transform_features(self.artifact, data))
+        best = probabilities.argmax(axis=1)
+        return [
+            {
+                'price_range': self.labels[best[i]],
+                'probabilities': dict(zip(self.labels, probabilities[i].round(6).tolist())),
+            }
+            for i in range(len(records))
+        ]
+
+
+class MicroBatcher:
+    """
+    Coalesces concurrent single-record requests into batches before calling the model.
+
+    A batch is flushed when it reaches max_batch_size records or when its oldest request has
+    waited max_wait_ms, whichever comes first.
+
+    Parameters:
+    predict_batch (callable): Function scoring a list of records and returning a list of results.
+    max_batch_size (int): Largest number of records sent to the model at once.
+    max_wait_ms (float): Longest time a request waits for other requests to join its batch.
+    """
+
+    def __init__(self, predict_batch, max_batch_size=256, max_wait_ms=5.0):
+        self.predict_batch = predict_batch
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self._queue = queue.Queue()
+        self._latencies = collections.deque(maxlen=100_000)
+        self._batch_sizes = collections.deque(maxlen=10_000)
+        self._stats_lock = threading.Lock()
+        threading.Thread(target=self._run, daemon=True).start()
+
+    def submit(self, record):
+        future = Future()
+        self._queue.put((record, future, time.perf_counter()))
+        return future
+
+    def predict(self, record, timeout=None):
+        return self.submit(record).result(timeout)
+
+    def _next_batch(self):
+        batch = [self._queue.get()]
+        deadline = time.perf_counter() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._next_batch()
+            try:
+                results = self.predict_batch([record for record, _, _ in batch])
+            except Exception:
+                # Score the records one by one, so one bad record only fails its own request
+                results = []
+                for record, _, _ in batch:
+                    try:
+                        results.append(self.predict_batch([record])[0])
+                    except Exception as error:
+                        results.append(error)
+
+            done = time.perf_counter()
+            for (_, future, submitted), result in zip(batch, results):
+                if isinstance(result, Exception):
+                    future.set_exception(result)
+                else:
+                    future.set_result(result)
+            with self._stats_lock:
+                self._latencies.extend(done - submitted for _, _, submitted in batch)
+                self._batch_sizes.append(len(batch))
+
+    def stats(self):
+        with self._stats_lock:
+            latencies = np.array(self._latencies) * 1000
+            batch_sizes = np.array(self._batch_sizes)
+        if len(latencies) == 0:
+            return {'requests': 0}
+        return {
+            'requests': len(latencies),
+            'batches': len(batch_sizes),
+            'mean_batch_size': round(float(batch_sizes.mean()), 2),
+            'p50_ms': round(float(np.percentile(latencies, 50)), 3),
+            'p99_ms': round(float(np.percentile(latencies, 99)), 3),
+        }
+
+
+def load_predictor(model_name):
+    path = find_artifact(model_name)
+    if path is None:
+        sys.exit(f"No trained {model_name} model found; run `python training.py {model_name}` first.")
+    return PricePredictor(load_artifact(path))
+
+
+def make_handler(predictor, batcher):
+    class PredictionHandler(BaseHTTPRequestHandler):
+        def _send_json(self, status, payload):
+            body = json.dumps(payload).encode('utf-8')
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            if self.path == '/health':
+                self._send_json(200, {'status': 'ok'})
+            elif self.path == '/stats':
+                self._send_json(200, batcher.stats())
+            else:
+                self._send_json(404, {'error': 'not found'})
+
+        def do_POST(self):
+            if self.path != '/predict':
+                self._send_json(404, {'error': 'not found'})
+                return
+            try:
+                payload = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))))
+            except ValueError:
+                self._send_json(400, {'error': 'request body must be JSON'})
+                return
+
+            # Accept a single record or a list of records
+            records = payload if isinstance(payload, list) else [payload]
+            try:
+                records = [predictor.validate(record) for record in records]
+            except ValueError as error:
+                self._send_json(400, {'error': str(error)})
+                return
+
+            futures = [batcher.submit(record) for record in records]
+            try:
+                results = [future.result() for future in futures]
+            except Exception as error:
+                self._send_json(500, {'error': str(error)})
+                return
+            self._send_json(200, results if isinstance(payload, list) else results[0])
+
+        def log_message(self, format, *args):
+            # Per-request access logs would dominate the cost of small requests
+            pass
+
+    return PredictionHandler
+
+
+def serve(predictor, batcher, host, port):
+    server = ThreadingHTTPServer((host, port), make_handler(predictor, batcher))
+    print(f"Serving price-range predictions on http://{host}:{port}/predict")
+    server.serve_forever()
+
+
+def stream(predictor, batcher, source=sys.stdin, sink=sys.stdout):
+    # Read JSON records line by line and write predictions in the same order
+    pending = queue.Queue()
+
+    def write_results():
+        while True:
+            future = pending.get()
+            if future is None:
+                break
+            try:
+                sink.write(json.dumps(future.result()) + '\n')
+            except Exception as error:
+                sink.write(json.dumps({'error': str(error)}) + '\n')
+            sink.flush()
+
+    writer = threading.Thread(target=write_results)
+    writer.start()
+    for line in source:
+        if not line.strip():
+            continue
+        try:
+            future = batcher.submit(predictor.validate(json.loads(line)))
+        except ValueError as error:
+            # A malformed line gets an error line of its own; the stream goes on
+            future = Future()
+            future.set_exception(error)
+        pending.put(future)
+    pending.put(None)
+    writer.join()
+
+
+def benchmark(predictor, batcher, num_requests, concurrency):
+    """
+    Sends single-record requests from many threads and reports throughput and latency.
+
+    Parameters:
+    predictor (PricePredictor): Predictor used to build sample records.
+    batcher (MicroBatcher): Batcher under test.
+    num_requests (int): Total number of requests.
+    concurrency (int): Number of client threads.
+    """
+    from pipeline import load_clean_data
+
+    records = load_clean_data()[predictor.columns].sample(
+        num_requests, replace=True, random_state=0).to_dict('records')
+    per_thread = np.array_split(np.arange(num_requests), concurrency)
+
+    def client(positions):
+        for position in positions:
+            batcher.predict(records[position])
+
+    start = time.perf_counter()
+    threads = [threading.Thread(target=client, args=(positions,)) for positions in per_thread]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    result = batcher.stats()
+    result['throughput_per_s'] = round(num_requests / elapsed, 1)
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Batch price-range prediction service")
+    parser.add_argument('mode', choices=['serve', 'stream', 'bench'])
+    parser.add_argument('--model', default='decision_tree')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--max-batch-size', type=int, default=256)
+    parser.add_argument('--max-wait-ms', type=float, default=5.0)
+    parser.add_argument('--requests', type=int, default=5000)
+    parser.add_argument('--concurrency', type=int, default=64)
+    args = parser.parse_args()
+
+    predictor = load_predictor(args.model)
+    batcher = MicroBatcher(predictor.predict_batch, args.max_batch_size, args.max_wait_ms)
+
+    if args.mode == 'serve':
+        serve(predictor, batcher, args.host, args.port)
+    elif args.mode == 'stream':
+        stream(predictor, batcher)
+    else:
+        print(json.dumps(benchmark(predictor, batcher, args.requests, args.concurrency), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+# session_data.py
+import argparse
+import tracemalloc
+import pandas as pd
+
+# shared_view relies on copy-on-write: always on from pandas 3, opt-in on pandas 2
+if int(pd.__version__.split('.')[0]) < 3:
+    pd.set_option('mode.copy_on_write', True)
+
+
+def shared_view(frame):
+    """
+    Returns a copy-on-write view of a frame shared across sessions.
+
+    The view is a new DataFrame object over the same column buffers: nothing is copied until
+    the caller writes, and then only the columns it writes are copied. In-place operations
+    (drop(inplace=True), dropna(inplace=True), column assignment) change the caller's view,
+    never the shared frame. Importing this module turns copy-on-write on where pandas does not
+    already enforce it.
+
+    Parameters:
+    frame (pd.DataFrame): A frame held in a process-wide cache.
+    """
+    return frame.copy(deep=False)
+
+
+class FrameOverlay:
+    """
+    Derived columns layered over a shared, read-only base frame.
+
+    The overlay only references the derived columns; every other column is read from the
+    base. Derived columns that depend only on the data can themselves be shared between
+    sessions, so an additional session costs its overlay object rather than a copy of the
+    dataset. Overlays are immutable: assign() and drop() return new overlays.
+
+    Parameters:
+    base (pd.DataFrame): The shared frame.
+    columns (dict): Column name -> pd.Series aligned with the base index.
+    hidden (tuple of str): Base columns left out of the overlay's view.
+    """
+
+    def __init__(self, base, columns=None, hidden=()):
+        self.base = base
+        self._columns = dict(columns or {})
+        self._hidden = tuple(hidden)
+
+    def assign(self, **columns):
+        for name, values in columns.items():
+            if not isinstance(values, pd.Series) or not values.index.equals(self.base.index):
+                columns[name] = pd.Series(values, index=self.base.index, name=name)
+        return FrameOverlay(self.base, {**self._columns, **columns},
+                            tuple(column for column in self._hidden if column not in columns))
+
+    def drop(self, columns):
+        columns = [columns] if isinstance(columns, str) else list(columns)
+        return FrameOverlay(self.base, {name: values for name, values in self._columns.items() if name not in columns},
+                            self._hidden + tuple(column for column in columns if column in self.base.columns))
+
+    @property
+    def columns(self):
+        base_columns = [column for column in self.base.columns if column not in self._hidden]
+        return base_columns + [column for column in self._columns if column not in self.base.columns]
+
+    def __contains__(self, column):
+        return column in self.columns
+
+    def __getitem__(self, column):
+        if column in self._columns:
+            return self._columns[column]
+        if column in self._hidden or column not in self.base.columns:
+            raise KeyError(column)
+        return self.base[column]
+
+    def frame(self):
+        """
+        Returns the overlay as a DataFrame; base columns are shared, not copied.
+        """
+        view = shared_view(self.base).drop(columns=list(self._hidden))
+        return view.assign(**self._columns)[self.columns]
+
+    def overlay_bytes(self):
+        # Memory owned by this session: its derived columns only
+        return int(sum(values.memory_usage(deep=True, index=False) for values in self._columns.values()))
+
+
+def session_memory(n_sessions=20, data=None):
+    """
+    Measures the memory allocated per additional session for the Exploration page's derived
+    frame (top-N collapsed categories), with overlays over shared derived columns and with
+    full copies.
+
+    Returns:
+    dict: Bytes of the base frame and bytes allocated per session by each approach.
+    """
+    from categories import TOP_N_COLUMNS, TopNCollapser
+    from pipeline import load_clean_data
+    data = load_clean_data() if data is None else data
+    collapser = TopNCollapser(TOP_N_COLUMNS, top_n=10).fit(data)
+    result = {'base_bytes': int(data.memory_usage(deep=True).sum())}
+
+    def per_session(make_session):
+        tracemalloc.start()
+        sessions = [make_session() for _ in range(n_sessions)]
+        allocated = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        del sessions
+        return allocated / n_sessions
+
+    # Computed once for every session, as Exploration.shared_derived_columns does
+    collapsed = collapser.transform(shared_view(data))
+    shared = {column: collapsed[column] for column in TOP_N_COLUMNS}
+
+    def overlay_session():
+        return FrameOverlay(shared_view(data)).assign(**shared)
+
+    def copied_session():
+        return collapser.transform(data.copy())
+
+    result['overlay_bytes_per_session'] = per_session(overlay_session)
+    result['copy_bytes_per_session'] = per_session(copied_session)
+    return result
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Memory per additional session: overlays vs full copies")
+    parser.add_argument('--sessions', type=int, default=20)
+    parser.add_argument('--data', help="a Zomato-schema CSV to measure on instead of zomato.csv")
+    args = parser.parse_args()
+    data = None
+    if args.data:
+        from pipeline import load_clean_data
+        data = load_clean_data(args.data)
+    for key, value in session_memory(args.sessions, data).items():
+        print(f'{key}: {value / 1024:.0f} KB')
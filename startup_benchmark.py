@@ -0,0 +1,139 @@
+# startup_benchmark.py
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+from cache_utils import atomic_write, cache_path
+from navigation import PAGES
+
+APP_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'app.py')
+
+# Libraries the Introduction page must not import before its first paint
+HEAVY_MODULES = ['pandas', 'numpy', 'matplotlib', 'seaborn', 'sklearn', 'scipy', 'ydata_profiling']
+
+# A first paint this much slower than the saved baseline is reported as a regression
+REGRESSION_TOLERANCE = 0.2
+
+
+def baseline_path():
+    return cache_path('benchmarks', 'startup.json')
+
+
+def import_profile(module, top=15):
+    """
+    Imports a module in a fresh interpreter with -X importtime and returns its slowest imports.
+
+    Parameters:
+    module (str): Module to import, e.g. 'Exploration'.
+    top (int): Number of imports to keep, by cumulative time.
+
+    Returns:
+    dict: Total import seconds of the module and the top (module, self s, cumulative s) rows.
+    """
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+                            cwd=os.path.dirname(APP_FILE), capture_output=True, text=True, check=True)
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        rows.append((name.strip(), int(self_us) / 1e6, int(cumulative_us) / 1e6))
+    total = next((cumulative for name, _, cumulative in reversed(rows) if name == module), None)
+    rows.sort(key=lambda row: -row[2])
+    return {'module': module, 'seconds': total, 'imports': rows[:top]}
+
+
+def _first_paint(page):
+    # Runs in a fresh interpreter: time one script run of the app showing the given page
+    from streamlit.testing.v1 import AppTest
+    app = AppTest.from_file(APP_FILE, default_timeout=600)
+    app.session_state['page'] = page
+    start = time.perf_counter()
+    app.run()
+    seconds = time.perf_counter() - start
+    return {
+        'page': page,
+        'seconds': seconds,
+        'exceptions': [exception.message for exception in app.exception],
+        'heavy_modules': [name for name in HEAVY_MODULES if name in sys.modules],
+    }
+
+
+def first_paint(page='Introduction'):
+    """
+    Measures the time of the first script run of the app on a page, in a fresh interpreter.
+
+    Parameters:
+    page (str): Page shown by the run, a key of navigation.PAGES.
+
+    Returns:
+    dict: Seconds of the run, exceptions raised by the page and heavy libraries it imported.
+    """
+    result = subprocess.run([sys.executable, os.path.abspath(__file__), '--paint', page],
+                            cwd=os.path.dirname(APP_FILE), capture_output=True, text=True, check=True)
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def run_benchmark(pages=('Introduction',), repeat=3, update_baseline=False):
+    """
+    Profiles the imports of every page module and the first paint of the given pages.
+
+    The first paint is the best of `repeat` cold runs. The Introduction page fails the check
+    when it imports any of HEAVY_MODULES, and every page fails when its first paint is more
+    than REGRESSION_TOLERANCE slower than the saved baseline.
+
+    Returns:
+    tuple: (report dict, list of failure messages)
+    """
+    report = {'imports': {page: import_profile(module) for page, module in PAGES.items()},
+              'first_paint': {}}
+    failures = []
+    for page in pages:
+        runs = [first_paint(page) for _ in range(repeat)]
+        best = min(runs, key=lambda run: run['seconds'])
+        report['first_paint'][page] = best
+        if best['exceptions']:
+            failures.append(f"{page}: the page raised {best['exceptions']}")
+        if page == 'Introduction' and best['heavy_modules']:
+            failures.append(f"{page}: imported {', '.join(best['heavy_modules'])} before its first paint")
+
+    path = baseline_path()
+    if os.path.exists(path):
+        with open(path) as f:
+            baseline = json.load(f)
+        for page, run in report['first_paint'].items():
+            previous = baseline.get('first_paint', {}).get(page)
+            if previous and run['seconds'] > previous['seconds'] * (1 + REGRESSION_TOLERANCE):
+                failures.append(f"{page}: first paint {run['seconds']:.2f}s, baseline {previous['seconds']:.2f}s")
+    if update_baseline or not os.path.exists(path):
+        atomic_write(path, json.dumps(report, indent=2).encode('utf-8'))
+    return report, failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Import-time profile and first-paint benchmark of the app")
+    parser.add_argument('pages', nargs='*', default=['Introduction'])
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--update-baseline', action='store_true')
+    parser.add_argument('--paint', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.paint:
+        print(json.dumps(_first_paint(args.paint)))
+        return
+
+    report, failures = run_benchmark(args.pages, args.repeat, args.update_baseline)
+    for page, profile in report['imports'].items():
+        print(f"import {profile['module']}: {profile['seconds']:.3f}s")
+        for name, self_seconds, cumulative in profile['imports'][:5]:
+            print(f"    {name:<40} self {self_seconds:.3f}s  cumulative {cumulative:.3f}s")
+    for page, run in report['first_paint'].items():
+        print(f"first paint {page}: {run['seconds']:.3f}s (heavy modules: {', '.join(run['heavy_modules']) or 'none'})")
+    for failure in failures:
+        print(f"FAIL {failure}")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,155 @@
+# streaming.py
+import argparse
+import os
+import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pandas as pd
+from data_access import COUNTRY_FILE, load_country_codes
+from pipeline import (CATEGORICAL_COLUMNS, cast_categories, drop_null_rows, drop_sparse_columns,
+                      drop_unused_columns, merge_country_codes, split_locality)
+
+DEFAULT_CHUNKSIZE = 100_000
+
+# Raw columns needed to derive every categorical column of the cleaned data
+PRESCAN_COLUMNS = ['Restaurant Name', 'City', 'Cuisines', 'Currency', 'Has Table booking',
+                   'Has Online delivery', 'Is delivering now', 'Rating text', 'Price range',
+                   'Locality', 'Country Code']
+
+# Raw numeric columns. read_csv infers a type per chunk (int64, or float64 once a value is
+# missing or the whole chunk is null), so the prescan fixes one type per column for all chunks
+NUMERIC_COLUMNS = ['Country Code', 'Longitude', 'Latitude', 'Average Cost for two', 'Price range',
+                   'Aggregate rating', 'Votes']
+
+
+def read_chunks(path, chunksize=DEFAULT_CHUNKSIZE, usecols=None, dtype=None):
+    return pd.read_csv(path, encoding='latin-1', chunksize=chunksize, usecols=usecols, dtype=dtype)
+
+
+def prescan(path, df_country, chunksize=DEFAULT_CHUNKSIZE):
+    """
+    Collects the global set of categories of every categorical column, and the parse type of
+    every raw column the cleaned data is derived from, in one pass.
+
+    Only the columns needed for the categorical features and the numeric columns are read,
+    and only their distinct values and types are kept, so memory grows with the number of
+    categories rather than rows.
+
+    Parameters:
+    path (str): Path to a Zomato-schema CSV file.
+    df_country (pd.DataFrame): Country Code to Country lookup table.
+    chunksize (int): Rows read per chunk.
+
+    Returns:
+    tuple: (dict of sorted categories per column of CATEGORICAL_COLUMNS,
+    dict of raw column -> parse dtype for read_chunks, every column of the CSV)
+    """
+    uniques = {column: set() for column in CATEGORICAL_COLUMNS}
+    numeric_types = {column: [] for column in NUMERIC_COLUMNS}
+    text = {column: str for column in PRESCAN_COLUMNS if column not in NUMERIC_COLUMNS}
+    for chunk in read_chunks(path, chunksize, usecols=list(dict.fromkeys(PRESCAN_COLUMNS + NUMERIC_COLUMNS)),
+                             dtype=text):
+        for column in NUMERIC_COLUMNS:
+            # A missing value anywhere needs a float type; an all-null chunk says nothing more
+            values = chunk[column]
+            if values.isna().any():
+                numeric_types[column].append(np.dtype(np.float64))
+            if values.notna().any():
+                numeric_types[column].append(values.dtype)
+        chunk = split_locality(merge_country_codes(chunk, df_country))
+        for column in CATEGORICAL_COLUMNS:
+            uniques[column].update(chunk[column].dropna().unique().tolist())
+
+    # In the order of the CSV; every other raw column is read as text
+    header = pd.read_csv(path, encoding='latin-1', nrows=0).columns
+    dtypes = {column: (np.result_type(*numeric_types[column]) if numeric_types[column] else np.dtype(np.float64))
+              if column in NUMERIC_COLUMNS else str for column in header}
+    vocabulary = {column: sorted(values) for column, values in uniques.items()}
+    for column in CATEGORICAL_COLUMNS:
+        if column in NUMERIC_COLUMNS:
+            vocabulary[column] = np.array(vocabulary[column], dtype=dtypes[column]).tolist()
+    return vocabulary, dtypes
+
+
+def output_schema(df_country, vocabulary, dtypes):
+    """
+    Returns the Arrow schema of the cleaned part files, derived from the prescan rather than
+    from a chunk: an empty frame with the prescan dtypes goes through clean_chunk, so the
+    categorical columns get the dictionaries of the vocabulary and the numeric columns their
+    parse type. The other columns are text derived from the raw columns (Mall), which an empty
+    frame cannot type, so they are stored as strings.
+    """
+    empty = pd.DataFrame({column: pd.Series(dtype=dtype) for column, dtype in dtypes.items()})
+    template = clean_chunk(empty, df_country, vocabulary)
+    return pa.schema([field if field.name in CATEGORICAL_COLUMNS or field.name in NUMERIC_COLUMNS
+                      else field.with_type(pa.large_string())
+                      for field in pa.Schema.from_pandas(template, preserve_index=False)])
+
+
+def clean_chunk(chunk, df_country, vocabulary):
+    # The same stage functions as the in-memory pipeline, applied to one chunk
+    chunk = merge_country_codes(chunk, df_country)
+    chunk = split_locality(chunk)
+    chunk = drop_unused_columns(chunk)
+    chunk = cast_categories(chunk, vocabulary=vocabulary)
+    chunk = drop_sparse_columns(chunk)
+    return drop_null_rows(chunk)
+
+
+def stream_clean(path, output_dir, country_file=COUNTRY_FILE, chunksize=DEFAULT_CHUNKSIZE):
+    """
+    Runs the cleaning pipeline over a CSV of any size with memory bounded by the chunk size.
+
+    A first pass collects the global category vocabulary and column types; a second pass
+    cleans the CSV chunk by chunk, broadcast-joins the small Country-Code table, and writes
+    every chunk as a Parquet part file with one schema (output_schema) and shared category
+    dictionaries.
+
+    Parameters:
+    path (str): Path to a Zomato-schema CSV file.
+    output_dir (str): Folder receiving part-NNNNN.parquet files.
+    country_file (str): Path to the Country-Code workbook.
+    chunksize (int): Rows processed per chunk.
+
+    Returns:
+    dict: Number of input rows, output rows and part files written.
+    """
+    df_country = load_country_codes(country_file)
+    vocabulary, dtypes = prescan(path, df_country, chunksize)
+    schema = output_schema(df_country, vocabulary, dtypes)
+    os.makedirs(output_dir, exist_ok=True)
+
+    rows_in = rows_out = parts = 0
+    for chunk in read_chunks(path, chunksize, dtype=dtypes):
+        rows_in += len(chunk)
+        cleaned = clean_chunk(chunk, df_country, vocabulary)
+        table = pa.Table.from_pandas(cleaned, schema=schema, preserve_index=False)
+        pq.write_table(table, os.path.join(output_dir, f'part-{parts:05d}.parquet'))
+        rows_out += len(cleaned)
+        parts += 1
+    return {'rows_in': rows_in, 'rows_out': rows_out, 'parts': parts}
+
+
+def load_partitions(output_dir, columns=None):
+    """
+    Reads the part files written by stream_clean back as one DataFrame.
+
+    Parameters:
+    output_dir (str): Folder written by stream_clean.
+    columns (list of str): Columns to read; all of them when omitted.
+    """
+    data = pq.ParquetDataset(output_dir).read(columns=columns).to_pandas()
+
+    # Parquet only restores string dictionaries as categoricals; re-type the others (Price range)
+    restore = [column for column in CATEGORICAL_COLUMNS
+               if column in data.columns and not isinstance(data[column].dtype, pd.CategoricalDtype)]
+    return data.astype({column: 'category' for column in restore})
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Out-of-core cleaning of a Zomato-schema CSV")
+    parser.add_argument('input')
+    parser.add_argument('output_dir')
+    parser.add_argument('--chunksize', type=int, default=DEFAULT_CHUNKSIZE)
+    args = parser.parse_args()
+    print(stream_clean(args.input, args.output_dir, chunksize=args.chunksize))
@@ -0,0 +1,172 @@
+# synthetic_data.py
+import argparse
+import functools
+import os
+import shutil
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+from cache_utils import atomic_open
+from data_access import DATA_FILE
+
+DEFAULT_CHUNKSIZE = 100_000
+
+# Standard deviation, in degrees (about 100 m), of the jitter added to sampled coordinates
+COORDINATE_JITTER = 0.001
+
+# Each column group is drawn from a source row sharing the keys already generated, so the
+# joint structure of the source is kept: Country Code -> City -> Locality (with Address,
+# coordinates and Currency), Price range per country, names and cuisines per city, and
+# Average Cost for two, the service flags and the rating with its votes per country and
+# price range.
+COLUMN_GROUPS = [
+    (None, ['Country Code', 'City', 'Address', 'Locality', 'Locality Verbose', 'Longitude', 'Latitude',
+            'Currency', 'Switch to order menu']),
+    (['Country Code'], ['Price range']),
+    (['City'], ['Restaurant Name', 'Cuisines']),
+    (['Country Code', 'Price range'], ['Average Cost for two', 'Has Table booking', 'Has Online delivery',
+                                       'Is delivering now']),
+    (['Country Code', 'Price range'], ['Aggregate rating', 'Rating color', 'Rating text', 'Votes']),
+]
+
+
+class ZomatoSynthesizer:
+    """
+    Generates Zomato-schema restaurants by conditional resampling of a source file.
+
+    For every column group, rows are drawn uniformly from the source rows that match the key
+    columns generated so far, which reproduces the empirical conditional distributions.
+    Coordinates get a small jitter and Restaurant IDs are unique.
+
+    Parameters:
+    data (pd.DataFrame): Source rows with the zomato.csv columns.
+    """
+
+    def __init__(self, data):
+        self.columns = data.columns.tolist()
+        self.data = data.reset_index(drop=True)
+        self.groups = []
+        for keys, columns in COLUMN_GROUPS:
+            if keys is None:
+                self.groups.append((None, columns, None))
+                continue
+            # Rows sorted by their key; each key owns a contiguous [start, start + count) slice
+            codes = self.data.groupby(keys, sort=True, observed=True).ngroup().to_numpy()
+            order = np.argsort(codes, kind='stable')
+            counts = np.bincount(codes)
+            starts = np.concatenate([[0], np.cumsum(counts)[:-1]])
+            lookup = pd.MultiIndex.from_frame(self.data[keys].drop_duplicates().sort_values(keys))
+            self.groups.append((keys, columns, (lookup, order, starts, counts)))
+
+    def sample(self, n_rows, rng, first_id=0):
+        """
+        Draws n_rows synthetic restaurants.
+
+        Parameters:
+        n_rows (int): Number of rows.
+        rng (np.random.Generator): Random generator; the output only depends on its state.
+        first_id (int): Restaurant ID of the first row; IDs are consecutive.
+        """
+        columns = {}
+        for keys, group_columns, index in self.groups:
+            if keys is None:
+                rows = rng.integers(len(self.data), size=n_rows)
+            else:
+                lookup, order, starts, counts = index
+                group = lookup.get_indexer(pd.MultiIndex.from_arrays([columns[key] for key in keys]))
+                rows = order[starts[group] + (rng.random(n_rows) * counts[group]).astype(np.int64)]
+            for column in group_columns:
+                columns[column] = self.data[column].to_numpy()[rows]
+
+        # Jitter the coordinates, except the (0, 0) placeholders of unknown locations
+        located = (columns['Longitude'] != 0) | (columns['Latitude'] != 0)
+        for column in ('Longitude', 'Latitude'):
+            noise = rng.normal(0, COORDINATE_JITTER, size=n_rows)
+            columns[column] = np.round(np.where(located, columns[column] + noise, 0.0), 6)
+        columns['Restaurant ID'] = np.arange(first_id, first_id + n_rows)
+        return pd.DataFrame(columns)[self.columns]
+
+
+@functools.lru_cache(maxsize=2)
+def get_synthesizer(source=DATA_FILE):
+    # Fitted once per process; workers build their own copy from the source file
+    return ZomatoSynthesizer(pd.read_csv(source, encoding='latin-1'))
+
+
+def _write_chunk(task):
+    source, seed, chunk, n_rows, first_id, path = task
+    rng = np.random.default_rng([seed, chunk])
+    data = get_synthesizer(source).sample(n_rows, rng, first_id)
+    if path.endswith('.parquet'):
+        data.to_parquet(path, index=False)
+    else:
+        # CRLF rows like zomato.csv; it also makes fields holding a bare '\r' get quoted
+        data.to_csv(path, index=False, header=False, encoding='latin-1', lineterminator='\r\n')
+    return path
+
+
+def generate(n_rows, output, seed=0, chunksize=DEFAULT_CHUNKSIZE, n_jobs=None, source=DATA_FILE):
+    """
+    Writes n_rows synthetic restaurants as one CSV file or a folder of Parquet part files.
+
+    Chunks are generated in parallel worker processes and streamed to disk, so memory is
+    bounded by the chunk size. Chunk k is drawn from a generator seeded with (seed, k), so
+    the output only depends on the seed and the chunk size, not on the number of workers.
+
+    Parameters:
+    n_rows (int): Number of rows to generate.
+    output (str): A path ending in .csv, or a folder receiving part-NNNNN.parquet files.
+    seed (int): Seed of the whole dataset.
+    chunksize (int): Rows per chunk.
+    n_jobs (int): Worker processes; one per CPU by default, 1 to stay in-process.
+    source (str): The real CSV whose distributions are reproduced.
+
+    Returns:
+    str: The output path.
+    """
+    to_csv = output.endswith('.csv')
+    part_dir = tempfile.mkdtemp(dir=os.path.dirname(os.path.abspath(output))) if to_csv else output
+    os.makedirs(part_dir, exist_ok=True)
+    suffix = 'csv' if to_csv else 'parquet'
+    tasks = [(source, seed, chunk, min(chunksize, n_rows - start), start,
+              os.path.join(part_dir, f'part-{chunk:05d}.{suffix}'))
+             for chunk, start in enumerate(range(0, n_rows, chunksize))]
+
+    pool = None
+    try:
+        if n_jobs == 1:
+            parts = map(_write_chunk, tasks)
+        else:
+            pool = ProcessPoolExecutor(max_workers=n_jobs)
+            parts = pool.map(_write_chunk, tasks)
+        if to_csv:
+            # Parts are appended in chunk order as they complete
+            with atomic_open(output) as out:
+                out.write((','.join(get_synthesizer(source).columns) + '\r\n').encode('latin-1'))
+                for path in parts:
+                    with open(path, 'rb') as part:
+                        shutil.copyfileobj(part, out)
+                    os.remove(path)
+        else:
+            list(parts)
+    finally:
+        if pool is not None:
+            pool.shutdown()
+        if to_csv:
+            shutil.rmtree(part_dir, ignore_errors=True)
+    return output
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate a synthetic Zomato-schema dataset")
+    parser.add_argument('n_rows', type=int)
+    parser.add_argument('output', help="a .csv file or a folder for Parquet parts")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--chunksize', type=int, default=DEFAULT_CHUNKSIZE)
+    parser.add_argument('--n-jobs', type=int, default=None)
+    args = parser.parse_args()
+    start = time.perf_counter()
+    generate(args.n_rows, args.output, args.seed, args.chunksize, args.n_jobs)
+    print(f"Wrote {args.n_rows} rows to {args.output} in {time.perf_counter() - start:.1f}s")
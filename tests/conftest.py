@@ -0,0 +1,21 @@
+# conftest.py
+import os
+import tempfile
+import pytest
+
+# Cached stages, snapshots and indexes built by the tests go to a throwaway folder, not to
+# the project's .cache; cache_utils reads the variable when it is first imported
+os.environ.setdefault('ZOMATO_CACHE_DIR', tempfile.mkdtemp(prefix='zomato-tests-'))
+
+
+@pytest.fixture(scope='session')
+def clean_data():
+    from pipeline import load_clean_data
+    return load_clean_data()
+
+
+@pytest.fixture(scope='session')
+def prepared(clean_data):
+    # The training matrices of zomato.csv, as the model families see them
+    from training import prepare_data
+    return prepare_data(clean_data)
@@ -0,0 +1,82 @@
+# test_aggregate_cube.py
+import numpy as np
+import pandas as pd
+import pytest
+from aggregate_cube import MAX_DIMENSIONS, AggregateCube, _label, build_cube
+from pipeline import rated_mask
+
+
+@pytest.fixture(scope='module')
+def cube(clean_data):
+    return AggregateCube(build_cube(clean_data))
+
+
+@pytest.fixture(scope='module')
+def frame(clean_data):
+    # The restaurants with the cube's dimension labels, one row per (restaurant, cuisine)
+    frame = clean_data.assign(rated=rated_mask(clean_data))
+    frame['rating'] = frame['Aggregate rating'].where(frame['rated'])
+    frame['Cuisines'] = [list(dict.fromkeys(tag.strip() for tag in str(value).split(',')))
+                         for value in frame['Cuisines']]
+    frame = frame.explode('Cuisines', ignore_index=False)
+    for column in ['Country', 'City', 'Cuisines', 'Price range', 'Has Online delivery', 'Rating text']:
+        frame[column] = frame[column].astype(object).map(_label)
+    return frame
+
+
+def reference(frame, by, where=None):
+    # The same measures with a pandas group-by; restaurants count once unless grouped by cuisine
+    rows = frame if 'Cuisines' in by or 'Cuisines' in (where or {}) else frame[~frame.index.duplicated()]
+    for dimension, values in (where or {}).items():
+        values = values if isinstance(values, list) else [values]
+        rows = rows[rows[dimension].isin([_label(value) for value in values])]
+    grouped = rows.groupby(by, observed=True).agg(
+        restaurants=('Votes', 'size'), rated=('rated', 'sum'), votes=('Votes', 'sum'),
+        mean_rating=('rating', 'mean'), mean_cost=('Average Cost for two', 'mean'))
+    return grouped.reset_index().sort_values(by, ignore_index=True)
+
+
+def assert_slice_matches(result, expected, by):
+    assert len(expected) > 0
+    result = result.sort_values(by, ignore_index=True)
+    pd.testing.assert_frame_equal(result[expected.columns], expected, check_dtype=False, rtol=1e-9)
+
+
+@pytest.mark.parametrize('by, where', [
+    (['Country'], None),
+    (['City'], {'Country': 'India'}),
+    (['Price range', 'Has Online delivery'], None),
+    (['Price range'], {'Country': 'India', 'Has Online delivery': 'Yes'}),
+    (['Cuisines'], {'City': 'New Delhi'}),
+    (['Rating text'], {'City': 'New Delhi', 'Cuisines': 'Chinese'}),
+    (['City'], {'Cuisines': ['Chinese', 'Italian']}),
+    (['Country', 'Price range'], {'Price range': [3, 4]}),
+])
+def test_slice_matches_groupby(cube, frame, by, where):
+    assert_slice_matches(cube.slice(by, where), reference(frame, by, where), by)
+
+
+def test_cell_matches_groupby(cube, frame):
+    expected = reference(frame, ['City', 'Price range'], {'City': 'New Delhi', 'Price range': 2}).iloc[0]
+    cell = cube.cell({'City': 'New Delhi', 'Price range': 2})
+    for measure in ['restaurants', 'rated', 'votes', 'mean_rating', 'mean_cost']:
+        assert cell[measure] == pytest.approx(expected[measure], rel=1e-9)
+
+
+def test_cells_roll_up_to_the_grand_total(cube, clean_data):
+    total = cube.slice([]).iloc[0]
+    assert total['restaurants'] == len(clean_data)
+    assert total['votes'] == clean_data['Votes'].sum()
+    by_city = cube.slice(['City'])
+    assert by_city['restaurants'].sum() == total['restaurants']
+    assert by_city['rated'].sum() == total['rated'] == rated_mask(clean_data).sum()
+
+
+def test_empty_cell_and_unknown_values(cube):
+    assert cube.cell({'City': 'Atlantis'}) is None
+    assert cube.slice(['Cuisines'], {'City': 'Atlantis'}).empty
+
+
+def test_too_many_dimensions_are_rejected(cube):
+    with pytest.raises(ValueError):
+        cube.slice(['Country', 'City', 'Cuisines', 'Price range'][:MAX_DIMENSIONS + 1])
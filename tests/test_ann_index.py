@@ -0,0 +1,66 @@
+# test_ann_index.py
+import numpy as np
+import pytest
+from sklearn.neighbors import KNeighborsClassifier
+import ann_index
+from ann_index import ANNKNeighborsClassifier, ExactIndex, RandomProjectionForest
+
+# Recall@5 of the default 10-tree forest is about 0.92 on zomato.csv
+MIN_RECALL = 0.85
+
+
+def recall(found, truth):
+    return sum(len(np.intersect1d(row, expected)) for row, expected in zip(found, truth)) / truth.size
+
+
+def test_forest_recall_against_exact_search(prepared):
+    X_train, X_test = prepared['X_train'], prepared['X_test']
+    _, exact = ExactIndex().fit(X_train).kneighbors(X_test, 5)
+    _, found = RandomProjectionForest(n_trees=10, random_state=0).fit(X_train).kneighbors(X_test, 5)
+    assert recall(found, exact) >= MIN_RECALL
+
+
+def test_more_trees_do_not_lower_recall(prepared):
+    X_train, X_test = prepared['X_train'], prepared['X_test'][:500]
+    _, exact = ExactIndex().fit(X_train).kneighbors(X_test, 5)
+    recalls = [recall(RandomProjectionForest(n_trees=n_trees, random_state=0).fit(X_train).kneighbors(X_test, 5)[1], exact)
+               for n_trees in (1, 5, 20)]
+    assert recalls == sorted(recalls)
+
+
+def test_forest_distances_are_exact_for_the_neighbours_found():
+    rng = np.random.default_rng(0)
+    X, Q = rng.normal(size=(2_000, 8)), rng.normal(size=(50, 8))
+    distances, indices = RandomProjectionForest(n_trees=5, leaf_size=16).fit(X).kneighbors(Q, 5)
+    expected = np.linalg.norm(X[indices] - Q[:, None, :], axis=2)
+    np.testing.assert_allclose(distances, expected, atol=1e-9)
+    assert (np.diff(distances, axis=1) >= 0).all()
+
+
+def test_chunked_queries_match_a_single_batch(prepared, monkeypatch):
+    forest = RandomProjectionForest(n_trees=5, random_state=0).fit(prepared['X_train'])
+    X_test = prepared['X_test'][:1_000]
+    whole = forest.kneighbors(X_test, 5)
+    monkeypatch.setattr(ann_index, 'QUERY_CHUNK', 128)
+    chunked = forest.kneighbors(X_test, 5)
+    np.testing.assert_array_equal(chunked[1], whole[1])
+    np.testing.assert_array_equal(chunked[0], whole[0])
+
+
+def test_exact_backend_matches_kneighbors_classifier():
+    # Continuous features, so no two training rows are at the same distance from a query
+    rng = np.random.default_rng(1)
+    X, y = rng.normal(size=(1_000, 6)), rng.integers(0, 4, size=1_000)
+    Q = rng.normal(size=(200, 6))
+    model = ANNKNeighborsClassifier(n_neighbors=7, backend='exact').fit(X, y)
+    reference = KNeighborsClassifier(n_neighbors=7, algorithm='brute').fit(X, y)
+    np.testing.assert_allclose(model.predict_proba(Q), reference.predict_proba(Q))
+    np.testing.assert_array_equal(model.predict(Q), reference.predict(Q))
+
+
+@pytest.mark.parametrize('n_neighbors', [1, 5])
+def test_forest_classifier_probabilities_are_votes(prepared, n_neighbors):
+    model = ANNKNeighborsClassifier(n_neighbors=n_neighbors).fit(prepared['X_train'], prepared['y_train'])
+    proba = model.predict_proba(prepared['X_test'][:300])
+    np.testing.assert_allclose(proba.sum(axis=1), 1.0)
+    np.testing.assert_allclose(proba * n_neighbors, np.round(proba * n_neighbors))
@@ -0,0 +1,65 @@
+# test_benchmarks.py
+import json
+import os
+import benchmarks
+from benchmarks import compare, run_benchmarks, run_one
+
+
+def test_steps_run_in_a_child_process():
+    for name in ['csv_load', 'cleaning', 'category_collapse']:
+        result = run_one(name, 2000)
+        assert 'error' not in result, result
+        assert result['seconds'] > 0
+        assert result['peak_rss_mb'] >= result['setup_rss_mb'] > 0
+
+
+def test_failing_step_is_reported():
+    result = run_one('no_such_benchmark', 2000)
+    assert list(result) == ['error'] and 'KeyError' in result['error']
+
+
+def test_compare_applies_the_tolerances():
+    baseline = {'a@1': {'seconds': 1.0, 'peak_rss_mb': 100}, 'b@1': {'seconds': 0.01, 'peak_rss_mb': 100},
+                'c@1': {'error': 'failed'}, 'd@1': {'seconds': 1.0, 'peak_rss_mb': 100}}
+    results = {'a@1': {'seconds': 1.2, 'peak_rss_mb': 130},
+               # Twice as slow, but by less than MIN_TIME_DELTA
+               'b@1': {'seconds': 0.02, 'peak_rss_mb': 100},
+               'c@1': {'seconds': 9.0, 'peak_rss_mb': 900},
+               'd@1': {'error': 'MemoryError'},
+               'e@1': {'seconds': 9.0, 'peak_rss_mb': 900}}
+    assert compare(results, baseline) == ['a@1: peak RSS 130 MB vs baseline 100 MB', 'd@1: failed (MemoryError)']
+    results['a@1']['seconds'] = 1.3
+    assert compare(results, baseline)[0] == 'a@1: 1.30s vs baseline 1.00s'
+
+
+def test_baseline_is_saved_once_and_sizes_are_capped(tmp_path, monkeypatch):
+    runs = []
+    seconds = {'value': 1.0}
+
+    def fake_run_one(name, n_rows, seed=0):
+        runs.append((name, n_rows))
+        return {'seconds': seconds['value'], 'peak_rss_mb': 10, 'setup_rss_mb': 5}
+
+    monkeypatch.setattr(benchmarks, 'run_one', fake_run_one)
+    monkeypatch.setattr(benchmarks, 'baseline_path', lambda: str(tmp_path / 'baseline.json'))
+    results, regressions = run_benchmarks(['csv_load', 'predict_knn'], sizes=(10, 1_000_000))
+    assert runs == [('csv_load', 10), ('predict_knn', 10), ('csv_load', 1_000_000)]
+    assert list(results) == ['csv_load@10', 'predict_knn@10', 'csv_load@1000000'] and regressions == []
+
+    seconds['value'] = 2.0
+    _, regressions = run_benchmarks(['csv_load'], sizes=(10,))
+    assert regressions == ['csv_load@10: 2.00s vs baseline 1.00s']
+    with open(tmp_path / 'baseline.json') as f:
+        assert json.load(f)['csv_load@10']['seconds'] == 1.0
+    run_benchmarks(['csv_load'], sizes=(10,), update_baseline=True)
+    with open(tmp_path / 'baseline.json') as f:
+        baseline = json.load(f)
+    assert baseline['csv_load@10']['seconds'] == 2.0 and 'predict_knn@10' in baseline
+
+
+def test_synthetic_dataset_is_written_once():
+    path = benchmarks.synthetic_dataset(500, seed=1)
+    mtime = os.stat(path).st_mtime_ns
+    assert benchmarks.synthetic_dataset(500, seed=1) == path
+    assert os.stat(path).st_mtime_ns == mtime
+    assert benchmarks.synthetic_dataset(500, seed=2) != path
@@ -0,0 +1,54 @@
+# test_categories.py
+import numpy as np
+import pandas as pd
+import pytest
+from categories import TOP_N_COLUMNS, TopNCollapser
+
+
+def reference_collapse(series, top_n=10):
+    # The notebook's per-row version: keep the top N values, everything else becomes 'Other'
+    top = series.value_counts().nlargest(top_n).index
+    return series.astype(object).apply(lambda x: x if x in top or pd.isna(x) else 'Other')
+
+
+def test_matches_per_row_reference(clean_data):
+    collapsed = TopNCollapser(TOP_N_COLUMNS, top_n=10).fit_transform(clean_data)
+    for column in TOP_N_COLUMNS:
+        assert isinstance(collapsed[column].dtype, pd.CategoricalDtype)
+        expected = reference_collapse(clean_data[column])
+        assert collapsed[column].astype(object).fillna('<missing>').tolist() == expected.fillna('<missing>').tolist()
+        assert collapsed[column].nunique() <= 11
+    # Other columns are passed through untouched
+    pd.testing.assert_series_equal(collapsed['Votes'], clean_data['Votes'])
+
+
+@pytest.mark.parametrize('categorical', [False, True])
+def test_unseen_and_missing_values(categorical):
+    train = pd.DataFrame({'City': ['Delhi'] * 3 + ['Pune'] * 2 + ['Goa']})
+    test = pd.DataFrame({'City': ['Goa', 'Delhi', None, 'Agra', 'Pune', np.nan]})
+    if categorical:
+        train = train.astype('category')
+        # Unused categories and codes the training data never had
+        test = test.astype(pd.CategoricalDtype(['Agra', 'Delhi', 'Goa', 'Pune', 'Surat']))
+    collapser = TopNCollapser(['City'], top_n=2).fit(train)
+    result = collapser.transform(test)['City']
+    assert list(result.cat.categories) == ['Delhi', 'Pune', 'Other']
+    assert result.astype(object).tolist()[:2] == ['Other', 'Delhi']
+    assert result.isna().tolist() == [False, False, True, False, False, True]
+    assert result.astype(object).tolist()[3:5] == ['Other', 'Pune']
+
+
+def test_codes_agree_between_object_and_categorical_input():
+    values = pd.Series(['a', 'b', 'c', 'a', 'd', None, 'b', 'a'], name='Cuisines')
+    frame = values.to_frame()
+    collapser = TopNCollapser(['Cuisines'], top_n=2).fit(frame)
+    from_object = collapser.transform(frame)['Cuisines']
+    from_categorical = collapser.transform(frame.astype('category'))['Cuisines']
+    np.testing.assert_array_equal(from_object.cat.codes, from_categorical.cat.codes)
+
+
+def test_existing_other_category_is_not_duplicated():
+    frame = pd.DataFrame({'Mall': ['Other', 'Other', 'X', 'Y']})
+    collapsed = TopNCollapser(['Mall'], top_n=2).fit_transform(frame)['Mall']
+    assert list(collapsed.cat.categories).count('Other') == 1
+    assert collapsed.astype(object).tolist() == ['Other', 'Other', 'X', 'Other']
@@ -0,0 +1,55 @@
+# test_correlation.py
+import itertools
+import warnings
+import numpy as np
+import pandas as pd
+import pytest
+from scipy import stats
+from correlation import correlation_matrices, count_inversions, kendall_tau_b, rank_column
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_rank_column_matches_scipy(seed):
+    values = np.random.default_rng(seed).integers(0, 20, size=500).astype(float)
+    dense, average = rank_column(values)
+    np.testing.assert_array_equal(average, stats.rankdata(values, method='average'))
+    np.testing.assert_array_equal(dense, stats.rankdata(values, method='dense') - 1)
+
+
+@pytest.mark.parametrize('n', [0, 1, 2, 7, 64, 100])
+def test_count_inversions_matches_brute_force(n):
+    values = np.random.default_rng(n).integers(0, 10, size=n)
+    expected = sum(1 for i, j in itertools.combinations(range(n), 2) if values[i] > values[j])
+    assert count_inversions(values) == expected
+
+
+@pytest.mark.parametrize('n, levels', [(10, 3), (200, 5), (5_000, 50), (20_000, 20_000)])
+def test_kendall_tau_b_matches_scipy(n, levels):
+    rng = np.random.default_rng(n)
+    x = rng.integers(0, levels, size=n).astype(float)
+    y = x + rng.normal(scale=levels / 4, size=n).round()
+    expected = stats.kendalltau(x, y, variant='b').statistic
+    assert kendall_tau_b(rank_column(x)[0], rank_column(y)[0]) == pytest.approx(expected, abs=1e-12)
+
+
+def test_kendall_tau_b_of_a_constant_column_is_nan():
+    constant = np.zeros(50, dtype=np.int64)
+    assert np.isnan(kendall_tau_b(constant, np.arange(50)))
+
+
+@pytest.mark.parametrize('seed', range(30))
+def test_correlation_matrices_match_pandas(seed):
+    # Ties, a constant column and missing values: every case DataFrame.corr handles
+    rng = np.random.default_rng(seed)
+    data = pd.DataFrame(rng.integers(0, 5, size=(rng.integers(3, 60), 4)).astype(float), columns=list('abcd'))
+    if seed % 3 == 0:
+        data['b'] = 2.0
+    if seed % 2 == 0:
+        data = data.mask(rng.random(data.shape) < 0.3)
+    result = correlation_matrices(data)
+    for method in ('pearson', 'spearman', 'kendall'):
+        with warnings.catch_warnings():
+            # SciPy warns about the pairs with too few complete rows; pandas returns NaN for them
+            warnings.simplefilter('ignore')
+            expected = data.corr(method)
+        np.testing.assert_allclose(result[method].to_numpy(), expected.to_numpy(), atol=1e-12)
@@ -0,0 +1,91 @@
+# test_cuisine_index.py
+import numpy as np
+import pandas as pd
+import pytest
+from cuisine_index import CuisineEncoder, CuisineIndex, split_cuisines
+from pipeline import rated_mask
+
+
+def cuisine_lists(cuisines):
+    return [[] if pd.isna(value) else list(dict.fromkeys(tag.strip() for tag in str(value).split(',')))
+            for value in cuisines]
+
+
+@pytest.fixture(scope='module')
+def index(clean_data):
+    return CuisineIndex(clean_data)
+
+
+@pytest.fixture(scope='module')
+def exploded(clean_data):
+    # One row per (restaurant position, cuisine), as a per-row split would give
+    frame = pd.DataFrame({'row': np.arange(len(clean_data)), 'cuisine': cuisine_lists(clean_data['Cuisines'])})
+    return frame.explode('cuisine').dropna()
+
+
+def test_split_matches_exploded_counts(index, exploded):
+    expected = exploded['cuisine'].value_counts().sort_index()
+    assert index.names == list(expected.index)
+    np.testing.assert_array_equal(np.asarray(index.incidence.sum(axis=0)).ravel(), expected.to_numpy())
+
+
+def test_split_edge_cases():
+    cuisines = pd.Series(['Chinese, Chinese', np.nan, 'Thai,Chinese', 'Thai, Martian'])
+    incidence, names = split_cuisines(cuisines)
+    assert names == ['Chinese', 'Martian', 'Thai']
+    np.testing.assert_array_equal(incidence.toarray(), [[1, 0, 0], [0, 0, 0], [1, 0, 1], [0, 1, 1]])
+    # A fixed vocabulary ignores cuisines outside it
+    incidence, names = split_cuisines(cuisines, names=['Thai', 'Chinese'])
+    np.testing.assert_array_equal(incidence.toarray(), [[0, 1], [0, 0], [1, 1], [1, 0]])
+
+
+def test_queries_match_per_row_filters(index, clean_data):
+    lists = [set(tags) for tags in cuisine_lists(clean_data['Cuisines'])]
+    cities = clean_data['City'].astype(str).to_numpy()
+    cases = [
+        (['North Indian'], [], None),
+        (['North Indian', 'Chinese'], [], None),
+        ([], ['Italian', 'Pizza'], 'New Delhi'),
+        (['Cafe'], ['Desserts', 'Bakery'], 'Gurgaon'),
+        (['Martian'], [], None),
+        ([], [], 'Nowhere'),
+    ]
+    for all_of, any_of, city in cases:
+        expected = [position for position, tags in enumerate(lists)
+                    if set(all_of) <= tags and (not any_of or tags & set(any_of))
+                    and (city is None or cities[position] == city)]
+        assert index.query(all_of, any_of, city).index.equals(clean_data.index[expected])
+
+
+def test_stats_match_exploded_groupby(index, clean_data, exploded):
+    rows = exploded['row'].to_numpy()
+    frame = exploded.assign(votes=clean_data['Votes'].to_numpy()[rows],
+                            rating=clean_data['Aggregate rating'].to_numpy()[rows],
+                            rated=rated_mask(clean_data)[rows])
+    grouped = frame.groupby('cuisine')
+    stats = index.cuisine_stats()
+    assert stats['restaurants'].is_monotonic_decreasing
+    stats = stats.sort_index()
+    np.testing.assert_array_equal(stats['restaurants'], grouped.size())
+    np.testing.assert_allclose(stats['mean Votes'], grouped['votes'].mean())
+    # Unrated restaurants (placeholder rating 0) are left out of the rating mean
+    expected = frame[frame['rated']].groupby('cuisine')['rating'].mean().reindex(stats.index)
+    np.testing.assert_allclose(stats['mean Aggregate rating'], expected)
+
+
+def test_cooccurrence(index):
+    cooccurrence = index.cooccurrence()
+    assert (cooccurrence.to_numpy() == cooccurrence.to_numpy().T).all()
+    np.testing.assert_array_equal(np.diag(cooccurrence), np.asarray(index.incidence.sum(axis=0)).ravel())
+    both = len(index.query(['North Indian', 'Chinese']))
+    assert cooccurrence.loc['North Indian', 'Chinese'] == both
+
+
+def test_encoder_freezes_its_vocabulary():
+    train = pd.DataFrame({'Cuisines': ['Thai, Chinese', 'Chinese', 'Pizza']})
+    encoder = CuisineEncoder(min_restaurants=2).fit(train)
+    assert encoder.vocabulary_ == ['Chinese']
+    encoder = CuisineEncoder().fit(train)
+    matrix = encoder.transform(pd.DataFrame({'Cuisines': ['Pizza, Sushi', np.nan]}))
+    assert list(encoder.get_feature_names_out()) == ['Cuisines_Chinese', 'Cuisines_Pizza', 'Cuisines_Thai']
+    np.testing.assert_array_equal(matrix.toarray(), [[0, 1, 0], [0, 0, 0]])
@@ -0,0 +1,58 @@
+# test_data_access.py
+import os
+import threading
+import pandas as pd
+import pytest
+from cache_utils import atomic_open, atomic_write, file_fingerprint
+from data_access import _parse_country_codes, _parse_zomato, _snapshot_path, load_country_codes, load_zomato
+
+
+def test_snapshot_matches_parsed_csv():
+    data = load_zomato('zomato.csv')
+    assert os.path.exists(_snapshot_path('zomato', file_fingerprint('zomato.csv')))
+    pd.testing.assert_frame_equal(data, _parse_zomato('zomato.csv'))
+    pd.testing.assert_frame_equal(load_country_codes(), _parse_country_codes('Country-Code.xlsx'))
+
+
+def test_callers_get_independent_views():
+    first = load_zomato('zomato.csv')
+    votes = first['Votes'].copy()
+    first.loc[0, 'Votes'] = -1
+    first.drop(columns=['City'], inplace=True)
+    second = load_zomato('zomato.csv')
+    assert 'City' in second
+    pd.testing.assert_series_equal(second['Votes'], votes)
+
+
+def test_fingerprint_follows_content(tmp_path):
+    path = tmp_path / 'data.csv'
+    path.write_bytes(b'a,b\n1,2\n')
+    before = file_fingerprint(str(path))
+    path.write_bytes(b'a,b\n1,3\n')
+    os.utime(path, ns=(1, 1))
+    assert file_fingerprint(str(path)) != before
+
+
+def test_atomic_write_failure_keeps_old_file(tmp_path):
+    path = tmp_path / 'artifact.bin'
+    atomic_write(str(path), b'old')
+    with pytest.raises(RuntimeError):
+        with atomic_open(str(path)) as f:
+            f.write(b'partial')
+            raise RuntimeError('writer failed')
+    assert path.read_bytes() == b'old'
+    assert os.listdir(tmp_path) == ['artifact.bin']
+
+
+def test_concurrent_atomic_writes(tmp_path):
+    # Every reader sees one complete payload, never a mix, and no temporary file is left
+    path = str(tmp_path / 'shared.bin')
+    payloads = [bytes([i]) * 200_000 for i in range(8)]
+    threads = [threading.Thread(target=atomic_write, args=(path, payload)) for payload in payloads]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    with open(path, 'rb') as f:
+        assert f.read() in payloads
+    assert os.listdir(tmp_path) == ['shared.bin']
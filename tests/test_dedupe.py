@@ -0,0 +1,87 @@
+# test_dedupe.py
+import numpy as np
+import pandas as pd
+import pytest
+from dedupe import deduplicate, star_clusters, tokens_agree
+
+# Hand-labelled pairs of zomato.csv restaurant names in New Delhi: True for two spellings of the
+# same restaurant, False for different restaurants with similar names
+LABELLED_PAIRS = [
+    ('Hot & Hot', 'Hot n Hot', True),
+    ('Magic Masala', 'Masala Magic', True),
+    ('Aggarwal Sweet Centre', 'Aggarwal Sweets Centre', True),
+    ("Kay's Bar-Be-Que", 'Kays Bar-Be-Que', True),
+    ('Slice of Italy', 'Slice Of Italy', True),
+    ('Sher-E-Punjab', 'Sher-e-Punjab', True),
+    ('Faasos', "Faaso's", True),
+    ('Cuisine', 'Ma Cuisine', False),
+    ('The Mirch Masala', 'Hari Mirch Masala', False),
+    ('Chinese Fast Food', 'Hot Chinese & Fast Food', False),
+    ('Chinese Fast Food', 'Chinese Hut Fast Food', False),
+    ('Curries & Kebabs', 'Kebabs & Curries', False),
+    ('24/7 Bar- The Lalit New Delhi', '24/7 Restaurant - The Lalit New Delhi', False),
+    ('1911 - The Imperial', '1911 Bar - The Imperial', False),
+    ('Bonitos - The Uppal', 'Bonitos Blu - The Uppal', False),
+    ('Chimney', 'Hot Chimney', False),
+]
+
+
+@pytest.fixture(scope='module')
+def canonical_ids(clean_data):
+    ids, _, _ = deduplicate(clean_data)
+    return ids
+
+
+def canonical_id(clean_data, canonical_ids, name):
+    rows = (clean_data['City'] == 'New Delhi') & (clean_data['Restaurant Name'] == name)
+    assert rows.any(), name
+    return canonical_ids[rows].iloc[0]
+
+
+def test_labelled_pairs_precision(clean_data, canonical_ids):
+    predicted = [canonical_id(clean_data, canonical_ids, left) == canonical_id(clean_data, canonical_ids, right)
+                 for left, right, _ in LABELLED_PAIRS]
+    labels = [same for _, _, same in LABELLED_PAIRS]
+    true_positives = sum(p and s for p, s in zip(predicted, labels))
+    merged = sum(predicted)
+    assert merged > 0
+    assert true_positives / merged == 1.0
+    assert true_positives / sum(labels) >= 0.8
+
+
+def test_tokens_agree():
+    assert tokens_agree('hot n hot', 'hot and hot')
+    assert tokens_agree('magic masala', 'masala magic')
+    assert tokens_agree('kolkata kathi roll', 'kolkatta kathi roll')
+    assert tokens_agree('hotmess', 'hot mess')
+    assert not tokens_agree('cuisine', 'ma cuisine')
+    assert not tokens_agree('247 bar', '247 restaurant')
+    assert not tokens_agree('the mirch masala', 'hari mirch masala')
+
+
+def test_location_is_required():
+    # The same two spellings merge side by side and stay apart 5 km away; with two names only,
+    # the shared 3-grams get a low IDF weight, hence the lower threshold
+    def frame(second_latitude):
+        return pd.DataFrame({'Restaurant Name': ['Baskin Robbins', 'Baskin Robbin'], 'City': ['Gurgaon', 'Gurgaon'],
+                             'Latitude': [28.45, second_latitude], 'Longitude': [77.05, 77.05]})
+
+    near, _, near_summary = deduplicate(frame(28.451), threshold=0.5)
+    far, _, far_summary = deduplicate(frame(28.495), threshold=0.5)
+    assert near_summary['similar_pairs'] == far_summary['similar_pairs'] == 1
+    assert near.nunique() == 1
+    assert far.nunique() == 2
+
+
+def test_star_clusters_do_not_chain():
+    # 0-1-2-3-4 in a line: a transitive closure joins all five, stars keep two clusters
+    pairs = np.array([[0, 1], [1, 2], [2, 3], [3, 4]])
+    cluster = star_clusters(6, pairs, np.array([1, 5, 1, 1, 1, 1]))
+    assert cluster[0] == cluster[1] == cluster[2]
+    assert cluster[3] == cluster[4] != cluster[0]
+    assert len(set(cluster)) == 3
+    # Every member is linked to its center
+    linked = {tuple(pair) for pair in pairs} | {tuple(pair[::-1]) for pair in pairs}
+    for members in pd.Series(range(6)).groupby(cluster):
+        members = list(members[1])
+        assert any(all(m == c or (m, c) in linked for m in members) for c in members)
@@ -0,0 +1,120 @@
+# test_features.py
+import numpy as np
+import pandas as pd
+import pytest
+import scipy.sparse as sp
+from sklearn.compose import ColumnTransformer
+from sklearn.preprocessing import OneHotEncoder, StandardScaler
+from categories import TopNCollapser
+from features import MISSING, CategoryCodes
+from training import CATEGORICAL_FEATURES, MODEL_FAMILIES, NUMERICAL_FEATURES, build_features
+
+
+@pytest.fixture(scope='module')
+def split(clean_data):
+    train, test = clean_data.iloc[:7000], clean_data.iloc[7000:].copy()
+    # Values the training rows never had, and missing values
+    test.loc[test.index[0], 'City'] = np.nan
+    test['Cuisines'] = test['Cuisines'].cat.add_categories(['Martian'])
+    test.loc[test.index[1], 'Cuisines'] = 'Martian'
+    return train, test
+
+
+def one_hot_reference(train, test):
+    # The previous encoding: collapse to the top 10, then one-hot encode and standardize
+    collapser = TopNCollapser(CATEGORICAL_FEATURES, top_n=10).fit(train)
+    encoder = ColumnTransformer([('cat', OneHotEncoder(handle_unknown='ignore'), CATEGORICAL_FEATURES),
+                                 ('num', StandardScaler(), NUMERICAL_FEATURES)])
+    encoder.fit(collapser.transform(train))
+    matrix = encoder.transform(collapser.transform(test))
+    names = [f'{column}={MISSING if pd.isna(category) else category}'
+             for column, categories in zip(CATEGORICAL_FEATURES, encoder.named_transformers_['cat'].categories_)
+             for category in categories]
+    return (matrix.toarray() if sp.issparse(matrix) else matrix), names + NUMERICAL_FEATURES
+
+
+def test_matches_the_one_hot_encoding(split):
+    train, test = split
+    features = build_features().fit(train)
+    matrix = features.transform(test)
+    expected, expected_names = one_hot_reference(train, test)
+
+    position = {name: i for i, name in enumerate(features.feature_names_)}
+    columns = [position[name] for name in expected_names]
+    dense = matrix.toarray()
+    np.testing.assert_allclose(dense[:, columns], expected, rtol=1e-5, atol=1e-5)
+    # Where the one-hot encoder left a block empty (a value unseen in training, e.g. a missing
+    # City), the row holds the 'Other' or missing slot the training rows never used
+    unused = np.setdiff1d(np.arange(len(position)), columns)
+    empty_blocks = len(CATEGORICAL_FEATURES) - expected[:, :-len(NUMERICAL_FEATURES)].sum(axis=1)
+    np.testing.assert_array_equal(dense[:, unused].sum(axis=1), empty_blocks)
+    assert dense[1, position['Cuisines=Other']] == 1
+    assert dense[0, position[f'City={MISSING}']] == 1
+
+
+def test_one_entry_per_input_column(split):
+    train, test = split
+    features = build_features().fit(train)
+    matrix = features.transform(test)
+    assert sp.isspmatrix_csr(matrix) and matrix.dtype == np.float32
+    assert matrix.indices.dtype == np.int32
+    np.testing.assert_array_equal(np.diff(matrix.indptr), len(features.input_columns_))
+    assert matrix.shape == (len(test), len(features.feature_names_))
+
+
+def test_layout_is_stable(split):
+    train, test = split
+    first, second = build_features().fit(train), build_features().fit(train.sample(frac=1, random_state=0))
+    assert first.feature_names_ == second.feature_names_
+    assert first.layout_hash_ == second.layout_hash_
+    assert build_features().fit(test).layout_hash_ != first.layout_hash_
+
+
+def test_object_and_categorical_input_agree(split):
+    train, test = split
+    features = build_features().fit(train)
+    as_object = test.astype({column: object for column in CATEGORICAL_FEATURES})
+    assert (features.transform(as_object) != features.transform(test)).nnz == 0
+
+
+
+def test_category_codes_read_back_the_input_columns(split):
+    train, test = split
+    features = build_features().fit(train)
+    codes = CategoryCodes().fit(features.transform(train))
+    matrix = features.transform(test)
+    frame = codes.transform(matrix)
+    assert frame.shape[1] == len(features.input_columns_)
+    assert codes.categorical_.tolist() == [True] * len(CATEGORICAL_FEATURES) + [False] * len(NUMERICAL_FEATURES)
+
+    # Each code is the rank of the row's feature index among the indices seen in training
+    indices = matrix.indices.reshape(len(test), -1)
+    for position in range(len(CATEGORICAL_FEATURES)):
+        column = frame.iloc[:, position]
+        seen = codes.feature_indices_[position]
+        known = np.isin(indices[:, position], seen)
+        np.testing.assert_array_equal(seen[column.cat.codes.to_numpy()[known]], indices[known, position])
+        assert column[~known].isna().all()
+    # The City missing slot was never used in training
+    assert pd.isna(frame.iloc[0, CATEGORICAL_FEATURES.index('City')])
+
+    expected = (test[NUMERICAL_FEATURES].to_numpy(dtype=float) - features.mean_) / features.scale_
+    np.testing.assert_allclose(frame.iloc[:, len(CATEGORICAL_FEATURES):].to_numpy(), expected, rtol=1e-5, atol=1e-5)
+
+
+def test_category_codes_reject_other_matrices(split):
+    train, _ = split
+    codes = CategoryCodes().fit(build_features().fit_transform(train))
+    with pytest.raises(ValueError, match='one entry per input column'):
+        codes.transform(sp.csr_matrix(np.array([[1.0, 0.0], [0.0, 0.0]])))
+    with pytest.raises(ValueError, match='input columns'):
+        codes.transform(sp.csr_matrix(np.eye(3)))
+
+
+def test_gradient_boosting_splits_on_category_codes(prepared):
+    from sklearn.metrics import accuracy_score
+    model = MODEL_FAMILIES['hist_gradient_boosting'][1]().fit(prepared['X_train'], prepared['y_train'])
+    booster = model[-1]
+    assert booster.is_categorical_.tolist() == model[0].categorical_.tolist()
+    assert booster.n_features_in_ == len(prepared['features'].input_columns_)
+    assert accuracy_score(prepared['y_test'], model.predict(prepared['X_test'])) > 0.95
@@ -0,0 +1,63 @@
+# test_figures.py
+import os
+import pytest
+import figures
+from figures import FIGURE_INPUTS, FIGURES, FigureRenderer, figure_path, render_figure
+from pipeline import stage_fingerprints
+
+PNG_SIGNATURE = b'\x89PNG\r\n\x1a\n'
+
+
+def fail_to_plot(*args, **kwargs):
+    raise AssertionError('a cached figure was rendered again')
+
+
+def test_figure_is_rendered_once(clean_data, monkeypatch):
+    fingerprint = stage_fingerprints()['cleaned']
+    path = render_figure('pie', 'cleaned', fingerprint, {'column': 'City'})
+    assert path == figure_path('pie', 'cleaned', fingerprint, {'column': 'City'})
+    with open(path, 'rb') as f:
+        assert f.read(8) == PNG_SIGNATURE
+    monkeypatch.setitem(FIGURES, 'pie', fail_to_plot)
+    assert render_figure('pie', 'cleaned', fingerprint, {'column': 'City'}) == path
+
+
+def test_cache_key_follows_every_input():
+    paths = {figure_path('pie', 'cleaned', 'a', {'column': 'City'}),
+             figure_path('count', 'cleaned', 'a', {'column': 'City'}),
+             figure_path('pie', 'trimmed', 'a', {'column': 'City'}),
+             figure_path('pie', 'cleaned', 'b', {'column': 'City'}),
+             figure_path('pie', 'cleaned', 'a', {'column': 'Country'})}
+    assert len(paths) == 5
+
+
+def test_changed_data_is_not_rendered_under_an_old_fingerprint(clean_data):
+    with pytest.raises(RuntimeError, match='changed'):
+        render_figure('pie', 'cleaned', '0' * 64, {'column': 'Country'})
+    assert not os.path.exists(figure_path('pie', 'cleaned', '0' * 64, {'column': 'Country'}))
+
+
+def test_heatmap_inputs_are_the_cached_correlations(clean_data):
+    from correlation import correlation_matrices
+    fingerprint = stage_fingerprints()['cleaned']
+    matrix = FIGURE_INPUTS['heatmap']('cleaned', fingerprint, method='spearman')['matrix']
+    expected = correlation_matrices(clean_data.select_dtypes(include='number'))['spearman']
+    assert matrix.round(10).equals(expected.round(10))
+    assert FIGURE_INPUTS['heatmap']('cleaned', fingerprint, method='covariance') == {}
+
+
+def test_renderer_uses_spawned_workers_and_the_cache(clean_data, monkeypatch):
+    renderer = FigureRenderer(max_workers=1)
+    path = renderer.submit('distribution', column='Votes', color_index=2).result(120)
+    assert renderer._pool._mp_context.get_start_method() == 'spawn'
+    with open(path, 'rb') as f:
+        assert f.read(8) == PNG_SIGNATURE
+    renderer._pool.shutdown()
+
+    # A cached figure is returned without a pool
+    renderer = FigureRenderer(max_workers=1)
+    monkeypatch.setitem(FIGURES, 'distribution', fail_to_plot)
+    future = renderer.submit('distribution', column='Votes', color_index=2)
+    assert future.done() and future.result() == path
+    assert renderer._pool is None
+    assert figures.get_renderer() is figures.get_renderer()
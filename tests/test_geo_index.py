@@ -0,0 +1,95 @@
+# test_geo_index.py
+import numpy as np
+import pandas as pd
+import pytest
+from geo_index import EARTH_RADIUS_KM, GeoIndex, get_geo_index
+from pipeline import rated_mask
+
+RADIUS_KM = 1.0
+
+
+def haversine_km(latitude, longitude, latitudes, longitudes):
+    lat1, lon1, lat2, lon2 = (np.radians(np.asarray(value, dtype=float))
+                              for value in (latitude, longitude, latitudes, longitudes))
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(a))
+
+
+def cuisine_set(value):
+    return set() if pd.isna(value) else {tag.strip() for tag in str(value).split(',')}
+
+
+@pytest.fixture(scope='module')
+def gurgaon(clean_data):
+    data = clean_data[clean_data['City'] == 'Gurgaon']
+    data = data[(data['Latitude'] != 0) | (data['Longitude'] != 0)].copy()
+    # Two restaurants without a location
+    data.loc[data.index[:2], ['Latitude', 'Longitude']] = [[0.0, 0.0], [np.nan, np.nan]]
+    return data
+
+
+@pytest.fixture(scope='module')
+def index(gurgaon):
+    return GeoIndex(gurgaon)
+
+
+@pytest.fixture(scope='module')
+def located(gurgaon):
+    return gurgaon.iloc[2:]
+
+
+def test_unlocated_rows_are_left_out(index, gurgaon):
+    assert len(index.data) == len(gurgaon) - 2
+    assert not index.data.index.isin(gurgaon.index[:2]).any()
+
+
+def test_knn_and_within_match_brute_force(index, located):
+    for latitude, longitude in located[['Latitude', 'Longitude']].to_numpy()[::97]:
+        distances = haversine_km(latitude, longitude, located['Latitude'], located['Longitude'])
+        nearest = index.knn(latitude, longitude, k=7)
+        np.testing.assert_allclose(nearest['distance_km'], np.sort(distances)[:7], atol=1e-9)
+        within = index.within(latitude, longitude, RADIUS_KM)
+        assert set(within.index) == set(located.index[distances <= RADIUS_KM])
+        assert within['distance_km'].is_monotonic_increasing
+
+
+def test_competitor_density_matches_brute_force(index, located):
+    latitude, longitude = located[['Latitude', 'Longitude']].median()
+    near = located[haversine_km(latitude, longitude, located['Latitude'], located['Longitude']) <= RADIUS_KM]
+    expected = pd.Series([tag for value in near['Cuisines'] for tag in cuisine_set(value)]).value_counts()
+    density = index.competitor_density(latitude, longitude, RADIUS_KM)
+    assert density.to_dict() == expected.to_dict()
+    assert density.is_monotonic_decreasing
+    cuisine = expected.index[0]
+    assert index.competitor_density(latitude, longitude, RADIUS_KM, cuisine=cuisine) == expected[cuisine]
+    assert index.competitor_density(latitude, longitude, RADIUS_KM, cuisine='Martian') == 0
+
+
+def test_neighborhood_features_match_brute_force(index, gurgaon, located):
+    features = index.neighborhood_features(RADIUS_KM, k=3)
+    assert features.index.equals(gurgaon.index)
+    assert features.loc[gurgaon.index[:2]].isna().all().all()
+
+    cuisines = [cuisine_set(value) for value in located['Cuisines']]
+    ratings = located['Aggregate rating'].to_numpy()
+    rated = rated_mask(located)
+    for i in range(0, len(located), 41):
+        distances = haversine_km(located['Latitude'].iloc[i], located['Longitude'].iloc[i],
+                                 located['Latitude'], located['Longitude'])
+        distances[i] = np.inf
+        near = np.flatnonzero(distances <= RADIUS_KM)
+        row = features.loc[located.index[i]]
+        assert row['neighbors'] == len(near)
+        assert row['same_cuisine_neighbors'] == sum(bool(cuisines[i] & cuisines[j]) for j in near)
+        # Unrated neighbours (rating 0) do not pull the mean down
+        rated_near = near[rated[near]]
+        if len(rated_near):
+            assert row['neighbor_mean_rating'] == pytest.approx(ratings[rated_near].mean())
+        else:
+            assert np.isnan(row['neighbor_mean_rating'])
+        assert row['nearest_km'] == pytest.approx(np.sort(distances)[0])
+        assert row['mean_knn_km'] == pytest.approx(np.sort(distances)[:3].mean())
+
+
+def test_index_is_built_once_per_dataset_version(clean_data):
+    assert get_geo_index() is get_geo_index()
@@ -0,0 +1,83 @@
+# test_incremental_stats.py
+import numpy as np
+import pandas as pd
+import pytest
+from incremental_stats import HLL_PRECISION, HyperLogLog, RunningStats, hash_values
+
+# Three standard errors of a HyperLogLog estimate (1.04 / sqrt(registers))
+HLL_TOLERANCE = 3 * 1.04 / np.sqrt(1 << HLL_PRECISION)
+
+
+def make_frame(n_rows, seed):
+    rng = np.random.default_rng(seed)
+    data = pd.DataFrame({
+        'City': rng.choice(['Delhi', 'Pune', 'Goa', None], size=n_rows),
+        'Votes': rng.integers(0, 1000, size=n_rows).astype(float),
+        'Aggregate rating': rng.normal(3.5, 0.6, size=n_rows).round(1),
+        'Average Cost for two': rng.lognormal(6, 1, size=n_rows).round(),
+    })
+    numeric = ['Votes', 'Aggregate rating', 'Average Cost for two']
+    data[numeric] = data[numeric].mask(rng.random((n_rows, len(numeric))) < 0.05)
+    # Some exact duplicate rows
+    return pd.concat([data, data.sample(n_rows // 20, random_state=seed)], ignore_index=True)
+
+
+@pytest.mark.parametrize('n_distinct', [10, 1_000, 50_000, 300_000])
+def test_hyperloglog_error_is_within_three_standard_errors(n_distinct):
+    values = pd.Series(np.arange(n_distinct).repeat(2))
+    estimate = HyperLogLog().add_hashes(hash_values(values)).estimate()
+    assert abs(estimate - n_distinct) <= max(HLL_TOLERANCE * n_distinct, 1)
+
+
+def test_hyperloglog_merge_equals_the_sketch_of_the_union():
+    left, right = pd.Series(np.arange(0, 60_000)), pd.Series(np.arange(40_000, 100_000))
+    merged = HyperLogLog().add_hashes(hash_values(left)).merge(HyperLogLog().add_hashes(hash_values(right)))
+    union = HyperLogLog().add_hashes(hash_values(pd.concat([left, right])))
+    np.testing.assert_array_equal(merged.registers, union.registers)
+
+
+def assert_matches_pandas(stats, data):
+    numeric = data[stats.numeric_columns]
+    describe = stats.describe()
+    np.testing.assert_allclose(describe.loc['count'], numeric.count())
+    np.testing.assert_allclose(describe.loc['mean'], numeric.mean(), rtol=1e-10)
+    np.testing.assert_allclose(describe.loc['std'], numeric.std(), rtol=1e-10)
+    np.testing.assert_allclose(describe.loc['min'], numeric.min())
+    np.testing.assert_allclose(describe.loc['max'], numeric.max())
+    np.testing.assert_allclose(stats.var(), numeric.var(), rtol=1e-10)
+    # Covariance is defined over the rows where every numeric column is present
+    np.testing.assert_allclose(stats.cov(), numeric.dropna().cov(), rtol=1e-10)
+    pd.testing.assert_series_equal(stats.null_counts(), data.isnull().sum().astype(np.int64))
+    assert stats.rows == len(data)
+    assert stats.duplicate_count() == data.duplicated().sum()
+
+
+def test_batch_updates_match_pandas():
+    data = make_frame(5_000, seed=0)
+    stats = RunningStats(data.iloc[:1_000])
+    for start in range(1_000, len(data), 700):
+        stats.update(data.iloc[start:start + 700])
+    assert_matches_pandas(stats, data)
+
+
+def test_merged_summaries_match_pandas():
+    data = make_frame(5_000, seed=1)
+    parts = np.array_split(np.arange(len(data)), 4)
+    stats = RunningStats(data.iloc[parts[0]])
+    for part in parts[1:]:
+        stats.merge(RunningStats(data.iloc[part]))
+    assert_matches_pandas(stats, data)
+
+
+def test_distinct_counts_match_pandas():
+    data = make_frame(5_000, seed=2)
+    stats = RunningStats(data)
+    for column in data.columns:
+        expected = data[column].nunique()
+        assert abs(stats.nunique(column) - expected) <= max(HLL_TOLERANCE * expected, 1)
+
+
+def test_update_rejects_other_columns():
+    stats = RunningStats(make_frame(100, seed=3))
+    with pytest.raises(ValueError):
+        stats.update(pd.DataFrame({'Votes': [1.0]}))
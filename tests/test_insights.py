@@ -0,0 +1,42 @@
+# test_insights.py
+import os
+import sys
+from streamlit.testing.v1 import AppTest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def insights_page(empty_cell):
+    # Runs as the app script: the repository is its working directory and import path
+    import os
+    import sys
+    from unittest import mock
+    sys.path.insert(0, os.getcwd())
+    import aggregate_cube
+    from Insights import Insights
+    if empty_cell:
+        with mock.patch.object(aggregate_cube.AggregateCube, 'cell', return_value=None):
+            Insights()
+    else:
+        Insights()
+
+
+def run_page(empty_cell, monkeypatch):
+    monkeypatch.chdir(ROOT)
+    # AppTest installs its script as __main__; later spawned worker pools would re-run it
+    monkeypatch.setitem(sys.modules, '__main__', sys.modules['__main__'])
+    at = AppTest.from_function(insights_page, args=(empty_cell,), default_timeout=120)
+    return at.run()
+
+
+def test_competitor_metrics(monkeypatch):
+    at = run_page(False, monkeypatch)
+    assert not at.exception
+    assert [metric.label for metric in at.metric] == ['Competitors', 'Mean rating', 'Mean cost for two']
+
+
+def test_empty_cell_shows_a_message(monkeypatch):
+    at = run_page(True, monkeypatch)
+    assert not at.exception
+    assert len(at.metric) == 0
+    assert at.info and at.info[0].value.startswith('No restaurant in ')
@@ -0,0 +1,60 @@
+# test_memory_optimizer.py
+import numpy as np
+import pandas as pd
+import pytest
+from memory_optimizer import (FLOAT_TOLERANCE, compact_flag, compact_integer, infer_schema, optimize_memory)
+from pipeline import cast_categories, drop_null_rows, drop_sparse_columns, load_stage
+
+
+@pytest.fixture
+def frame():
+    return pd.DataFrame({'Has Table booking': ['Yes', 'No', 'No'], 'Votes': [0, 250, 10934],
+                         'Change': [-3, 0, 120], 'Latitude': [28.5355161, 12.9715987, 19.0759837],
+                         'Aggregate rating': [4.1, 0.0, 3.7], 'Mall': ['Select Citywalk', None, 'DLF Place']})
+
+
+def test_values_are_unchanged(frame):
+    compact, report = optimize_memory(frame)
+    assert compact['Has Table booking'].tolist() == [True, False, False]
+    assert compact['Votes'].dtype == np.int16 and compact['Votes'].tolist() == frame['Votes'].tolist()
+    assert compact['Change'].dtype == np.int8 and compact['Change'].tolist() == frame['Change'].tolist()
+    assert isinstance(compact['Mall'].dtype, pd.CategoricalDtype)
+    pd.testing.assert_series_equal(compact['Mall'].astype(str), frame['Mall'].astype(str))
+    assert report.loc['Total', 'bytes_after'] < report.loc['Total', 'bytes_before']
+
+
+def test_floats_are_kept_unless_asked(frame):
+    compact, _ = optimize_memory(frame)
+    assert (compact[['Latitude', 'Aggregate rating']].dtypes == np.float64).all()
+    assert compact['Latitude'].equals(frame['Latitude'])
+
+    # Opt-in narrowing never touches the coordinates and stays within the tolerance
+    schema = infer_schema(frame, narrow_floats=True)
+    assert 'Latitude' not in schema and schema['Aggregate rating'] == 'float'
+    narrowed, _ = optimize_memory(frame, schema)
+    assert narrowed['Latitude'].equals(frame['Latitude'])
+    assert narrowed['Aggregate rating'].dtype == np.float32
+    assert np.abs(narrowed['Aggregate rating'].to_numpy(dtype=np.float64) - frame['Aggregate rating']).max() <= FLOAT_TOLERANCE
+
+
+def test_integers_stay_signed():
+    compact = compact_integer(pd.Series([3, 200, 40000]))
+    assert compact.dtype == np.int32
+    assert (compact - 40000).min() == -39997
+
+
+def test_flag_rejects_other_values():
+    assert compact_flag(pd.Series(['Yes', None])).dtype == 'boolean'
+    with pytest.raises(ValueError):
+        compact_flag(pd.Series(['Yes', 'Maybe'], name='Has Table booking'))
+
+
+def test_pipeline_stores_compact_values(clean_data):
+    # The cleaned data holds the same values as the uncompacted stages, in smaller dtypes
+    plain = drop_null_rows(drop_sparse_columns(cast_categories(load_stage('trimmed'))))
+    assert clean_data['Votes'].dtype.itemsize < 8
+    assert isinstance(clean_data['Mall'].dtype, pd.CategoricalDtype)
+    assert (clean_data[['Latitude', 'Longitude']].dtypes == np.float64).all()
+    compacted = ['Average Cost for two', 'Votes', 'Mall']
+    assert clean_data[compacted].memory_usage(deep=True).sum() < plain[compacted].memory_usage(deep=True).sum() / 2
+    pd.testing.assert_frame_equal(clean_data, plain, check_dtype=False, check_categorical=False)
@@ -0,0 +1,84 @@
+# test_model_selection.py
+import glob
+import os
+import numpy as np
+import pytest
+import scipy.sparse as sp
+from sklearn.model_selection import GridSearchCV
+import model_selection
+from model_selection import _task_key, halving_schedule, load_shared_matrix, save_shared_matrix, search
+from pipeline import stage_fingerprints
+from training import MODEL_FAMILIES
+
+TREE_GRID = {'estimator__max_depth': [3, 5], 'estimator__min_samples_split': [2]}
+
+
+@pytest.fixture
+def small_tree_grid(monkeypatch):
+    display_name, make_estimator, _ = MODEL_FAMILIES['decision_tree']
+    monkeypatch.setitem(MODEL_FAMILIES, 'decision_tree', (display_name, make_estimator, TREE_GRID))
+
+
+def result_files():
+    directory = model_selection._matrix_dir(stage_fingerprints()['cleaned'])
+    return {path: os.stat(path).st_mtime_ns for path in glob.glob(os.path.join(directory, 'results', '*.json'))}
+
+
+@pytest.mark.parametrize('sparse', [True, False])
+def test_shared_matrix_round_trip(tmp_path, sparse):
+    rng = np.random.RandomState(0)
+    X = sp.random(50, 8, density=0.3, format='csr', random_state=rng, dtype=np.float32)
+    X = X if sparse else X.toarray()
+    y = rng.randint(0, 4, 50)
+    save_shared_matrix(X, y, str(tmp_path))
+    loaded, loaded_y = load_shared_matrix(str(tmp_path))
+    assert sp.issparse(loaded) == sparse
+    np.testing.assert_array_equal(loaded.toarray() if sparse else loaded, X.toarray() if sparse else X)
+    np.testing.assert_array_equal(loaded_y, y)
+
+
+def test_halving_schedule():
+    schedule = halving_schedule(9, 6000, eta=3, min_resources=500)
+    assert schedule == [(9, 500), (3, 1500), (1, 6000)]
+    # Never more rungs than the data allows, and a single rung trains on every row
+    assert halving_schedule(9, 600, eta=3, min_resources=500) == [(9, 600)]
+    assert halving_schedule(1, 6000, eta=3, min_resources=500) == [(1, 6000)]
+
+
+def test_task_keys_follow_every_input():
+    base = ('a' * 64, 'decision_tree', {'estimator__max_depth': 3}, 0, 100)
+    keys = {_task_key(*base),
+            _task_key('b' * 64, *base[1:]),
+            _task_key(base[0], 'knn', *base[2:]),
+            _task_key(*base[:2], {'estimator__max_depth': 5}, *base[3:]),
+            _task_key(*base[:3], 1, base[4]),
+            _task_key(*base[:4], 200)}
+    assert len(keys) == 6
+    assert _task_key(*base) == _task_key(*base)
+
+
+def test_search_matches_grid_search_and_resumes(small_tree_grid, prepared):
+    results = search(['decision_tree'], n_jobs=2, refit=False)['decision_tree']
+    _, make_estimator, _ = MODEL_FAMILIES['decision_tree']
+    grid_search = GridSearchCV(make_estimator(), TREE_GRID, cv=model_selection.CV_FOLDS, scoring='accuracy')
+    grid_search.fit(prepared['X_train'], prepared['y_train'])
+    assert results['best_params'] == grid_search.best_params_
+    assert results['cv_accuracy'] == pytest.approx(grid_search.best_score_)
+    expected = dict(zip(map(model_selection._params_key, grid_search.cv_results_['params']),
+                        grid_search.cv_results_['mean_test_score']))
+    assert {model_selection._params_key(params): score for params, score in results['candidates']} \
+        == pytest.approx(expected)
+
+    # Every fold of every candidate is cached; a rerun reads them all back ...
+    files = result_files()
+    assert len(files) == len(TREE_GRID['estimator__max_depth']) * model_selection.CV_FOLDS
+    assert search(['decision_tree'], n_jobs=2, refit=False)['decision_tree'] == results
+    assert result_files() == files
+
+    # ... and an interrupted search only refits the missing folds
+    missing = sorted(files)[0]
+    os.remove(missing)
+    assert search(['decision_tree'], n_jobs=2, refit=False)['decision_tree'] == results
+    rerun = result_files()
+    assert set(rerun) == set(files)
+    assert [path for path in files if rerun[path] != files[path]] == [missing]
@@ -0,0 +1,58 @@
+# test_navigation.py
+import json
+import os
+import startup_benchmark
+from navigation import DEFAULT_PAGE, PAGES, load_page
+
+
+def test_pages_load_their_function():
+    for page, module in PAGES.items():
+        function = load_page(page)
+        assert (function.__name__, function.__module__) == (module, module)
+    assert load_page('Unknown') is load_page(DEFAULT_PAGE)
+
+
+def test_introduction_paints_without_heavy_modules():
+    run = startup_benchmark.first_paint('Introduction')
+    assert run['page'] == 'Introduction'
+    assert run['exceptions'] == []
+    assert run['heavy_modules'] == []
+
+
+def test_import_profile_reports_the_module():
+    profile = startup_benchmark.import_profile('navigation', top=3)
+    assert profile['module'] == 'navigation' and profile['seconds'] > 0
+    assert len(profile['imports']) <= 3
+    assert all(cumulative >= self_seconds for _, self_seconds, cumulative in profile['imports'])
+
+
+def test_slower_first_paint_is_a_regression(tmp_path, monkeypatch):
+    seconds = {'value': 1.0}
+    monkeypatch.setattr(startup_benchmark, 'baseline_path', lambda: str(tmp_path / 'startup.json'))
+    monkeypatch.setattr(startup_benchmark, 'import_profile', lambda module: {'module': module})
+    monkeypatch.setattr(startup_benchmark, 'first_paint',
+                        lambda page: {'page': page, 'seconds': seconds['value'], 'exceptions': [],
+                                      'heavy_modules': []})
+
+    # The first run saves the baseline; later runs compare against it without replacing it
+    assert startup_benchmark.run_benchmark(repeat=1)[1] == []
+    seconds['value'] = 1.1
+    assert startup_benchmark.run_benchmark(repeat=1)[1] == []
+    seconds['value'] = 1.5
+    assert startup_benchmark.run_benchmark(repeat=1)[1] == ['Introduction: first paint 1.50s, baseline 1.00s']
+    with open(tmp_path / 'startup.json') as f:
+        assert json.load(f)['first_paint']['Introduction']['seconds'] == 1.0
+    startup_benchmark.run_benchmark(repeat=1, update_baseline=True)
+    assert startup_benchmark.run_benchmark(repeat=1)[1] == []
+
+
+def test_heavy_imports_fail_the_introduction(tmp_path, monkeypatch):
+    monkeypatch.setattr(startup_benchmark, 'baseline_path', lambda: str(tmp_path / 'startup.json'))
+    monkeypatch.setattr(startup_benchmark, 'import_profile', lambda module: {'module': module})
+    monkeypatch.setattr(startup_benchmark, 'first_paint',
+                        lambda page: {'page': page, 'seconds': 1.0, 'exceptions': ['boom'],
+                                      'heavy_modules': ['pandas']})
+    _, failures = startup_benchmark.run_benchmark(repeat=1)
+    assert failures == ["Introduction: the page raised ['boom']",
+                        'Introduction: imported pandas before its first paint']
+    assert os.path.exists(tmp_path / 'startup.json')
@@ -0,0 +1,84 @@
+# test_pipeline.py
+import os
+import pandas as pd
+import pytest
+import pipeline
+from data_access import load_country_codes
+
+
+@pytest.fixture
+def data_file(tmp_path):
+    # A small Zomato-schema CSV of its own, so its stages are cached under their own fingerprints
+    path = tmp_path / 'zomato-small.csv'
+    pd.read_csv('zomato.csv', encoding='latin-1', nrows=400).to_csv(path, index=False, encoding='latin-1')
+    return str(path)
+
+
+def stage_files(data_file):
+    return {stage_name: pipeline._stage_path(stage_name, fingerprint)
+            for stage_name, fingerprint in pipeline.stage_fingerprints(data_file).items()}
+
+
+def test_fingerprints_chain(data_file, monkeypatch):
+    fingerprints = pipeline.stage_fingerprints(data_file)
+    assert list(fingerprints) == [stage_name for stage_name, _ in pipeline.STAGES]
+    assert len(set(fingerprints.values())) == len(fingerprints)
+    # Each stage is keyed on its upstream stage, so every key follows the source and the version
+    upstream = pipeline.source_fingerprint(data_file)
+    for stage_name, fingerprint in fingerprints.items():
+        assert fingerprint == pipeline.stage_fingerprint(upstream, stage_name)
+        upstream = fingerprint
+    assert set(pipeline.stage_fingerprints().values()).isdisjoint(fingerprints.values())
+    monkeypatch.setattr(pipeline, 'PIPELINE_VERSION', pipeline.PIPELINE_VERSION + 1)
+    assert set(pipeline.stage_fingerprints(data_file).values()).isdisjoint(fingerprints.values())
+
+
+def test_stages_match_the_stage_functions(data_file):
+    outputs = pipeline.run_pipeline(data_file)
+    data = pd.read_csv(data_file, encoding='latin-1')
+    for stage_name, stage in pipeline.STAGES:
+        data = stage(data, load_country_codes()) if stage_name == 'merged' else stage(data)
+        pd.testing.assert_frame_equal(outputs[stage_name], data, check_categorical=False, check_dtype=False)
+    assert all(os.path.exists(path) for path in stage_files(data_file).values())
+
+
+def test_cached_stages_are_read_back(data_file, monkeypatch):
+    expected = pipeline.run_pipeline(data_file)['cleaned']
+    pipeline._run_pipeline.cache_clear()
+
+    def no_source(*args):
+        raise AssertionError('the source data was loaded although every stage is cached')
+
+    monkeypatch.setattr(pipeline, 'load_zomato', no_source)
+    pd.testing.assert_frame_equal(pipeline.run_pipeline(data_file)['cleaned'], expected)
+
+
+def test_missing_stage_is_rebuilt_from_upstream(data_file, monkeypatch):
+    expected = pipeline.run_pipeline(data_file)
+    files = stage_files(data_file)
+    os.remove(files['area_dropped'])
+    os.remove(files['cleaned'])
+    pipeline._run_pipeline.cache_clear()
+    monkeypatch.setattr(pipeline, 'load_zomato', lambda *args: pytest.fail('the source data was reloaded'))
+    rebuilt = pipeline.run_pipeline(data_file)
+    pd.testing.assert_frame_equal(rebuilt['cleaned'], expected['cleaned'])
+    assert os.path.exists(files['area_dropped']) and os.path.exists(files['cleaned'])
+
+
+def test_changed_source_invalidates_every_stage(data_file):
+    before = pipeline.run_pipeline(data_file)['cleaned']
+    data = pd.read_csv(data_file, encoding='latin-1')
+    data.loc[0, 'Votes'] = 123456
+    data.to_csv(data_file, index=False, encoding='latin-1')
+    os.utime(data_file, ns=(1, 1))
+    after = pipeline.run_pipeline(data_file)['cleaned']
+    assert before.loc[0, 'Votes'] != 123456
+    assert after.loc[0, 'Votes'] == 123456
+
+
+def test_callers_get_independent_views(data_file):
+    first = pipeline.run_pipeline(data_file)['cleaned']
+    first.loc[first.index[0], 'Votes'] = -1
+    first.drop(columns=['City'], inplace=True)
+    second = pipeline.run_pipeline(data_file)['cleaned']
+    assert 'City' in second and second['Votes'].iloc[0] != -1
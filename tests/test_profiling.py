@@ -0,0 +1,70 @@
+# test_profiling.py
+import json
+import numpy as np
+import pandas as pd
+import pytest
+from profiling import TOP_VALUES, _json_value, build_profile, profile_column
+
+
+@pytest.fixture(scope='module')
+def frame():
+    rng = np.random.RandomState(0)
+    values = rng.lognormal(size=500)
+    values[::7] = np.nan
+    return pd.DataFrame({
+        'cost': values,
+        'votes': rng.randint(0, 50, size=500),
+        'city': pd.Categorical(rng.choice(['Delhi', 'Pune', 'Goa', None], size=500), categories=['Delhi', 'Pune', 'Goa', 'Agra']),
+        'name': rng.choice(['a', 'bb', 'ccc'], size=500).astype(object),
+    })
+
+
+@pytest.mark.parametrize('column', ['cost', 'votes'])
+def test_numeric_stats_match_describe(frame, column):
+    profile = profile_column(frame[column])
+    described = frame[column].describe()
+    stats = profile['stats']
+    assert profile['count'] == described['count']
+    assert profile['missing'] == frame[column].isna().sum()
+    for key, reference in [('mean', 'mean'), ('std', 'std'), ('min', 'min'), ('q1', '25%'),
+                           ('median', '50%'), ('q3', '75%'), ('max', 'max')]:
+        assert stats[key] == pytest.approx(described[reference], rel=1e-12)
+    assert stats['skewness'] == pytest.approx(frame[column].skew(), rel=1e-12)
+    assert sum(profile['histogram']['counts']) == described['count']
+
+
+@pytest.mark.parametrize('column', ['cost', 'votes', 'city', 'name'])
+def test_counts_match_value_counts(frame, column):
+    profile = profile_column(frame[column])
+    counts = frame[column].value_counts()
+    counts = counts[counts > 0]
+    assert profile['distinct'] == frame[column].nunique()
+    assert profile['unique'] == (counts == 1).sum()
+    assert [n for _, n in profile['top_values']] == counts.head(TOP_VALUES).tolist()
+    assert [value for value, _ in profile['top_values']] == counts.head(TOP_VALUES).index.tolist()
+
+
+def test_json_value():
+    assert _json_value(np.float64('nan')) is None
+    assert _json_value(float('inf')) is None
+    assert _json_value(np.float32('-inf')) is None
+    assert _json_value(np.int16(7)) == 7 and type(_json_value(np.int16(7))) is int
+    assert _json_value(np.bool_(True)) is True
+    assert _json_value(2.5) == 2.5
+
+
+def test_profile_is_strict_json():
+    data = pd.DataFrame({'x': [1.0, np.inf, -np.inf, np.nan, 2.0], 'constant': [3.0] * 5,
+                         'empty': [np.nan] * 5, 'label': ['a', None, 'b', 'a', None]})
+    profile = build_profile(data, mode='full', n_jobs=1)
+    # allow_nan=False rejects NaN and Infinity, which are not JSON
+    assert json.loads(json.dumps(profile, allow_nan=False))['columns'].keys() == {'x', 'constant', 'empty', 'label'}
+    stats = profile['columns']['x']['stats']
+    assert stats['infinite'] == 2 and stats['min'] is None and stats['max'] is None
+    assert sum(profile['columns']['x']['histogram']['counts']) == 2
+
+
+def test_spawned_workers_match_in_process(frame):
+    in_process = build_profile(frame, mode='full', n_jobs=1)
+    spawned = build_profile(frame, mode='full', n_jobs=2)
+    assert spawned['columns'] == in_process['columns']
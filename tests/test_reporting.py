@@ -0,0 +1,84 @@
+# test_reporting.py
+import os
+import subprocess
+import sys
+import threading
+import time
+import pytest
+import Reporting
+
+
+@pytest.fixture
+def reports(tmp_path, monkeypatch):
+    # Reports of a throwaway data file, in a throwaway folder; build_report writes a stub
+    # instead of running ydata-profiling
+    def cache_path(*parts):
+        path = os.path.join(tmp_path, *parts)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        return path
+
+    data_file = tmp_path / 'zomato.csv'
+    data_file.write_text('a\n1\n')
+    builds = []
+
+    def build_report(data_hash):
+        builds.append(data_hash)
+        html = f'<html>{data_hash}</html>'
+        Reporting.atomic_write(Reporting.report_path(data_hash), html.encode('utf-8'))
+        return html
+
+    monkeypatch.setattr(Reporting, 'cache_path', cache_path)
+    monkeypatch.setattr(Reporting, 'DATA_FILE', str(data_file))
+    monkeypatch.setattr(Reporting, 'build_report', build_report)
+    Reporting.load_report.clear()
+    return data_file, builds
+
+
+def test_import_does_not_load_ydata():
+    code = 'import sys, Reporting; print("ydata_profiling" in sys.modules)'
+    result = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True,
+                            cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    assert result.stdout.strip().endswith('False')
+
+
+def test_first_report_is_built_then_reused(reports):
+    data_file, builds = reports
+    html, stale = Reporting.get_report_html()
+    data_hash = Reporting.file_fingerprint(str(data_file))
+    assert (html, stale, builds) == (f'<html>{data_hash}</html>', False, [data_hash])
+    assert Reporting.get_report_html() == (html, False)
+    assert builds == [data_hash]
+
+
+def test_changed_data_serves_previous_report(reports, monkeypatch):
+    data_file, builds = reports
+    old_html, _ = Reporting.get_report_html()
+    rebuilds = []
+    monkeypatch.setattr(Reporting, 'rebuild_in_background', rebuilds.append)
+
+    data_file.write_text('a\n2\n')
+    os.utime(data_file, ns=(1, 1))
+    html, stale = Reporting.get_report_html()
+    assert (html, stale) == (old_html, True)
+    assert rebuilds == [Reporting.file_fingerprint(str(data_file))]
+
+
+def test_background_rebuilds_are_deduplicated(reports, monkeypatch):
+    _, builds = reports
+    release = threading.Event()
+    started = []
+
+    def slow_build(data_hash):
+        started.append(data_hash)
+        release.wait(5)
+
+    monkeypatch.setattr(Reporting, 'build_report', slow_build)
+    Reporting.rebuild_in_background('hash')
+    Reporting.rebuild_in_background('hash')
+    assert 'hash' in Reporting._builds_in_progress
+    release.set()
+    deadline = time.monotonic() + 5
+    while 'hash' in Reporting._builds_in_progress and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert started == ['hash']
+    assert 'hash' not in Reporting._builds_in_progress
@@ -0,0 +1,115 @@
+# test_serving.py
+import io
+import json
+import threading
+from http.server import ThreadingHTTPServer
+from urllib.error import HTTPError
+from urllib.request import Request, urlopen
+import pytest
+import training
+from serving import MicroBatcher, PricePredictor, make_handler, stream
+
+
+@pytest.fixture(scope='module')
+def predictor(prepared):
+    _, make_estimator, _ = training.MODEL_FAMILIES['decision_tree']
+    model = make_estimator().set_params(estimator__max_depth=5)
+    model.fit(prepared['X_train'], prepared['y_train'])
+    return PricePredictor({'features': prepared['features'], 'label_encoder': prepared['label_encoder'],
+                           'model': model})
+
+
+@pytest.fixture(scope='module')
+def records(clean_data, predictor):
+    return clean_data[predictor.columns].head(20).to_dict('records')
+
+
+def test_validate_coerces_and_rejects(predictor, records):
+    record = dict(records[0], Votes='12', City=float('nan'), extra='ignored')
+    clean = predictor.validate(record)
+    assert list(clean) == predictor.columns
+    assert clean['Votes'] == 12.0 and clean['City'] is None
+    invalid = [
+        [record],
+        {key: value for key, value in record.items() if key != 'Latitude'},
+        dict(record, Votes='many'),
+        dict(record, Votes=True),
+        dict(record, Longitude=float('inf')),
+        dict(record, Cuisines=['Bakery']),
+    ]
+    for value in invalid:
+        with pytest.raises(ValueError):
+            predictor.validate(value)
+
+
+def test_batch_matches_single_predictions(predictor, records):
+    clean = [predictor.validate(record) for record in records]
+    batch = predictor.predict_batch(clean)
+    assert batch == [predictor.predict_batch([record])[0] for record in clean]
+    assert all(result['price_range'] in predictor.labels for result in batch)
+    assert all(sum(result['probabilities'].values()) == pytest.approx(1, abs=1e-5) for result in batch)
+
+
+def test_concurrent_requests_share_batches():
+    batch_sizes = []
+
+    def predict_batch(records):
+        batch_sizes.append(len(records))
+        return [record * 2 for record in records]
+
+    batcher = MicroBatcher(predict_batch, max_batch_size=8, max_wait_ms=200)
+    futures = [batcher.submit(i) for i in range(20)]
+    assert [future.result(5) for future in futures] == [i * 2 for i in range(20)]
+    assert max(batch_sizes) == 8 and sum(batch_sizes) == 20
+    assert batcher.stats()['requests'] == 20
+
+
+def test_a_failing_record_only_fails_its_own_request():
+    def predict_batch(records):
+        if 'bad' in records:
+            raise ValueError('bad record')
+        return [record.upper() for record in records]
+
+    batcher = MicroBatcher(predict_batch, max_batch_size=4, max_wait_ms=200)
+    futures = [batcher.submit(record) for record in ['a', 'bad', 'c', 'd']]
+    assert futures[0].result(5) == 'A'
+    with pytest.raises(ValueError, match='bad record'):
+        futures[1].result(5)
+    assert [future.result(5) for future in futures[2:]] == ['C', 'D']
+
+
+def test_stream_keeps_order_and_reports_bad_lines(predictor, records):
+    batcher = MicroBatcher(predictor.predict_batch, max_wait_ms=1)
+    lines = [json.dumps(records[0]), 'not json', '', json.dumps(dict(records[1], Votes='x')), json.dumps(records[1])]
+    sink = io.StringIO()
+    stream(predictor, batcher, source=io.StringIO('\n'.join(lines) + '\n'), sink=sink)
+    results = [json.loads(line) for line in sink.getvalue().splitlines()]
+    assert len(results) == 4
+    assert 'error' in results[1] and 'error' in results[2]
+    expected = predictor.predict_batch([predictor.validate(records[0]), predictor.validate(records[1])])
+    assert [results[0], results[3]] == json.loads(json.dumps(expected))
+
+
+def test_http_endpoint(predictor, records):
+    batcher = MicroBatcher(predictor.predict_batch, max_wait_ms=1)
+    server = ThreadingHTTPServer(('127.0.0.1', 0), make_handler(predictor, batcher))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f'http://127.0.0.1:{server.server_address[1]}'
+
+    def post(payload):
+        request = Request(url + '/predict', data=json.dumps(payload).encode('utf-8'),
+                          headers={'Content-Type': 'application/json'})
+        with urlopen(request, timeout=10) as response:
+            return json.loads(response.read())
+
+    try:
+        single = post(records[0])
+        assert post(records[:3]) == [single] + post(records[1:3])
+        with pytest.raises(HTTPError) as error:
+            post(dict(records[0], Votes=None))
+        assert error.value.code == 400
+        with urlopen(url + '/health', timeout=10) as response:
+            assert json.loads(response.read()) == {'status': 'ok'}
+    finally:
+        server.shutdown()
+        server.server_close()
@@ -0,0 +1,53 @@
+# test_session_data.py
+import numpy as np
+import pandas as pd
+import pytest
+from session_data import FrameOverlay, shared_view
+
+
+@pytest.fixture
+def base():
+    return pd.DataFrame({'City': pd.Categorical(['Delhi', 'Pune', 'Goa', 'Delhi']),
+                         'Votes': np.array([10, 20, 30, 40]), 'Rating': [4.1, 3.2, np.nan, 4.8]})
+
+
+def test_shared_view_writes_stay_local(base):
+    expected = base.copy(deep=True)
+    view = shared_view(base)
+    view.loc[0, 'Votes'] = -1
+    view['Rating'] = 0.0
+    view.drop(columns=['City'], inplace=True)
+    view.dropna(inplace=True)
+    pd.testing.assert_frame_equal(base, expected)
+
+
+def test_overlay_writes_leave_shared_columns_unchanged(base):
+    expected = base.copy(deep=True)
+    derived = pd.Series(['Delhi', 'Other', 'Other', 'Delhi'], index=base.index, name='City')
+    shared = derived.copy(deep=True)
+    overlay = FrameOverlay(shared_view(base)).assign(City=derived, Doubled=base['Votes'] * 2)
+
+    frame = overlay.frame()
+    frame.loc[1, 'City'] = 'Pune'
+    frame.loc[2, 'Votes'] = 0
+    frame['Doubled'] = frame['Doubled'] + 1
+    frame.drop(columns=['Rating'], inplace=True)
+    pd.testing.assert_frame_equal(base, expected)
+    pd.testing.assert_series_equal(derived, shared)
+    assert overlay['Doubled'].tolist() == [20, 40, 60, 80]
+
+    # A second session's overlay over the same shared columns sees none of it
+    other = FrameOverlay(shared_view(base)).assign(City=derived).frame()
+    assert other['City'].tolist() == ['Delhi', 'Other', 'Other', 'Delhi']
+    assert other['Votes'].tolist() == [10, 20, 30, 40]
+
+
+def test_overlay_columns(base):
+    overlay = FrameOverlay(base).assign(Top=base['City'].astype(str)).drop('Rating')
+    assert overlay.columns == ['City', 'Votes', 'Top']
+    assert 'Rating' not in overlay
+    with pytest.raises(KeyError):
+        overlay['Rating']
+    assert list(overlay.frame().columns) == overlay.columns
+    # Base columns are read from the base, not copied
+    assert np.shares_memory(overlay.frame()['Votes'].to_numpy(), base['Votes'].to_numpy())
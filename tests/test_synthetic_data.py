@@ -0,0 +1,81 @@
+# test_synthetic_data.py
+import glob
+import numpy as np
+import pandas as pd
+import pytest
+from data_access import DATA_FILE
+from pipeline import run_pipeline
+from synthetic_data import COORDINATE_JITTER, ZomatoSynthesizer, generate
+
+
+@pytest.fixture(scope='module')
+def source():
+    return pd.read_csv(DATA_FILE, encoding='latin-1')
+
+
+@pytest.fixture(scope='module')
+def synthetic_csv(tmp_path_factory):
+    path = str(tmp_path_factory.mktemp('synthetic') / 'zomato-3000.csv')
+    return generate(3000, path, seed=7, chunksize=1000, n_jobs=1)
+
+
+def read(path):
+    return pd.read_csv(path, encoding='latin-1')
+
+
+def test_output_only_depends_on_seed_and_chunksize(synthetic_csv, tmp_path):
+    parallel = generate(3000, str(tmp_path / 'parallel.csv'), seed=7, chunksize=1000, n_jobs=2)
+    with open(synthetic_csv, 'rb') as a, open(parallel, 'rb') as b:
+        assert a.read() == b.read()
+    other_seed = read(generate(3000, str(tmp_path / 'other.csv'), seed=8, chunksize=1000, n_jobs=1))
+    assert not other_seed.equals(read(synthetic_csv))
+    # Only the CSV is left behind, no part files
+    assert sorted(path.name for path in tmp_path.iterdir()) == ['other.csv', 'parallel.csv']
+
+
+def test_schema_and_ids(synthetic_csv, source):
+    data = read(synthetic_csv)
+    assert data.columns.tolist() == source.columns.tolist()
+    assert len(data) == 3000
+    np.testing.assert_array_equal(data['Restaurant ID'], np.arange(3000))
+    for column in source.columns:
+        if column not in ('Restaurant ID', 'Longitude', 'Latitude'):
+            assert set(data[column].dropna()) <= set(source[column].dropna()), column
+
+
+def test_joint_structure_is_kept(synthetic_csv, source):
+    data = read(synthetic_csv)
+    for columns in [['Country Code', 'City', 'Locality', 'Currency'], ['Country Code', 'Price range'],
+                    ['City', 'Restaurant Name', 'Cuisines'],
+                    ['Country Code', 'Price range', 'Average Cost for two', 'Has Online delivery'],
+                    ['Country Code', 'Price range', 'Aggregate rating', 'Rating text', 'Votes']]:
+        combinations = pd.MultiIndex.from_frame(data[columns].astype(str))
+        assert combinations.isin(pd.MultiIndex.from_frame(source[columns].astype(str))).all(), columns
+
+
+def test_coordinates_are_jittered_around_their_locality(source):
+    rng = np.random.default_rng(0)
+    data = ZomatoSynthesizer(source).sample(2000, rng)
+    located = (data['Latitude'] != 0) | (data['Longitude'] != 0)
+    assert located.any() and (~located).any()
+    # The sampled address row fixes the original coordinates; the jitter is ~N(0, COORDINATE_JITTER)
+    original = source.drop_duplicates('Address').set_index('Address').loc[data['Address'], ['Latitude', 'Longitude']]
+    same_address = source['Address'].value_counts().loc[data['Address']].to_numpy() == 1
+    offsets = data[['Latitude', 'Longitude']].to_numpy() - original.to_numpy()
+    offsets = offsets[located.to_numpy() & same_address]
+    assert np.abs(offsets).max() < 6 * COORDINATE_JITTER
+    assert offsets.std() == pytest.approx(COORDINATE_JITTER, rel=0.2)
+
+
+def test_parquet_parts_hold_the_csv_rows(synthetic_csv, tmp_path):
+    folder = generate(3000, str(tmp_path / 'parts'), seed=7, chunksize=1000, n_jobs=1)
+    parts = sorted(glob.glob(f'{folder}/part-*.parquet'))
+    assert len(parts) == 3
+    data = pd.concat([pd.read_parquet(part) for part in parts], ignore_index=True)
+    pd.testing.assert_frame_equal(data, read(synthetic_csv), check_dtype=False)
+
+
+def test_synthetic_data_goes_through_the_pipeline(synthetic_csv):
+    cleaned = run_pipeline(synthetic_csv)['cleaned']
+    assert 0 < len(cleaned) <= 3000
+    assert cleaned['Country'].notna().all()
@@ -0,0 +1,74 @@
+# test_training.py
+import os
+import joblib
+import numpy as np
+import pytest
+from sklearn.metrics import accuracy_score
+import training
+
+TREE_PARAMS = {'estimator__max_depth': 5, 'estimator__min_samples_split': 2}
+
+
+@pytest.fixture
+def models_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(training, 'MODELS_DIR', str(tmp_path))
+    return tmp_path
+
+
+@pytest.fixture
+def tree_artifact(models_dir, clean_data, prepared):
+    path = training.train_model('decision_tree', clean_data, prepared, best_params=TREE_PARAMS, cv_accuracy=0.5)
+    return path, training.load_artifact(path)
+
+
+def test_artifact_is_saved_for_the_current_data(tree_artifact, models_dir, prepared):
+    path, artifact = tree_artifact
+    data_fingerprint = training.stage_fingerprints()['cleaned']
+    assert path == training.artifact_path('decision_tree', data_fingerprint)
+    assert os.listdir(models_dir) == [os.path.basename(path)]
+    assert training.find_artifact('decision_tree') == path
+    assert (artifact['best_params'], artifact['cv_accuracy']) == (TREE_PARAMS, 0.5)
+    assert not training.is_stale(artifact)
+    np.testing.assert_array_equal(artifact['test_index'], prepared['test_index'])
+
+
+def test_loaded_model_predicts_like_a_fresh_fit(tree_artifact, prepared):
+    _, artifact = tree_artifact
+    _, make_estimator, _ = training.MODEL_FAMILIES['decision_tree']
+    model = make_estimator().set_params(**TREE_PARAMS).fit(prepared['X_train'], prepared['y_train'])
+    np.testing.assert_array_equal(artifact['model'].predict(prepared['X_test']), model.predict(prepared['X_test']))
+
+
+def test_evaluation_uses_the_held_out_rows(tree_artifact, clean_data, prepared):
+    _, artifact = tree_artifact
+    metrics, roc_curves = training.evaluate_model(artifact)
+    y_pred = artifact['model'].predict(prepared['X_test'])
+    assert metrics['accuracy'] == pytest.approx(accuracy_score(prepared['y_test'], y_pred))
+    # Re-encoding the test rows from the cleaned frame gives the matrix the model was split on
+    X_test = training.transform_features(artifact, clean_data.loc[artifact['test_index']])
+    assert (X_test != prepared['X_test']).nnz == 0
+    assert {label for label, *_ in roc_curves} <= set(artifact['label_encoder'].classes_)
+    assert all(0 <= auc <= 1 for *_, auc in roc_curves)
+
+
+def test_stale_artifact_is_found_but_not_evaluated(tree_artifact, models_dir):
+    path, artifact = tree_artifact
+    artifact['data_fingerprint'] = '0' * 64
+    stale_path = training.artifact_path('decision_tree', artifact['data_fingerprint'])
+    joblib.dump(artifact, stale_path)
+    os.remove(path)
+    assert training.find_artifact('decision_tree') == stale_path
+    assert training.is_stale(artifact)
+    with pytest.raises(ValueError, match='retrain'):
+        training.evaluate_model(artifact)
+
+
+def test_untrained_family_has_no_artifact(models_dir):
+    assert training.find_artifact('knn') is None
+
+
+def test_other_feature_layout_is_rejected(tree_artifact, clean_data):
+    _, artifact = tree_artifact
+    artifact['features'].layout_version_ = training.LAYOUT_VERSION + 1
+    with pytest.raises(ValueError, match='feature layout'):
+        training.transform_features(artifact, clean_data.head())
@@ -0,0 +1,55 @@
+# test_tree_export.py
+import numpy as np
+import pandas as pd
+import pytest
+from tree_export import TreeScorer, export_tree, flatten_trees
+from training import MODEL_FAMILIES
+
+
+@pytest.fixture(scope='module')
+def artifact(prepared):
+    model = MODEL_FAMILIES['decision_tree'][1]().set_params(estimator__max_depth=11)
+    model.fit(prepared['X_train'], prepared['y_train'])
+    return {'model': model, 'features': prepared['features'], 'label_encoder': prepared['label_encoder'],
+            'data_fingerprint': 'test'}
+
+
+@pytest.fixture(scope='module')
+def scorer(artifact, tmp_path_factory):
+    return TreeScorer(export_tree(artifact, str(tmp_path_factory.mktemp('trees') / 'decision_tree.tree')))
+
+
+def reference_proba(artifact, data):
+    return artifact['model'].predict_proba(artifact['features'].transform(data))
+
+
+def test_predict_proba_matches_sklearn(artifact, scorer, clean_data, prepared):
+    test_data = clean_data.loc[prepared['test_index']]
+    np.testing.assert_array_equal(scorer.predict_proba(test_data), reference_proba(artifact, test_data))
+
+
+def test_predict_matches_sklearn(artifact, scorer, clean_data):
+    expected = artifact['label_encoder'].inverse_transform(
+        artifact['model'].predict(artifact['features'].transform(clean_data)))
+    np.testing.assert_array_equal(scorer.predict(clean_data), expected)
+
+
+def test_records_with_missing_and_unseen_values(artifact, scorer, clean_data):
+    # Plain Python records, as the serving API receives them, with values outside the vocabulary
+    records = clean_data[scorer.columns].sample(300, random_state=0).astype(object).to_dict('records')
+    for i, record in enumerate(records):
+        if i % 3 == 0:
+            record['City'] = 'Atlantis'
+        if i % 5 == 0:
+            record['Cuisines'] = None
+        if i % 7 == 0:
+            record['Rating text'] = np.nan
+    frame = pd.DataFrame.from_records(records, columns=scorer.columns)
+    expected = artifact['label_encoder'].inverse_transform(reference_proba(artifact, frame).argmax(axis=1))
+    np.testing.assert_array_equal(scorer.predict_records(records), expected)
+
+
+def test_only_decision_trees_can_be_exported(prepared):
+    model = MODEL_FAMILIES['logistic_regression'][1]().fit(prepared['X_train'][:500], prepared['y_train'][:500])
+    with pytest.raises(ValueError):
+        flatten_trees(model)
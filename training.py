@@ -0,0 +1,304 @@
+# training.py
+import glob
+import os
+import sys
+import time
+import joblib
+import numpy as np
+import pandas as pd
+import sklearn
+from sklearn.ensemble import HistGradientBoostingClassifier
+from sklearn.linear_model import LogisticRegression
+from sklearn.metrics import (accuracy_score, cohen_kappa_score, f1_score, precision_score,
+                             recall_score, roc_auc_score, roc_curve)
+from sklearn.model_selection import GridSearchCV, train_test_split
+from sklearn.multiclass import OneVsRestClassifier
+from sklearn.pipeline import make_pipeline
+from sklearn.neighbors import KNeighborsClassifier
+from sklearn.preprocessing import LabelEncoder, label_binarize
+from sklearn.tree import DecisionTreeClassifier
+from ann_index import ANNKNeighborsClassifier
+from cache_utils import atomic_open
+from features import LAYOUT_VERSION, CategoryCodes, FeatureBuilder
+from pipeline import load_clean_data, stage_fingerprints
+
+# Directory holding the fitted model artifacts
+MODELS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'models')
+
+# Bump when the layout of a saved artifact changes
+ARTIFACT_VERSION = 2
+
+CATEGORICAL_FEATURES = ['Restaurant Name', 'City', 'Cuisines', 'Currency', 'Has Table booking',
+                        'Has Online delivery', 'Is delivering now', 'Rating text',
+                        'Country', 'Mall']
+NUMERICAL_FEATURES = ['Longitude', 'Latitude', 'Average Cost for two', 'Aggregate rating', 'Votes']
+TARGET = 'Price range'
+
+TEST_SIZE = 0.2
+RANDOM_STATE = 42
+
+# Model families: display name, estimator factory and hyperparameter grid
+MODEL_FAMILIES = {
+    'logistic_regression': (
+        'Logistic Regression',
+        lambda: OneVsRestClassifier(LogisticRegression(max_iter=1000)),
+        {'estimator__C': [0.001, 0.01, 0.1, 1, 10, 100]},
+    ),
+    'knn': (
+        'K-Nearest Neighbors',
+        # Brute force computes the distances on the sparse matrix directly
+        lambda: OneVsRestClassifier(KNeighborsClassifier(algorithm='brute')),
+        {'estimator__n_neighbors': [3, 5, 7, 9, 11]},
+    ),
+    'knn_ann': (
+        'K-Nearest Neighbors (ANN)',
+        # Multiclass vote on a random projection forest built at fit time and saved with the model
+        lambda: ANNKNeighborsClassifier(n_trees=10, random_state=RANDOM_STATE),
+        {'n_neighbors': [3, 5, 7, 9, 11]},
+    ),
+    'decision_tree': (
+        'Decision Tree',
+        lambda: OneVsRestClassifier(DecisionTreeClassifier(random_state=RANDOM_STATE)),
+        {'estimator__max_depth': [3, 5, 11], 'estimator__min_samples_split': [2, 5, 10]},
+    ),
+    'hist_gradient_boosting': (
+        'Gradient Boosting (Histogram)',
+        # Multiclass boosting on the category codes of the features (no one-hot columns); features
+        # are binned once per fit and the trees are grown on all cores
+        lambda: make_pipeline(CategoryCodes(), HistGradientBoostingClassifier(early_stopping=True,
+                                                                              random_state=RANDOM_STATE)),
+        {'histgradientboostingclassifier__learning_rate': [0.05, 0.1, 0.2],
+         'histgradientboostingclassifier__max_leaf_nodes': [15, 31]},
+    ),
+}
+
+
+def build_features():
+    # One-hot encode the top-10 categories of the categorical features and scale the numerical ones
+    return FeatureBuilder(CATEGORICAL_FEATURES, NUMERICAL_FEATURES, top_n=10)
+
+
+def prepare_data(data):
+    """
+    Encodes the features and the target, and splits train/test rows.
+
+    Parameters:
+    data (pd.DataFrame): The cleaned restaurant data.
+
+    Returns:
+    dict: Fitted preprocessing objects, the encoded matrices and the test row labels.
+    """
+    # Encode target variable
+    label_encoder = LabelEncoder()
+    y = label_encoder.fit_transform(data[TARGET])
+
+    # Build the CSR feature matrix; only the listed feature columns are read
+    features = build_features()
+    X = features.fit_transform(data)
+
+    positions = np.arange(len(data))
+    train_positions, test_positions = train_test_split(positions, test_size=TEST_SIZE,
+                                                       random_state=RANDOM_STATE)
+    return {
+        'features': features,
+        'label_encoder': label_encoder,
+        'X_train': X[train_positions],
+        'X_test': X[test_positions],
+        'y_train': y[train_positions],
+        'y_test': y[test_positions],
+        'test_index': data.index[test_positions].to_numpy(),
+    }
+
+
+def artifact_path(model_name, data_fingerprint):
+    return os.path.join(MODELS_DIR, f'{model_name}-v{ARTIFACT_VERSION}-{data_fingerprint[:12]}.joblib')
+
+
+def train_model(model_name, data=None, prepared=None, best_params=None, cv_accuracy=None):
+    """
+    Runs the grid search for one model family and saves the fitted pipeline as an artifact.
+
+    Parameters:
+    model_name (str): Key of MODEL_FAMILIES.
+    data (pd.DataFrame): The cleaned restaurant data; loaded from the pipeline if omitted.
+    prepared (dict): Output of prepare_data, to share the encoding across several models.
+    best_params (dict): Hyperparameters chosen elsewhere (e.g. by model_selection.py); the
+        grid search is skipped and the model is refit once with them.
+    cv_accuracy (float): Cross-validated accuracy of best_params, stored with the artifact.
+
+    Returns:
+    str: Path of the saved artifact.
+    """
+    if data is None:
+        data = load_clean_data()
+    if prepared is None:
+        prepared = prepare_data(data)
+    _, make_estimator, param_grid = MODEL_FAMILIES[model_name]
+
+    start = time.perf_counter()
+    if best_params is None:
+        grid_search = GridSearchCV(make_estimator(), param_grid, cv=5, scoring='accuracy')
+        grid_search.fit(prepared['X_train'], prepared['y_train'])
+        model, best_params, cv_accuracy = (grid_search.best_estimator_, grid_search.best_params_,
+                                           grid_search.best_score_)
+    else:
+        model = make_estimator().set_params(**best_params)
+        model.fit(prepared['X_train'], prepared['y_train'])
+    fit_seconds = time.perf_counter() - start
+
+    data_fingerprint = stage_fingerprints()['cleaned']
+    artifact = {
+        'artifact_version': ARTIFACT_VERSION,
+        'model_name': model_name,
+        'data_fingerprint': data_fingerprint,
+        'sklearn_version': sklearn.__version__,
+        'trained_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'fit_seconds': fit_seconds,
+        'best_params': best_params,
+        'cv_accuracy': cv_accuracy,
+        'features': prepared['features'],
+        'label_encoder': prepared['label_encoder'],
+        'model': model,
+        'test_index': prepared['test_index'],
+    }
+
+    os.makedirs(MODELS_DIR, exist_ok=True)
+    path = artifact_path(model_name, data_fingerprint)
+    with atomic_open(path) as f:
+        joblib.dump(artifact, f)
+    return path
+
+
+def find_artifact(model_name):
+    """
+    Returns the artifact path for the current dataset version, falling back to the newest
+    artifact of the model family, or None when the model was never trained. A fallback
+    artifact is stale (see is_stale()): it still predicts, but cannot be evaluated.
+
+    Parameters:
+    model_name (str): Key of MODEL_FAMILIES.
+    """
+    path = artifact_path(model_name, stage_fingerprints()['cleaned'])
+    if os.path.exists(path):
+        return path
+    paths = glob.glob(os.path.join(MODELS_DIR, f'{model_name}-v{ARTIFACT_VERSION}-*.joblib'))
+    return max(paths, key=os.path.getmtime) if paths else None
+
+
+def load_artifact(path):
+    return joblib.load(path)
+
+
+def is_stale(artifact):
+    # Trained on another version of the cleaned data: its test_index does not refer to the current rows
+    return artifact['data_fingerprint'] != stage_fingerprints()['cleaned']
+
+
+def transform_features(artifact, data):
+    # Apply the frozen vocabularies and scaling of the artifact to new records
+    features = artifact['features']
+    if features.layout_version_ != LAYOUT_VERSION:
+        raise ValueError("The model was trained on another feature layout; retrain it")
+    return features.transform(data)
+
+
+def evaluate_model(artifact, data=None):
+    """
+    Computes the evaluation metrics and ROC curves of a saved model on its held-out test rows.
+
+    Parameters:
+    artifact (dict): A loaded model artifact.
+    data (pd.DataFrame): The cleaned data the model was trained on; loaded from the pipeline
+        if omitted, in which case a stale artifact raises a ValueError rather than being
+        scored on rows that may have been in its training set.
+    """
+    if data is None:
+        if is_stale(artifact):
+            raise ValueError("The model was trained on another version of the data; retrain it to evaluate it")
+        data = load_clean_data()
+    test_data = data.loc[artifact['test_index']]
+    X_test = transform_features(artifact, test_data)
+    y_test = artifact['label_encoder'].transform(test_data[TARGET])
+
+    model = artifact['model']
+    y_pred = model.predict(X_test)
+    y_pred_prob = model.predict_proba(X_test)
+
+    metrics = {
+        'accuracy': accuracy_score(y_test, y_pred),
+        'precision': precision_score(y_test, y_pred, average='weighted', zero_division=0),
+        'recall': recall_score(y_test, y_pred, average='weighted'),
+        'f1_score': f1_score(y_test, y_pred, average='weighted'),
+        'kappa': cohen_kappa_score(y_test, y_pred),
+    }
+
+    # ROC curve and AUC for multiclass classification
+    classes = np.arange(len(artifact['label_encoder'].classes_))
+    y_test_bin = label_binarize(y_test, classes=classes)
+    roc_curves = []
+    for i in classes:
+        if y_test_bin[:, i].min() == y_test_bin[:, i].max():
+            continue
+        fpr, tpr, _ = roc_curve(y_test_bin[:, i], y_pred_prob[:, i])
+        roc_auc = roc_auc_score(y_test_bin[:, i], y_pred_prob[:, i])
+        roc_curves.append((artifact['label_encoder'].classes_[i], fpr, tpr, roc_auc))
+
+    return metrics, roc_curves
+
+
+def compare_models(model_names=None, data=None):
+    """
+    Compares the trained model families on the same train/test split.
+
+    Each family is refit once with the hyperparameters of its saved artifact, so fit times
+    exclude the grid search; prediction is timed on the whole test set in one call.
+
+    Parameters:
+    model_names (list of str): Keys of MODEL_FAMILIES; every trained family by default.
+    data (pd.DataFrame): The cleaned restaurant data; loaded from the pipeline if omitted.
+
+    Returns:
+    pd.DataFrame: Fit seconds, predict milliseconds per 1000 rows, test accuracy and
+    artifact size in MB, indexed by model display name.
+    """
+    if data is None:
+        data = load_clean_data()
+    prepared = prepare_data(data)
+    rows = {}
+    for model_name in model_names or MODEL_FAMILIES:
+        path = find_artifact(model_name)
+        if path is None:
+            continue
+        display_name, make_estimator, _ = MODEL_FAMILIES[model_name]
+        model = make_estimator().set_params(**load_artifact(path)['best_params'])
+        start = time.perf_counter()
+        model.fit(prepared['X_train'], prepared['y_train'])
+        fit_seconds = time.perf_counter() - start
+        start = time.perf_counter()
+        y_pred = model.predict(prepared['X_test'])
+        predict_seconds = time.perf_counter() - start
+        rows[display_name] = {
+            'fit_seconds': fit_seconds,
+            'predict_ms_per_1000': predict_seconds * 1e6 / len(y_pred),
+            'accuracy': accuracy_score(prepared['y_test'], y_pred),
+            'artifact_mb': os.path.getsize(path) / 1e6,
+        }
+    return pd.DataFrame.from_dict(rows, orient='index')
+
+
+def train_all(model_names=None):
+    # Encode once and train every requested model family on the same matrices
+    data = load_clean_data()
+    prepared = prepare_data(data)
+    paths = {}
+    for model_name in model_names or MODEL_FAMILIES:
+        paths[model_name] = train_model(model_name, data, prepared)
+        print(f"{model_name}: saved {paths[model_name]}")
+    return paths
+
+
+if __name__ == "__main__":
+    if sys.argv[1:2] == ['--compare']:
+        print(compare_models(sys.argv[2:]).round(4).to_string())
+    else:
+        train_all(sys.argv[1:])
@@ -0,0 +1,297 @@
+# tree_export.py
+import argparse
+import json
+import math
+import mmap
+import os
+import subprocess
+import sys
+import time
+import numpy as np
+from cache_utils import atomic_open
+
+# File layout: MAGIC, the header length as 8 little-endian bytes, a JSON header, then the
+# arrays it describes, each starting on an ALIGNMENT-byte boundary
+MAGIC = b'ZOMATO-TREE\x00'
+FORMAT_VERSION = 1
+ALIGNMENT = 64
+
+
+def flatten_trees(model):
+    """
+    Concatenates the binary trees of a one-vs-rest decision tree model into flat node arrays.
+
+    Node ids are global across trees; leaves point to themselves, so every row can take the
+    same number of steps whatever the depth of its leaf.
+
+    Parameters:
+    model (OneVsRestClassifier): Fitted one-vs-rest model of DecisionTreeClassifier.
+
+    Returns:
+    tuple: (dict of node arrays (feature, threshold, left, right, missing_left, proba) and
+    the root node of each tree, depth of the deepest tree)
+    """
+    estimators = getattr(model, 'estimators_', None)
+    if estimators is None or not all(hasattr(estimator, 'tree_') for estimator in estimators):
+        raise ValueError("Only one-vs-rest decision tree models can be exported")
+
+    arrays = {name: [] for name in ('feature', 'threshold', 'left', 'right', 'missing_left', 'proba')}
+    roots, offset, depth = [], 0, 0
+    for estimator in estimators:
+        tree = estimator.tree_
+        node = np.arange(tree.node_count)
+        leaf = tree.children_left == -1
+        arrays['feature'].append(np.where(leaf, 0, tree.feature))
+        arrays['threshold'].append(np.where(leaf, 0.0, tree.threshold))
+        arrays['left'].append(offset + np.where(leaf, node, tree.children_left))
+        arrays['right'].append(offset + np.where(leaf, node, tree.children_right))
+        arrays['missing_left'].append(tree.missing_go_to_left.astype(bool))
+        # Probability of the positive class ("is this price range") at every node
+        value = tree.value[:, 0, :]
+        arrays['proba'].append(value[:, 1] / value.sum(axis=1))
+        roots.append(offset)
+        offset += tree.node_count
+        depth = max(depth, tree.max_depth)
+
+    flat = {name: np.concatenate(parts) for name, parts in arrays.items()}
+    flat['feature'] = flat['feature'].astype(np.int32)
+    flat['left'] = flat['left'].astype(np.int32)
+    flat['right'] = flat['right'].astype(np.int32)
+    flat['roots'] = np.array(roots, dtype=np.int32)
+    return flat, depth
+
+
+def flatten_features(features):
+    """
+    Describes every column of a FeatureBuilder layout by its input column and category slot.
+
+    Returns:
+    tuple: (header entries with the frozen vocabularies, array of the input column position
+    of every feature, array of its category slot or -1 for numerical features, scaler mean
+    and scale per numerical column)
+    """
+    column_of, slot_of = [], []
+    vocabularies = {}
+    for position, column in enumerate(features.categorical_columns):
+        categories = features.categories_[column]
+        if not all(isinstance(category, str) for category in categories):
+            raise ValueError(f"Only string categories can be exported ({column})")
+        vocabularies[column] = categories
+        # One slot per category plus the missing-value slot, as in FeatureBuilder.transform
+        column_of += [position] * (len(categories) + 1)
+        slot_of += list(range(len(categories) + 1))
+    n_categorical = len(features.categorical_columns)
+    column_of += [n_categorical + position for position in range(len(features.numerical_columns))]
+    slot_of += [-1] * len(features.numerical_columns)
+
+    header = {
+        'categorical_columns': features.categorical_columns,
+        'numerical_columns': features.numerical_columns,
+        'vocabularies': vocabularies,
+        'other': features.other_,
+        'layout_hash': features.layout_hash_,
+    }
+    return (header, np.array(column_of, dtype=np.int32), np.array(slot_of, dtype=np.int32),
+            np.asarray(features.mean_, dtype=np.float64), np.asarray(features.scale_, dtype=np.float64))
+
+
+def export_tree(artifact, path):
+    """
+    Writes the decision tree and its preprocessing of a model artifact to a single file that
+    TreeScorer memory-maps.
+
+    Parameters:
+    artifact (dict): A loaded decision_tree artifact from training.py.
+    path (str): Destination file.
+
+    Returns:
+    str: The path written.
+    """
+    arrays, depth = flatten_trees(artifact['model'])
+    header, column_of, slot_of, mean, scale = flatten_features(artifact['features'])
+    # Each split node reads the input column and category slot of its feature directly
+    feature = arrays.pop('feature')
+    arrays.update({'column': column_of[feature], 'slot': slot_of[feature], 'mean': mean, 'scale': scale})
+    labels = [label.item() if hasattr(label, 'item') else label for label in artifact['label_encoder'].classes_]
+    header.update({'format_version': FORMAT_VERSION, 'labels': labels, 'depth': depth,
+                   'dtype': np.dtype(artifact['features'].dtype).str,
+                   'data_fingerprint': artifact['data_fingerprint'], 'arrays': {}})
+
+    # Offsets are relative to the start of the array section, which follows the header
+    offset = 0
+    for name, array in arrays.items():
+        offset = -(-offset // ALIGNMENT) * ALIGNMENT
+        header['arrays'][name] = {'dtype': array.dtype.str, 'shape': list(array.shape), 'offset': offset}
+        offset += array.nbytes
+    header_bytes = json.dumps(header).encode('utf-8')
+    start = -(-(len(MAGIC) + 8 + len(header_bytes)) // ALIGNMENT) * ALIGNMENT
+
+    with atomic_open(path) as f:
+        f.write(MAGIC + len(header_bytes).to_bytes(8, 'little') + header_bytes)
+        for name, array in arrays.items():
+            f.seek(start + header['arrays'][name]['offset'])
+            f.write(np.ascontiguousarray(array).tobytes())
+    return path
+
+
+class TreeScorer:
+    """
+    Scores restaurants with an exported decision tree, using NumPy only.
+
+    The file is memory-mapped and its arrays are read in place. Rows are encoded from the
+    frozen vocabularies and scaler, then all rows walk all trees together, one level per
+    step, and the per-class probabilities are normalized as in OneVsRestClassifier.
+
+    Parameters:
+    path (str): A file written by export_tree.
+    """
+
+    def __init__(self, path):
+        with open(path, 'rb') as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._map[:len(MAGIC)] != MAGIC:
+            raise ValueError(f"{path} is not an exported tree")
+        header_length = int.from_bytes(self._map[len(MAGIC):len(MAGIC) + 8], 'little')
+        header_end = len(MAGIC) + 8 + header_length
+        self.header = json.loads(self._map[len(MAGIC) + 8:header_end])
+        if self.header['format_version'] != FORMAT_VERSION:
+            raise ValueError(f"{path} has format version {self.header['format_version']}; export it again")
+        start = -(-header_end // ALIGNMENT) * ALIGNMENT
+        for name, spec in self.header['arrays'].items():
+            dtype = np.dtype(spec['dtype'])
+            array = np.frombuffer(self._map, dtype=dtype, count=math.prod(spec['shape']),
+                                  offset=start + spec['offset'])
+            setattr(self, name, array.reshape(spec['shape']))
+        self.columns = self.header['categorical_columns'] + self.header['numerical_columns']
+        self.labels = self.header['labels']
+        self._lookups = [{category: slot for slot, category in enumerate(self.header['vocabularies'][column])}
+                         for column in self.header['categorical_columns']]
+
+    def encode(self, columns):
+        """
+        Returns the (n_rows, n_input_columns) matrix of category slots and scaled numbers.
+
+        Parameters:
+        columns (mapping): Input column name -> sequence of values, e.g. a pd.DataFrame.
+        """
+        encoded = []
+        for column, lookup in zip(self.header['categorical_columns'], self._lookups):
+            other, missing = lookup[self.header['other']], len(lookup)
+            values = columns[column]
+            if hasattr(values, 'cat'):
+                # pandas categoricals: look up each category present once and index the codes (-1 = missing)
+                codes = values.cat.codes.to_numpy().astype(np.int64) + 1
+                present = np.flatnonzero(np.bincount(codes, minlength=1))
+                table = np.full(len(values.cat.categories) + 1, missing)
+                categories = values.cat.categories.take(present[present > 0] - 1).tolist()
+                table[present[present > 0]] = [lookup.get(category, other) for category in categories]
+                encoded.append(table[codes])
+            else:
+                values = np.asarray(values, dtype=object)
+                absent = (values == None) | (values != values)  # noqa: E711 (elementwise None test)
+                present, codes = np.unique(values[~absent].astype(str), return_inverse=True)
+                slots = np.full(len(values), missing)
+                slots[~absent] = np.array([lookup.get(value, other) for value in present], dtype=int)[codes]
+                encoded.append(slots)
+        encoded = np.array(encoded, dtype=np.float64).T.reshape(-1, len(self._lookups))
+        numbers = np.column_stack([np.asarray(columns[column], dtype=np.float64)
+                                   for column in self.header['numerical_columns']])
+        # Same arithmetic and rounding as FeatureBuilder.transform
+        scaled = ((numbers - self.mean) / self.scale).astype(self.header['dtype']).astype(np.float64)
+        return np.hstack([encoded, scaled])
+
+    def predict_proba(self, columns):
+        inputs = self.encode(columns)
+        n_rows = inputs.shape[0]
+        node = np.broadcast_to(self.roots, (n_rows, len(self.roots))).copy()
+        rows = np.arange(n_rows)[:, None]
+        for _ in range(self.header['depth']):
+            value = inputs[rows, self.column[node]]
+            slot = self.slot[node]
+            # One-hot features are 1.0 when the row holds that category slot
+            value = np.where(slot >= 0, value == slot, value)
+            go_left = (value <= self.threshold[node]) | (np.isnan(value) & self.missing_left[node])
+            node = np.where(go_left, self.left[node], self.right[node])
+        proba = self.proba[node]
+        total = proba.sum(axis=1, keepdims=True)
+        return proba / np.where(total > 0, total, 1)
+
+    def predict(self, columns):
+        return np.asarray(self.labels)[self.predict_proba(columns).argmax(axis=1)]
+
+    def predict_records(self, records):
+        # Records are dicts keyed by input column, as sent to the serving API
+        return self.predict({column: [record.get(column) for record in records] for column in self.columns})
+
+
+def export_path(artifact_path):
+    return os.path.splitext(artifact_path)[0] + '.tree'
+
+
+def _startup_seconds(path, repeat=5):
+    # A fresh interpreter loading the scorer and scoring one record
+    code = ("import sys, time; start = time.perf_counter(); from tree_export import TreeScorer; "
+            f"scorer = TreeScorer({path!r}); "
+            "scorer.predict_records([{column: None for column in scorer.columns}]); "
+            "print(time.perf_counter() - start, 'sklearn' in sys.modules)")
+    runs = [subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True,
+                           cwd=os.path.dirname(os.path.abspath(__file__))).stdout.split() for _ in range(repeat)]
+    return min(float(seconds) for seconds, _ in runs), runs[0][1] == 'True'
+
+
+def benchmark(artifact_path, batch_sizes=(1, 16, 256, 4096), repeat=20):
+    """
+    Compares the exported scorer with the sklearn model on the held-out test rows.
+
+    Returns:
+    dict: Agreement of the predictions, cold-start seconds of the scorer, and per batch size
+    the milliseconds per batch of the sklearn path (FeatureBuilder + predict) and of the
+    scorer, from a DataFrame and from a list of records.
+    """
+    import pandas as pd
+    from pipeline import load_clean_data
+    from training import load_artifact, transform_features
+    artifact = load_artifact(artifact_path)
+    path = export_tree(artifact, export_path(artifact_path))
+    scorer = TreeScorer(path)
+    test_data = load_clean_data().loc[artifact['test_index']]
+
+    expected = artifact['model'].predict_proba(transform_features(artifact, test_data))
+    result = {'max_abs_proba_difference': float(np.abs(scorer.predict_proba(test_data) - expected).max()),
+              'prediction_agreement': float((scorer.predict_proba(test_data).argmax(axis=1)
+                                             == expected.argmax(axis=1)).mean())}
+    result['startup_seconds'], result['startup_imports_sklearn'] = _startup_seconds(path)
+
+    def sklearn_records(records):
+        # The serving path: records -> DataFrame -> FeatureBuilder -> predict
+        return artifact['model'].predict(transform_features(artifact, pd.DataFrame.from_records(
+            records, columns=scorer.columns)))
+
+    for batch_size in batch_sizes:
+        batch = test_data.sample(batch_size, replace=True, random_state=0)
+        records = batch[scorer.columns].to_dict('records')
+        timings = {}
+        for name, score in (('sklearn_frame_ms', lambda: artifact['model'].predict(transform_features(artifact, batch))),
+                            ('scorer_frame_ms', lambda: scorer.predict(batch)),
+                            ('sklearn_records_ms', lambda: sklearn_records(records)),
+                            ('scorer_records_ms', lambda: scorer.predict_records(records))):
+            score()
+            start = time.perf_counter()
+            for _ in range(repeat):
+                score()
+            timings[name] = (time.perf_counter() - start) * 1000 / repeat
+        result[f'batch_{batch_size}'] = timings
+    return result
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export the decision tree model and benchmark the NumPy scorer")
+    parser.add_argument('--artifact', help="model artifact to export; the current decision_tree by default")
+    args = parser.parse_args()
+    artifact_path = args.artifact
+    if artifact_path is None:
+        from training import find_artifact
+        artifact_path = find_artifact('decision_tree')
+        if artifact_path is None:
+            parser.error("no trained decision_tree model; run 'python training.py decision_tree'")
+    print(json.dumps(benchmark(artifact_path), indent=2))